@@ -1,39 +1,59 @@
 import asyncio
 import importlib
+import time
 
 from pyrogram import idle
 from pytgcalls.exceptions import NoActiveGroupCall
 
 import config
-from Dolbymusic import LOGGER, app, userbot
+from Dolbymusic import LOGGER, YouTube, app, userbot
 from Dolbymusic.core.call import AyushSolo
+from Dolbymusic.core.storage import storage
 from Dolbymusic.misc import sudo
 from Dolbymusic.plugins import ALL_MODULES
-from Dolbymusic.utils.database import get_banned_users, get_gbanned
+from Dolbymusic.utils.database import (
+    iter_banned_users,
+    iter_gbanned,
+    load_afk_users,
+)
+from Dolbymusic.utils.served import flush_served
+from Dolbymusic.utils.stream.journal import journal
 from config import BANNED_USERS
 
 
-async def init():
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
-        LOGGER(__name__).error("Assistant client variables not defined, exiting...")
-        exit()
+class StartupTimeline:
+    """Logs how long each startup phase took, then a summary once the bot is up."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases = []
+
+    async def phase(self, name, coro):
+        begin = time.monotonic()
+        try:
+            return await coro
+        finally:
+            elapsed = time.monotonic() - begin
+            self.phases.append((name, elapsed))
+            LOGGER("Dolbymusic").info(f"[startup] {name} finished in {elapsed:.2f}s")
+
+    def report(self):
+        total = time.monotonic() - self.started
+        lines = "\n".join(f"  {name:<20} {elapsed:6.2f}s" for name, elapsed in self.phases)
+        LOGGER("Dolbymusic").info(f"[startup] ready in {total:.2f}s\n{lines}")
+
+
+async def load_banned_users():
     try:
-        users = await get_gbanned()
-        for user_id in users:
+        async for user_id in iter_gbanned():
             BANNED_USERS.add(user_id)
-        users = await get_banned_users()
-        for user_id in users:
+        async for user_id in iter_banned_users():
             BANNED_USERS.add(user_id)
     except:
         pass
-    await sudo()
-    await app.start()
+
+
+async def load_plugins():
     LOGGER("Dolbymusic.plugins").info(f"Loading {len(ALL_MODULES)} modules...")
     loaded_count = 0
     for all_module in ALL_MODULES:
@@ -44,10 +64,37 @@ async def init():
         except Exception as e:
             LOGGER("Dolbymusic.plugins").error(f"✗ Failed to load {all_module}: {e}")
     LOGGER("Dolbymusic.plugins").info(f"Successfully Imported {loaded_count}/{len(ALL_MODULES)} Modules...")
-    await userbot.start()
-    await AyushSolo.start()
+
+
+async def init():
+    if not any(config.STRING_SESSIONS):
+        LOGGER(__name__).error("Assistant client variables not defined, exiting...")
+        exit()
+    timeline = StartupTimeline()
+    # Indexing may rewrite collections, so it finishes before anything reads them.
+    await timeline.phase("storage", storage.start())
+    await asyncio.gather(
+        timeline.phase("banned users", load_banned_users()),
+        timeline.phase("afk users", load_afk_users()),
+        timeline.phase("sudoers", sudo()),
+        timeline.phase("youtube client", YouTube.start()),
+    )
+    # The bot, the assistants and their PyTgCalls clients are separate
+    # connections, so they log in side by side.
+    async def start_bot():
+        await timeline.phase("bot", app.start())
+        await timeline.phase("plugins", load_plugins())
+
+    await asyncio.gather(
+        start_bot(),
+        timeline.phase("assistants", userbot.start()),
+        timeline.phase("pytgcalls", AyushSolo.start()),
+    )
     try:
-        await AyushSolo.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
+        await timeline.phase(
+            "stream probe",
+            AyushSolo.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4"),
+        )
     except NoActiveGroupCall:
         LOGGER("Dolbymusic").error(
             "Please turn on the videochat of your log group\channel.\n\nStopping Bot..."
@@ -56,12 +103,19 @@ async def init():
     except:
         pass
     await AyushSolo.decorators()
+    await timeline.phase("resume playback", journal.resume())
+    journal.start()
+    timeline.report()
     LOGGER("Dolbymusic").info(
         "\x41\x6e\x6f\x6e\x58\x20\x4d\x75\x73\x69\x63\x20\x42\x6f\x74\x20\x53\x74\x61\x72\x74\x65\x64\x20\x53\x75\x63\x63\x65\x73\x73\x66\x75\x6c\x6c\x79\x2e\n\n\x44\x6f\x6e'\x74\x20\x66\x6f\x72\x67\x65\x74\x20\x74\x6f\x20\x76\x69\x73\x69\x74\x20\x40\x46\x61\x6c\x6c\x65\x6e\x41\x73\x73\x6f\x63\x69\x61\x74\x69\x6f\x6e"
     )
     await idle()
+    await journal.stop()
+    await flush_served()
+    await storage.close()
     await app.stop()
     await userbot.stop()
+    await YouTube.close()
     LOGGER("Dolbymusic").info("Stopping AnonX Music Bot...")
 
 
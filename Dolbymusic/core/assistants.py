@@ -0,0 +1,146 @@
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import config
+
+from ..logging import LOGGER
+
+
+class Assistant:
+    """One assistant account: its userbot client, its PyTgCalls instance and its load."""
+
+    def __init__(self, number: int, client):
+        self.number = number
+        self.client = client
+        self.call = None
+        self.started = False
+        self.calls = {}
+        self.errors = deque()
+        self.successes = deque()
+
+    @property
+    def ready(self) -> bool:
+        """Logged in and with a working PyTgCalls client."""
+        return self.started and self.call is not None
+
+    @property
+    def load(self) -> int:
+        """Each call runs an ffmpeg process; video ones cost roughly twice as much."""
+        return sum(2 if video else 1 for video in self.calls.values())
+
+    def _trim(self, now: float):
+        horizon = now - config.ASSISTANT_ERROR_WINDOW
+        for events in (self.errors, self.successes):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def error_rate(self) -> float:
+        self._trim(time.monotonic())
+        total = len(self.errors) + len(self.successes)
+        return len(self.errors) / total if total else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        if not self.ready:
+            return False
+        self._trim(time.monotonic())
+        if len(self.errors) < config.ASSISTANT_MIN_ERRORS:
+            return True
+        return self.error_rate() < config.ASSISTANT_MAX_ERROR_RATE
+
+
+class AssistantPool:
+    """
+    Tracks every configured assistant and hands new chats to the least-loaded
+    healthy one. A chat keeps its assistant while it is in a call; once that
+    assistant starts failing, the chat is moved on its next join.
+    """
+
+    def __init__(self):
+        self.assistants: Dict[int, Assistant] = {}
+
+    def add(self, number: int, client) -> Assistant:
+        assistant = Assistant(number, client)
+        self.assistants[number] = assistant
+        return assistant
+
+    def get(self, number) -> Optional[Assistant]:
+        try:
+            return self.assistants.get(int(number))
+        except (TypeError, ValueError):
+            return None
+
+    def client(self, number):
+        assistant = self.get(number)
+        return assistant.client if assistant else None
+
+    def call(self, number):
+        assistant = self.get(number)
+        return assistant.call if assistant else None
+
+    @property
+    def numbers(self) -> List[int]:
+        return [n for n, assistant in self.assistants.items() if assistant.ready]
+
+    def usable(self, number, chat_id: int = None) -> bool:
+        """
+        Whether a chat may stay on this assistant. A failing assistant keeps
+        the chats it is already streaming in, but nothing new.
+        """
+        assistant = self.get(number)
+        if not assistant or not assistant.ready:
+            return False
+        return assistant.healthy or chat_id in assistant.calls
+
+    def pick(self) -> Optional[int]:
+        ready = [a for a in self.assistants.values() if a.ready]
+        if not ready:
+            return None
+        candidates = [a for a in ready if a.healthy] or ready
+        best = min(candidates, key=lambda a: (a.load, a.error_rate(), a.number))
+        return best.number
+
+    def attach(self, chat_id: int, number, video=False):
+        self.detach(chat_id)
+        assistant = self.get(number)
+        if assistant:
+            assistant.calls[chat_id] = bool(video)
+
+    def detach(self, chat_id: int):
+        for assistant in self.assistants.values():
+            assistant.calls.pop(chat_id, None)
+
+    def record(self, number, ok: bool):
+        assistant = self.get(number)
+        if not assistant:
+            return
+        was_healthy = assistant.healthy
+        (assistant.successes if ok else assistant.errors).append(time.monotonic())
+        if was_healthy and not assistant.healthy:
+            LOGGER(__name__).warning(
+                f"Assistant {assistant.number} is failing "
+                f"({assistant.error_rate():.0%} errors), moving new chats off it"
+            )
+
+    def number_of(self, call) -> Optional[int]:
+        """Reverse lookup from a PyTgCalls instance, used by stream event handlers."""
+        for assistant in self.assistants.values():
+            if assistant.call is call:
+                return assistant.number
+        return None
+
+    def stats(self) -> dict:
+        return {
+            n: {
+                "ready": a.ready,
+                "healthy": a.healthy,
+                "calls": len(a.calls),
+                "load": a.load,
+                "error_rate": round(a.error_rate(), 3),
+            }
+            for n, a in self.assistants.items()
+        }
+
+
+pool = AssistantPool()
@@ -1,6 +1,4 @@
 import asyncio
-import os
-from datetime import datetime, timedelta
 from typing import Union
 
 from pyrogram import Client
@@ -12,13 +10,19 @@ from pytgcalls.exceptions import (
     NoActiveGroupCall,
     TelegramServerError,
 )
-from pytgcalls.types import Update
+from pytgcalls.types import (
+    JoinedGroupCallParticipant,
+    LeftGroupCallParticipant,
+    Update,
+)
 from pytgcalls.types.input_stream import AudioPiped, AudioVideoPiped
 from pytgcalls.types.input_stream.quality import HighQualityAudio, MediumQualityVideo
 from pytgcalls.types.stream import StreamAudioEnded
 
 import config
+from config import time_to_seconds
 from Dolbymusic import LOGGER, YouTube, app
+from Dolbymusic.core.assistants import pool
 from Dolbymusic.misc import db
 from Dolbymusic.utils.database import (
     add_active_chat,
@@ -26,6 +30,7 @@ from Dolbymusic.utils.database import (
     get_lang,
     get_loop,
     group_assistant,
+    is_active_chat,
     is_autoend,
     music_on,
     remove_active_chat,
@@ -33,94 +38,75 @@ from Dolbymusic.utils.database import (
     set_loop,
 )
 from Dolbymusic.utils.exceptions import AssistantErr
-from Dolbymusic.utils.formatters import check_duration, seconds_to_min, speed_converter
 from Dolbymusic.utils.inline.play import stream_markup
-from Dolbymusic.utils.stream.autoclear import auto_clean
+from Dolbymusic.utils.stream.autoclear import auto_clean, clear_queue
+from Dolbymusic.utils.stream.prefetch import prefetcher
+from Dolbymusic.utils.stream.queue import bind_queue_file
+from Dolbymusic.utils.stream.state import chat_playback
+from Dolbymusic.utils.stream.transcode import playback_cache
 from Dolbymusic.utils.thumbnails import get_thumb
+from Dolbymusic.utils.timers import timers
 from strings import get_string
 
-autoend = {}
 counter = {}
 
+# Seconds an assistant stays in a call with nobody listening.
+AUTO_END_TIME = 60
+
 
 async def _clear_(chat_id):
-    db[chat_id] = []
+    prefetcher.cancel(chat_id)
+    await clear_queue(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
+    pool.detach(chat_id)
+
+
+def _speed_parameters(position: int, end: int, speed, video: bool) -> str:
+    """
+    ffmpeg parameters that play seconds position..end of the original file
+    at the given speed. Audio goes through atempo after the input; video has
+    its timestamps rescaled on input, as PyTgCalls appends its own -vf scale.
+    """
+    seek = f"-ss {position} -to {end}"
+    if float(speed) == 1.0:
+        return seek
+    audio = f"--audio {seek} -atmid -filter:a atempo={speed}"
+    if not video:
+        return audio
+    return f"{audio} --video -itsscale {1 / float(speed):.4f} {seek}"
 
 
 class Call(PyTgCalls):
     def __init__(self):
-        self.userbot1 = Client(
-            name="Dolbymusic1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-        )
-        self.one = PyTgCalls(
-            self.userbot1,
-            cache_duration=100,
-        )
-        self.userbot2 = Client(
-            name="Dolbymusic2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-        )
-        self.two = PyTgCalls(
-            self.userbot2,
-            cache_duration=100,
-        )
-        self.userbot3 = Client(
-            name="Dolbymusic3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-        )
-        self.three = PyTgCalls(
-            self.userbot3,
-            cache_duration=100,
-        )
-        self.userbot4 = Client(
-            name="Dolbymusic4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-        )
-        self.four = PyTgCalls(
-            self.userbot4,
-            cache_duration=100,
-        )
-        self.userbot5 = Client(
-            name="Dolbymusic5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-        )
-        self.five = PyTgCalls(
-            self.userbot5,
-            cache_duration=100,
-        )
-        self.userbot6 = Client(
-            name="Dolbymusic6",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING6),
-        )
-        self.six = PyTgCalls(
-            self.userbot6,
-            cache_duration=100,
-        )
-        self.userbot7 = Client(
-            name="Dolbymusic7",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING7),
-        )
-        self.seven = PyTgCalls(
-            self.userbot7,
-            cache_duration=100,
-        )
+        self.calls = {}
+        for number, session in enumerate(config.STRING_SESSIONS, start=1):
+            if not session:
+                continue
+            self.calls[number] = PyTgCalls(
+                Client(
+                    name=f"Dolbymusic{number}",
+                    api_id=config.API_ID,
+                    api_hash=config.API_HASH,
+                    session_string=str(session),
+                ),
+                cache_duration=100,
+            )
+            assistant = pool.get(number)
+            if assistant:
+                assistant.call = self.calls[number]
+
+    async def _change(self, client, chat_id: int, stream, video=False):
+        """change_stream that feeds the assistant's error rate in the pool."""
+        number = pool.number_of(client)
+        try:
+            await client.change_stream(chat_id, stream)
+        except:
+            pool.record(number, False)
+            raise
+        pool.record(number, True)
+        pool.attach(chat_id, number, video)
+        chat_playback(chat_id).start_clock()
 
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
@@ -139,124 +125,73 @@ class Call(PyTgCalls):
             pass
 
     async def stop_stream_force(self, chat_id: int):
-        try:
-            if config.STRING1:
-                await self.one.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING2:
-                await self.two.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING3:
-                await self.three.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING4:
-                await self.four.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING5:
-                await self.five.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING6:
-                await self.six.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING7:
-                await self.seven.leave_group_call(chat_id)
-        except:
-            pass
+        for call in self.calls.values():
+            try:
+                await call.leave_group_call(chat_id)
+            except:
+                pass
         try:
             await _clear_(chat_id)
         except:
             pass
 
-    async def speedup_stream(self, chat_id: int, file_path, speed, playing):
+    async def speedup_stream(self, chat_id: int, file_path, speed):
+        """
+        Change speed from the current position. The original file is played
+        through atempo/setpts filters unless a pre-rendered variant is ready.
+        """
         assistant = await group_assistant(self, chat_id)
-        if str(speed) != str("1.0"):
-            base = os.path.basename(file_path)
-            chatdir = os.path.join(os.getcwd(), "playback", str(speed))
-            if not os.path.isdir(chatdir):
-                os.makedirs(chatdir)
-            out = os.path.join(chatdir, base)
-            if not os.path.isfile(out):
-                if str(speed) == str("0.5"):
-                    vs = 2.0
-                if str(speed) == str("0.75"):
-                    vs = 1.35
-                if str(speed) == str("1.5"):
-                    vs = 0.68
-                if str(speed) == str("2.0"):
-                    vs = 0.5
-                proc = await asyncio.create_subprocess_shell(
-                    cmd=(
-                        "ffmpeg "
-                        "-i "
-                        f"{file_path} "
-                        "-filter:v "
-                        f"setpts={vs}*PTS "
-                        "-filter:a "
-                        f"atempo={speed} "
-                        f"{out}"
-                    ),
-                    stdin=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                await proc.communicate()
-            else:
-                pass
+        state = db[chat_id]
+        entry = state.current
+        video = entry.video
+        factor = float(speed)
+        # The entry keeps the original duration; the clock runs in sped-up time.
+        total = int(entry.seconds)
+        position = state.position
+        duration = int(total / factor)
+        played = int(position / factor)
+        rendered = playback_cache.get(file_path, speed) if factor != 1.0 else None
+        if rendered:
+            parameters = f"-ss {played} -to {duration}"
         else:
-            out = file_path
-        dur = await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
-        dur = int(dur)
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
-        duration = seconds_to_min(dur)
+            parameters = _speed_parameters(position, total, speed, video)
+            if factor != 1.0 and config.SPEED_PRERENDER:
+                playback_cache.schedule(file_path, speed)
         stream = (
             AudioVideoPiped(
-                out,
+                rendered or file_path,
                 audio_parameters=HighQualityAudio(),
                 video_parameters=MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+                additional_ffmpeg_parameters=parameters,
             )
-            if playing[0]["streamtype"] == "video"
+            if video
             else AudioPiped(
-                out,
+                rendered or file_path,
                 audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+                additional_ffmpeg_parameters=parameters,
             )
         )
-        if str(db[chat_id][0]["file"]) == str(file_path):
-            await assistant.change_stream(chat_id, stream)
-        else:
+        if state.current is not entry:
             raise AssistantErr("Umm")
-        if str(db[chat_id][0]["file"]) == str(file_path):
-            exis = (playing[0]).get("old_dur")
-            if not exis:
-                db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
-                db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-            db[chat_id][0]["played"] = con_seconds
-            db[chat_id][0]["dur"] = duration
-            db[chat_id][0]["seconds"] = dur
-            db[chat_id][0]["speed_path"] = out
-            db[chat_id][0]["speed"] = speed
+        await assistant.change_stream(chat_id, stream)
+        if state.current is entry:
+            state.speed = factor
+            state.speed_path = rendered
+            state.start_clock(played)
 
     async def force_stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         try:
             check = db.get(chat_id)
-            check.pop(0)
+            popped = check.pop()
+            check.clock = None
+            await auto_clean(popped)
+            prefetcher.schedule(chat_id)
         except:
             pass
         await remove_active_video_chat(chat_id)
         await remove_active_chat(chat_id)
+        pool.detach(chat_id)
         try:
             await assistant.leave_group_call(chat_id)
         except:
@@ -282,21 +217,32 @@ class Call(PyTgCalls):
             chat_id,
             stream,
         )
+        chat_playback(chat_id).start_clock()
 
-    async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
+    async def seek_stream(self, chat_id, file_path, to_seek, duration, mode, speed=1.0):
+        """to_seek and duration are in sped-up time when speed is applied live."""
         assistant = await group_assistant(self, chat_id)
+        parameters = f"-ss {to_seek} -to {duration}"
+        if float(speed or 1.0) != 1.0:
+            factor = float(speed)
+            parameters = _speed_parameters(
+                int(time_to_seconds(to_seek) * factor),
+                int(time_to_seconds(duration) * factor),
+                speed,
+                mode == "video",
+            )
         stream = (
             AudioVideoPiped(
                 file_path,
                 audio_parameters=HighQualityAudio(),
                 video_parameters=MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                additional_ffmpeg_parameters=parameters,
             )
             if mode == "video"
             else AudioPiped(
                 file_path,
                 audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                additional_ffmpeg_parameters=parameters,
             )
         )
         await assistant.change_stream(chat_id, stream)
@@ -318,26 +264,27 @@ class Call(PyTgCalls):
         link,
         video: Union[bool, str] = None,
         image: Union[bool, str] = None,
+        position: int = 0,
     ):
+        """position: seconds to start at, used when resuming after a restart."""
         assistant = await group_assistant(self, chat_id)
         language = await get_lang(chat_id)
         _ = get_string(language)
+        parameters = f"-ss {position}" if position else ""
         if video:
             stream = AudioVideoPiped(
                 link,
                 audio_parameters=HighQualityAudio(),
                 video_parameters=MediumQualityVideo(),
+                additional_ffmpeg_parameters=parameters,
             )
         else:
-            stream = (
-                AudioVideoPiped(
-                    link,
-                    audio_parameters=HighQualityAudio(),
-                    video_parameters=MediumQualityVideo(),
-                )
-                if video
-                else AudioPiped(link, audio_parameters=HighQualityAudio())
+            stream = AudioPiped(
+                link,
+                audio_parameters=HighQualityAudio(),
+                additional_ffmpeg_parameters=parameters,
             )
+        number = pool.number_of(assistant)
         try:
             await assistant.join_group_call(
                 chat_id,
@@ -349,7 +296,14 @@ class Call(PyTgCalls):
         except AlreadyJoinedError:
             raise AssistantErr(_["call_9"])
         except TelegramServerError:
+            pool.record(number, False)
             raise AssistantErr(_["call_10"])
+        except:
+            pool.record(number, False)
+            raise
+        pool.record(number, True)
+        pool.attach(chat_id, number, video)
+        chat_playback(chat_id).start_clock(position)
         await add_active_chat(chat_id)
         await music_on(chat_id)
         if video:
@@ -358,7 +312,7 @@ class Call(PyTgCalls):
             counter[chat_id] = {}
             users = len(await assistant.get_participants(chat_id))
             if users == 1:
-                autoend[chat_id] = datetime.now() + timedelta(minutes=1)
+                timers.schedule("autoend", chat_id, AUTO_END_TIME)
 
     async def change_stream(self, client, chat_id):
         check = db.get(chat_id)
@@ -366,7 +320,7 @@ class Call(PyTgCalls):
         loop = await get_loop(chat_id)
         try:
             if loop == 0:
-                popped = check.pop(0)
+                popped = check.pop()
             else:
                 loop = loop - 1
                 await set_loop(chat_id, loop)
@@ -374,6 +328,7 @@ class Call(PyTgCalls):
             if not check:
                 await _clear_(chat_id)
                 return await client.leave_group_call(chat_id)
+            prefetcher.schedule(chat_id)
         except:
             try:
                 await _clear_(chat_id)
@@ -381,22 +336,16 @@ class Call(PyTgCalls):
             except:
                 return
         else:
-            queued = check[0]["file"]
+            queued = check[0].file
             language = await get_lang(chat_id)
             _ = get_string(language)
-            title = (check[0]["title"]).title()
-            user = check[0]["by"]
-            user_id = check[0]["user_id"]
-            original_chat_id = check[0]["chat_id"]
-            streamtype = check[0]["streamtype"]
-            videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
-            exis = (check[0]).get("old_dur")
-            if exis:
-                db[chat_id][0]["dur"] = exis
-                db[chat_id][0]["seconds"] = check[0]["old_second"]
-                db[chat_id][0]["speed_path"] = None
-                db[chat_id][0]["speed"] = 1.0
+            title = (check[0].title).title()
+            user = check[0].by
+            user_id = check[0].user_id
+            original_chat_id = check[0].chat_id
+            streamtype = check[0].streamtype
+            videoid = check[0].vidid
+            check.reset_speed()
             video = True if str(streamtype) == "video" else False
             if "live_" in queued:
                 n, link = await YouTube.video(videoid, True)
@@ -417,7 +366,7 @@ class Call(PyTgCalls):
                         audio_parameters=HighQualityAudio(),
                     )
                 try:
-                    await client.change_stream(chat_id, stream)
+                    await self._change(client, chat_id, stream, video)
                 except Exception:
                     return await app.send_message(
                         original_chat_id,
@@ -431,14 +380,14 @@ class Call(PyTgCalls):
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        check[0].dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id].mystic = run
+                db[chat_id].markup = "tg"
             elif "vid_" in queued:
                 mystic = await app.send_message(original_chat_id, _["call_7"])
                 try:
@@ -452,6 +401,7 @@ class Call(PyTgCalls):
                     return await mystic.edit_text(
                         _["call_6"], disable_web_page_preview=True
                     )
+                await bind_queue_file(chat_id, file_path)
                 if video:
                     stream = AudioVideoPiped(
                         file_path,
@@ -464,7 +414,7 @@ class Call(PyTgCalls):
                         audio_parameters=HighQualityAudio(),
                     )
                 try:
-                    await client.change_stream(chat_id, stream)
+                    await self._change(client, chat_id, stream, video)
                 except:
                     return await app.send_message(
                         original_chat_id,
@@ -479,14 +429,14 @@ class Call(PyTgCalls):
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        check[0].dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                db[chat_id].mystic = run
+                db[chat_id].markup = "stream"
             elif "index_" in queued:
                 stream = (
                     AudioVideoPiped(
@@ -498,7 +448,7 @@ class Call(PyTgCalls):
                     else AudioPiped(videoid, audio_parameters=HighQualityAudio())
                 )
                 try:
-                    await client.change_stream(chat_id, stream)
+                    await self._change(client, chat_id, stream, video)
                 except:
                     return await app.send_message(
                         original_chat_id,
@@ -512,8 +462,8 @@ class Call(PyTgCalls):
                     reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id].mystic = run
+                db[chat_id].markup = "tg"
             else:
                 if video:
                     stream = AudioVideoPiped(
@@ -527,7 +477,7 @@ class Call(PyTgCalls):
                         audio_parameters=HighQualityAudio(),
                     )
                 try:
-                    await client.change_stream(chat_id, stream)
+                    await self._change(client, chat_id, stream, video)
                 except:
                     return await app.send_message(
                         original_chat_id,
@@ -541,26 +491,26 @@ class Call(PyTgCalls):
                         if str(streamtype) == "audio"
                         else config.TELEGRAM_VIDEO_URL,
                         caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                            config.SUPPORT_CHAT, title[:23], check[0].dur, user
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     parse_mode=ParseMode.HTML,
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    db[chat_id].mystic = run
+                    db[chat_id].markup = "tg"
                 elif videoid == "soundcloud":
                     button = stream_markup(_, chat_id)
                     run = await app.send_photo(
                         chat_id=original_chat_id,
                         photo=config.SOUNCLOUD_IMG_URL,
                         caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                            config.SUPPORT_CHAT, title[:23], check[0].dur, user
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     parse_mode=ParseMode.HTML,
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    db[chat_id].mystic = run
+                    db[chat_id].markup = "tg"
                 else:
                     img = await get_thumb(videoid, user_id)
                     button = stream_markup(_, chat_id)
@@ -570,86 +520,88 @@ class Call(PyTgCalls):
                         caption=_["stream_1"].format(
                             f"https://t.me/{app.username}?start=info_{videoid}",
                             title[:23],
-                            check[0]["dur"],
+                            check[0].dur,
                             user,
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     parse_mode=ParseMode.HTML,
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "stream"
+                    db[chat_id].mystic = run
+                    db[chat_id].markup = "stream"
 
     async def ping(self):
+        numbers = pool.numbers
+        results = await asyncio.gather(
+            *[
+                asyncio.wait_for(pool.call(number).ping, config.ASSISTANT_PING_TIMEOUT)
+                for number in numbers
+            ],
+            return_exceptions=True,
+        )
         pings = []
-        if config.STRING1:
-            pings.append(await self.one.ping)
-        if config.STRING2:
-            pings.append(await self.two.ping)
-        if config.STRING3:
-            pings.append(await self.three.ping)
-        if config.STRING4:
-            pings.append(await self.four.ping)
-        if config.STRING5:
-            pings.append(await self.five.ping)
-        if config.STRING6:
-            pings.append(await self.six.ping)
-        if config.STRING7:
-            pings.append(await self.seven.ping)
+        for number, result in zip(numbers, results):
+            if isinstance(result, BaseException):
+                pool.record(number, False)
+            else:
+                pings.append(result)
+        if not pings:
+            return "0"
         return str(round(sum(pings) / len(pings), 3))
 
     async def start(self):
         LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
-        if config.STRING6:
-            await self.six.start()
-        if config.STRING7:
-            await self.seven.start()
+        numbers = list(self.calls)
+        results = await asyncio.gather(
+            *[
+                asyncio.wait_for(self.calls[number].start(), config.ASSISTANT_START_TIMEOUT)
+                for number in numbers
+            ],
+            return_exceptions=True,
+        )
+        for number, result in zip(numbers, results):
+            if isinstance(result, BaseException):
+                LOGGER(__name__).error(
+                    f"PyTgCalls client {number} failed to start: {type(result).__name__}: {result}"
+                )
+                assistant = pool.get(number)
+                if assistant:
+                    assistant.call = None
 
     async def decorators(self):
-        @self.one.on_kicked()
-        @self.two.on_kicked()
-        @self.three.on_kicked()
-        @self.four.on_kicked()
-        @self.five.on_kicked()
-        @self.six.on_kicked()
-        @self.seven.on_kicked()
-        @self.one.on_closed_voice_chat()
-        @self.two.on_closed_voice_chat()
-        @self.three.on_closed_voice_chat()
-        @self.four.on_closed_voice_chat()
-        @self.five.on_closed_voice_chat()
-        @self.six.on_closed_voice_chat()
-        @self.seven.on_closed_voice_chat()
-        @self.one.on_left()
-        @self.two.on_left()
-        @self.three.on_left()
-        @self.four.on_left()
-        @self.five.on_left()
-        @self.six.on_left()
-        @self.seven.on_left()
         async def stream_services_handler(_, chat_id: int):
             await self.stop_stream(chat_id)
 
-        @self.one.on_stream_end()
-        @self.two.on_stream_end()
-        @self.three.on_stream_end()
-        @self.four.on_stream_end()
-        @self.five.on_stream_end()
-        @self.six.on_stream_end()
-        @self.seven.on_stream_end()
         async def stream_end_handler1(client, update: Update):
             if not isinstance(update, StreamAudioEnded):
                 return
             await self.change_stream(client, update.chat_id)
 
+        async def participants_change_handler(client, update: Update):
+            if not isinstance(
+                update, (JoinedGroupCallParticipant, LeftGroupCallParticipant)
+            ):
+                return
+            chat_id = update.chat_id
+            if not await is_active_chat(chat_id):
+                return
+            if isinstance(update, JoinedGroupCallParticipant):
+                timers.cancel("autoend", chat_id)
+                return
+            if not await is_autoend():
+                return
+            try:
+                users = len(await client.get_participants(chat_id))
+            except:
+                return
+            if users == 1:
+                timers.schedule("autoend", chat_id, AUTO_END_TIME)
+
+        for call in self.calls.values():
+            call.on_kicked()(stream_services_handler)
+            call.on_closed_voice_chat()(stream_services_handler)
+            call.on_left()(stream_services_handler)
+            call.on_stream_end()(stream_end_handler1)
+            call.on_participants_change()(participants_change_handler)
+
 
 AyushSolo = Call()
@@ -0,0 +1,82 @@
+from pymongo.errors import OperationFailure
+
+import config
+
+from ..logging import LOGGER
+from .mongo import mongodb
+from .storage import TABLES
+
+# Errors mongod returns when an index on the same key already exists with
+# other options, e.g. one created by hand without unique.
+INDEX_CONFLICTS = (85, 86)
+
+
+async def _duplicates(collection, key: str) -> list:
+    """
+    The _ids of every document but the oldest for each repeated key. Sorting
+    by _id first keeps the document find_one has been returning, since
+    ObjectIds grow in insertion order.
+    """
+    extra = []
+    pipeline = [
+        {"$match": {key: {"$exists": True}}},
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": f"${key}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        extra.extend(group["ids"][1:])
+    return extra
+
+
+async def _ensure_index(name: str, key: str) -> bool:
+    """Index `key` uniquely; False if duplicates were left in the way."""
+    collection = mongodb[name]
+    extra = await _duplicates(collection, key)
+    if extra and not config.MONGO_DEDUPE:
+        LOGGER(__name__).warning(
+            f"{name} has {len(extra)} duplicate {key}s, not indexing it. "
+            "Set MONGO_DEDUPE=True to delete all but the oldest of each."
+        )
+        return False
+    if extra:
+        result = await collection.delete_many({"_id": {"$in": extra}})
+        LOGGER(__name__).warning(
+            f"Removed {result.deleted_count} duplicate {key}s from {name}."
+        )
+    try:
+        await collection.create_index(key, unique=True)
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICTS:
+            raise
+        await collection.drop_index(f"{key}_1")
+        await collection.create_index(key, unique=True)
+    return True
+
+
+async def ensure_indexes():
+    """
+    Create a unique index on the key of every table in TABLES. The applied
+    set is recorded in the migrations collection, so a normal restart costs
+    one lookup and only a changed TABLES map touches the collections again.
+    Collections holding duplicate keys are left unindexed (and retried on
+    the next start) unless MONGO_DEDUPE allows deleting the extras.
+    """
+    applied = await mongodb.migrations.find_one({"_id": "indexes"})
+    wanted = sorted(TABLES.items())
+    if applied and sorted(map(tuple, applied.get("indexes", []))) == wanted:
+        return
+    failed = 0
+    for name, key in wanted:
+        try:
+            if not await _ensure_index(name, key):
+                failed += 1
+        except Exception as e:
+            failed += 1
+            LOGGER(__name__).error(f"Could not index {name}.{key}: {e}")
+    if failed:
+        return
+    await mongodb.migrations.update_one(
+        {"_id": "indexes"}, {"$set": {"indexes": wanted}}, upsert=True
+    )
+    LOGGER(__name__).info(f"Database indexes ready on {len(wanted)} collections.")
@@ -1,14 +1,252 @@
+import asyncio
+import time
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteMany, UpdateOne
 
+import config
 from config import MONGO_DB_URI
 
 from ..logging import LOGGER
+from .storage import TABLES, Storage
+
+
+class QueryProfiler:
+    """
+    Times database calls per table and storage operation ("language.get",
+    "chats.keys", ...). Calls slower than MONGO_SLOW_MS are logged, and the
+    first query of each shape is explained in the background so collection
+    scans show up in the log and in /dbprofile.
+    """
+
+    def __init__(self, slow_ms: int):
+        self.slow = slow_ms / 1000
+        self.operations = {}
+        self._explained = set()
+
+    def _entry(self, key: str) -> dict:
+        entry = self.operations.get(key)
+        if entry is None:
+            entry = self.operations[key] = {
+                "calls": 0,
+                "total": 0.0,
+                "slow": 0,
+                "scans": 0,
+            }
+        return entry
+
+    def record(self, key: str, elapsed: float, collection=None, query=None):
+        entry = self._entry(key)
+        entry["calls"] += 1
+        entry["total"] += elapsed
+        if elapsed >= self.slow:
+            entry["slow"] += 1
+            LOGGER(__name__).warning(
+                f"Slow query: {key} took {elapsed * 1000:.0f}ms, filter {query}"
+            )
+        if collection is not None and isinstance(query, dict):
+            self._check_scan(key, collection, query)
+
+    async def time(self, key: str, coro, collection=None, query=None):
+        begin = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.record(key, time.perf_counter() - begin, collection, query)
+
+    def _check_scan(self, key: str, collection, query: dict):
+        shape = (key, tuple(sorted(query)))
+        if shape in self._explained:
+            return
+        self._explained.add(shape)
+        asyncio.ensure_future(self._explain(key, collection, query))
+
+    async def _explain(self, key: str, collection, query: dict):
+        try:
+            plan = await collection.find(query).explain()
+        except Exception:
+            return
+        if "COLLSCAN" in str(plan.get("queryPlanner", {}).get("winningPlan")):
+            self._entry(key)["scans"] += 1
+            LOGGER(__name__).warning(
+                f"Collection scan: {key} with filter on {sorted(query) or 'nothing'}"
+            )
+
+    def stats(self) -> dict:
+        return {
+            key: dict(entry, avg=entry["total"] / entry["calls"] if entry["calls"] else 0)
+            for key, entry in sorted(
+                self.operations.items(),
+                key=lambda item: item[1]["total"],
+                reverse=True,
+            )
+        }
+
+
+profiler = QueryProfiler(config.MONGO_SLOW_MS) if config.MONGO_PROFILE else None
 
 LOGGER(__name__).info("Connecting to your Mongo Database...")
 try:
     _mongo_async_ = AsyncIOMotorClient(MONGO_DB_URI)
     mongodb = _mongo_async_.Anon
+    if profiler:
+        LOGGER(__name__).info("Mongo query profiling is on.")
     LOGGER(__name__).info("Connected to your Mongo Database.")
 except:
     LOGGER(__name__).error("Failed to connect to your Mongo Database.")
     exit()
+
+
+class MongoStorage(Storage):
+    """Storage on the Mongo database at MONGO_DB_URI, one collection per table."""
+
+    name = "mongo"
+    profiler = profiler
+
+    def __init__(self):
+        self.db = mongodb
+
+    def _query(self, table: str, key) -> dict:
+        return {TABLES[table]: key}
+
+    def _time(self, table: str, op: str, coro, query=None):
+        """Await `coro`, timed under "table.op" when profiling is on."""
+        if not self.profiler:
+            return coro
+        return self.profiler.time(f"{table}.{op}", coro, self.db[table], query)
+
+    @staticmethod
+    def _range(field: str, start, stop, after=None) -> dict:
+        bounds = {}
+        if start is not None:
+            bounds["$gte"] = start
+        if stop is not None:
+            bounds["$lt"] = stop
+        query = {field: bounds} if bounds else {}
+        if after is None:
+            return query
+        return {"$and": [query, {field: {"$gt": after}}]}
+
+    async def start(self):
+        from .indexes import ensure_indexes
+
+        await ensure_indexes()
+
+    async def get(self, table, key):
+        query = self._query(table, key)
+        return await self._time(
+            table, "get", self.db[table].find_one(query, {"_id": 0}), query
+        )
+
+    async def exists(self, table, key):
+        query = self._query(table, key)
+        document = await self._time(
+            table, "exists", self.db[table].find_one(query, {"_id": 1}), query
+        )
+        return bool(document)
+
+    async def set(self, table, key, fields):
+        query = self._query(table, key)
+        await self._time(
+            table,
+            "set",
+            self.db[table].update_one(query, {"$set": {**fields, **query}}, upsert=True),
+            query,
+        )
+
+    async def add(self, table, key):
+        query = self._query(table, key)
+        result = await self._time(
+            table,
+            "add",
+            self.db[table].update_one(query, {"$setOnInsert": query}, upsert=True),
+            query,
+        )
+        return result.upserted_id is not None
+
+    async def delete(self, table, key):
+        query = self._query(table, key)
+        # delete_many: older versions could insert the same key twice.
+        result = await self._time(
+            table, "delete", self.db[table].delete_many(query), query
+        )
+        return result.deleted_count > 0
+
+    async def write_many(self, table, changes):
+        operations = []
+        for key, fields in changes.items():
+            query = self._query(table, key)
+            if fields is None:
+                operations.append(DeleteMany(query))
+            else:
+                operations.append(
+                    UpdateOne(query, {"$set": {**fields, **query}}, upsert=True)
+                )
+        if operations:
+            await self._time(
+                table, "write_many", self.db[table].bulk_write(operations, ordered=False)
+            )
+
+    async def _pages(self, table, op, start, stop, batch_size, projection):
+        """
+        One query per page, each continuing after the last key seen (served
+        by the unique index on it), so no cursor is left to time out while a
+        broadcast spends minutes between items.
+        """
+        field = TABLES[table]
+        batch_size = batch_size or config.DB_BATCH_SIZE
+        after = None
+        while True:
+            query = self._range(field, start, stop, after)
+            page = await self._time(
+                table,
+                op,
+                self.db[table]
+                .find(query, projection)
+                .sort(field, 1)
+                .to_list(length=batch_size),
+                query,
+            )
+            if page:
+                yield page
+            if len(page) < batch_size:
+                return
+            after = page[-1][field]
+
+    async def keys(self, table, start=None, stop=None, batch_size=None):
+        field = TABLES[table]
+        async for page in self._pages(
+            table, "keys", start, stop, batch_size, {field: 1, "_id": 0}
+        ):
+            for document in page:
+                yield document[field]
+
+    async def items(self, table, start=None, stop=None, batch_size=None):
+        field = TABLES[table]
+        async for page in self._pages(
+            table, "items", start, stop, batch_size, {"_id": 0}
+        ):
+            for document in page:
+                yield document[field], document
+
+    async def count(self, table, start=None, stop=None, estimated=False):
+        if estimated:
+            return await self._time(
+                table, "count", self.db[table].estimated_document_count()
+            )
+        query = self._range(TABLES[table], start, stop)
+        return await self._time(
+            table, "count", self.db[table].count_documents(query), query
+        )
+
+    async def clear(self, table):
+        await self._time(table, "clear", self.db[table].delete_many({}))
+
+    async def stats(self):
+        call = await self.db.command("dbstats")
+        return {
+            "data_size": call["dataSize"],
+            "storage_size": call["storageSize"],
+            "tables": call["collections"],
+            "records": call["objects"],
+        }
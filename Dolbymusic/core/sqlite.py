@@ -0,0 +1,171 @@
+import asyncio
+import json
+import sqlite3
+
+import config
+
+from ..logging import LOGGER
+from .storage import TABLES, Storage
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage in a local SQLite file: one table per TABLES entry, each record
+    kept as JSON under its key.
+
+    The file is in WAL mode with synchronous=NORMAL, so commits don't wait
+    on fsync and a settings read is an in-process B-tree lookup. Statements
+    therefore run directly on the event loop; each call is a single indexed
+    statement, far cheaper than handing it to a thread.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for table in TABLES:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" '
+                "(key PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+            )
+        LOGGER(__name__).info(f"Using the local database at {path}.")
+
+    def _execute(self, table: str, sql: str, parameters=()):
+        # TABLES doubles as the whitelist for the names formatted into SQL.
+        TABLES[table]
+        return self.conn.execute(sql.format(table=f'"{table}"'), parameters)
+
+    @staticmethod
+    def _range(start, stop, after=None):
+        clauses, parameters = [], []
+        for operator, value in ((">=", start), ("<", stop), (">", after)):
+            if value is not None:
+                clauses.append(f"key {operator} ?")
+                parameters.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, parameters
+
+    @staticmethod
+    def _record(table: str, key, value: str) -> dict:
+        record = json.loads(value)
+        record[TABLES[table]] = key
+        return record
+
+    def _merged(self, table: str, key, fields: dict) -> str:
+        row = self._execute(
+            table, "SELECT value FROM {table} WHERE key = ?", (key,)
+        ).fetchone()
+        record = json.loads(row[0]) if row else {}
+        record.update(fields)
+        record.pop(TABLES[table], None)
+        return json.dumps(record)
+
+    async def close(self):
+        self.conn.close()
+
+    async def get(self, table, key):
+        row = self._execute(
+            table, "SELECT value FROM {table} WHERE key = ?", (key,)
+        ).fetchone()
+        return self._record(table, key, row[0]) if row else None
+
+    async def exists(self, table, key):
+        row = self._execute(table, "SELECT 1 FROM {table} WHERE key = ?", (key,))
+        return row.fetchone() is not None
+
+    async def set(self, table, key, fields):
+        self._execute(
+            table,
+            "INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)",
+            (key, self._merged(table, key, fields)),
+        )
+
+    async def add(self, table, key):
+        cursor = self._execute(
+            table, "INSERT OR IGNORE INTO {table} (key, value) VALUES (?, '{{}}')", (key,)
+        )
+        return cursor.rowcount > 0
+
+    async def delete(self, table, key):
+        cursor = self._execute(table, "DELETE FROM {table} WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    async def write_many(self, table, changes):
+        self.conn.execute("BEGIN")
+        try:
+            for key, fields in changes.items():
+                if fields is None:
+                    self._execute(table, "DELETE FROM {table} WHERE key = ?", (key,))
+                else:
+                    self._execute(
+                        table,
+                        "INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)",
+                        (key, self._merged(table, key, fields)),
+                    )
+        except:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    async def _pages(self, table, start, stop, batch_size, columns):
+        batch_size = batch_size or config.DB_BATCH_SIZE
+        after = None
+        while True:
+            where, parameters = self._range(start, stop, after)
+            page = self._execute(
+                table,
+                f"SELECT {columns} FROM {{table}}{where} ORDER BY key LIMIT ?",
+                (*parameters, batch_size),
+            ).fetchall()
+            if page:
+                yield page
+            if len(page) < batch_size:
+                return
+            after = page[-1][0]
+
+    async def keys(self, table, start=None, stop=None, batch_size=None):
+        async for page in self._pages(table, start, stop, batch_size, "key"):
+            for (key,) in page:
+                yield key
+
+    async def items(self, table, start=None, stop=None, batch_size=None):
+        async for page in self._pages(table, start, stop, batch_size, "key, value"):
+            for key, value in page:
+                yield key, self._record(table, key, value)
+
+    async def count(self, table, start=None, stop=None, estimated=False):
+        where, parameters = self._range(start, stop)
+        row = self._execute(
+            table, f"SELECT COUNT(*) FROM {{table}}{where}", parameters
+        ).fetchone()
+        return row[0]
+
+    async def clear(self, table):
+        self._execute(table, "DELETE FROM {table}")
+
+    def _count_records(self) -> int:
+        # Runs in a thread on its own connection; WAL lets it read alongside
+        # the event loop's.
+        conn = sqlite3.connect(self.path)
+        try:
+            return sum(
+                conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                for table in TABLES
+            )
+        finally:
+            conn.close()
+
+    async def stats(self):
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        free = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return {
+            "data_size": (pages - free) * page_size,
+            "storage_size": pages * page_size,
+            "tables": len(TABLES),
+            # Counting every row is a full scan, so it stays off the loop.
+            "records": await asyncio.to_thread(self._count_records),
+        }
@@ -0,0 +1,124 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Hashable, Optional, Tuple
+
+import config
+
+from ..logging import LOGGER
+
+# Every table the bot stores, with the field its records are keyed by. The
+# names are the Mongo collection names, so existing databases keep working.
+TABLES = {
+    "adminauth": "chat_id",
+    "afk": "user_id",
+    "assistants": "chat_id",
+    "authuser": "chat_id",
+    "autoend": "chat_id",
+    "blacklistChat": "chat_id",
+    "blockedusers": "user_id",
+    "chats": "chat_id",
+    "cplaymode": "chat_id",
+    "gban": "user_id",
+    "language": "chat_id",
+    "onoffper": "on_off",
+    "playback": "chat_id",
+    "playmode": "chat_id",
+    "playtypedb": "chat_id",
+    "skipmode": "chat_id",
+    "sudoers": "sudo",
+    "tgusersdb": "user_id",
+    "upcount": "chat_id",
+    "welcome": "chat_id",
+}
+
+
+class Storage(ABC):
+    """
+    What utils/database.py and friends need from a database: records looked
+    up by a single key in a handful of tables.
+
+    A record is a dict that always includes its key field (see TABLES).
+    `set` merges fields into a record, creating it if needed; `add` and
+    `exists` treat a table as a set of keys. `keys` and `items` walk a key
+    range in order, `start` inclusive and `stop` exclusive.
+    """
+
+    name = ""
+    profiler = None
+
+    async def start(self):
+        """Prepare tables and indexes. Safe to run on every startup."""
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def get(self, table: str, key: Hashable) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def exists(self, table: str, key: Hashable) -> bool:
+        ...
+
+    @abstractmethod
+    async def set(self, table: str, key: Hashable, fields: dict):
+        ...
+
+    @abstractmethod
+    async def add(self, table: str, key: Hashable) -> bool:
+        """Add `key` to the table; False if it was already there."""
+
+    @abstractmethod
+    async def delete(self, table: str, key: Hashable) -> bool:
+        ...
+
+    @abstractmethod
+    async def write_many(self, table: str, changes: Dict[Hashable, Optional[dict]]):
+        """Apply `set` for every key mapped to fields, `delete` for None, at once."""
+
+    @abstractmethod
+    def keys(
+        self, table: str, start=None, stop=None, batch_size: int = None
+    ) -> AsyncIterator[Hashable]:
+        ...
+
+    @abstractmethod
+    def items(
+        self, table: str, start=None, stop=None, batch_size: int = None
+    ) -> AsyncIterator[Tuple[Hashable, dict]]:
+        ...
+
+    @abstractmethod
+    async def count(
+        self, table: str, start=None, stop=None, estimated: bool = False
+    ) -> int:
+        """
+        Count keys in the range. `estimated` may count the whole table from
+        metadata instead, which is instant on large tables.
+        """
+
+    @abstractmethod
+    async def clear(self, table: str):
+        ...
+
+    @abstractmethod
+    async def stats(self) -> dict:
+        """
+        For /stats: data_size and storage_size in bytes, and the number of
+        tables and records.
+        """
+
+
+def _open_storage() -> Storage:
+    backend = config.STORAGE_BACKEND.lower()
+    if backend == "sqlite":
+        from .sqlite import SQLiteStorage
+
+        return SQLiteStorage(config.SQLITE_PATH)
+    if backend != "mongo":
+        LOGGER(__name__).warning(f"Unknown STORAGE_BACKEND {backend!r}, using mongo.")
+    from .mongo import MongoStorage
+
+    return MongoStorage()
+
+
+storage = _open_storage()
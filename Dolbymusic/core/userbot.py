@@ -1,8 +1,11 @@
+import asyncio
+
 from pyrogram import Client
 
 import config
 
 from ..logging import LOGGER
+from .assistants import pool
 
 assistants = []
 assistantids = []
@@ -10,204 +13,70 @@ assistantids = []
 
 class Userbot(Client):
     def __init__(self):
-        self.one = Client(
-            name="Dolbymusic1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-            no_updates=True,
-        )
-        self.two = Client(
-            name="Dolbymusic2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-            no_updates=True,
-        )
-        self.three = Client(
-            name="Dolbymusic3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-            no_updates=True,
-        )
-        self.four = Client(
-            name="Dolbymusic4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-            no_updates=True,
-        )
-        self.five = Client(
-            name="Dolbymusic5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-            no_updates=True,
-        )
-        self.six = Client(
-            name="Dolbymusic6",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING6),
-            no_updates=True,
-        )
-        self.seven = Client(
-            name="Dolbymusic7",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING7),
-            no_updates=True,
-        )
+        self.clients = {}
+        for number, session in enumerate(config.STRING_SESSIONS, start=1):
+            if not session:
+                continue
+            self.clients[number] = Client(
+                name=f"Dolbymusic{number}",
+                api_id=config.API_ID,
+                api_hash=config.API_HASH,
+                session_string=str(session),
+                no_updates=True,
+            )
+            pool.add(number, self.clients[number])
+
+    async def _start_one(self, number: int, client: Client):
+        await client.start()
+        try:
+            await client.join_chat("NOBITA_SUPPORT")
+            await client.join_chat(config.SUPPORT_CHANNEL)
+        except:
+            pass
+        try:
+            await client.send_message(config.LOGGER_ID, f"Assistant {number} Started")
+        except:
+            raise RuntimeError(
+                "failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin!"
+            )
+        client.id = client.me.id
+        client.name = client.me.mention
+        client.username = client.me.username
+        LOGGER(__name__).info(f"Assistant {number} Started as {client.name}")
 
     async def start(self):
+        """
+        Start every assistant at once, each with its own timeout. One that
+        fails is reported and left out of the pool instead of holding up the rest.
+        """
         LOGGER(__name__).info(f"Starting Assistants...")
-        if config.STRING1:
-            await self.one.start()
-            try:
-                await self.one.join_chat("NOBITA_SUPPORT")
-                await self.one.join_chat(config.SUPPORT_CHANNEL)
-            except:
-                pass
-            assistants.append(1)
-            try:
-                await self.one.send_message(config.LOGGER_ID, "Assistant 1 Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 1 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin!"
-                )
-                exit()
-            self.one.id = self.one.me.id
-            self.one.name = self.one.me.mention
-            self.one.username = self.one.me.username
-            assistantids.append(self.one.id)
-            LOGGER(__name__).info(f"Assistant Started as {self.one.name}")
-
-        if config.STRING2:
-            await self.two.start()
-            try:
-                await self.two.join_chat("NOBITA_SUPPORT")
-                await self.two.join_chat(config.SUPPORT_CHANNEL)
-            except:
-                pass
-            assistants.append(2)
-            try:
-                await self.two.send_message(config.LOGGER_ID, "Assistant 2 Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 2 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin!"
-                )
-                exit()
-            self.two.id = self.two.me.id
-            self.two.name = self.two.me.mention
-            self.two.username = self.two.me.username
-            assistantids.append(self.two.id)
-            LOGGER(__name__).info(f"Assistant Two Started as {self.two.name}")
-
-        if config.STRING3:
-            await self.three.start()
-            try:
-                await self.three.join_chat("NOBITA_SUPPORT")
-                await self.three.join_chat(config.SUPPORT_CHANNEL)
-            except:
-                pass
-            assistants.append(3)
-            try:
-                await self.three.send_message(config.LOGGER_ID, "Assistant 3 Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 3 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
-                )
-                exit()
-            self.three.id = self.three.me.id
-            self.three.name = self.three.me.mention
-            self.three.username = self.three.me.username
-            assistantids.append(self.three.id)
-            LOGGER(__name__).info(f"Assistant Three Started as {self.three.name}")
-
-        if config.STRING4:
-            await self.four.start()
-            try:
-                await self.four.join_chat("NOBITA_SUPPORT")
-                await self.four.join_chat(config.SUPPORT_CHANNEL)
-            except:
-                pass
-            assistants.append(4)
-            try:
-                await self.four.send_message(config.LOGGER_ID, "Assistant 4 Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 4 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
-                )
-                exit()
-            self.four.id = self.four.me.id
-            self.four.name = self.four.me.mention
-            self.four.username = self.four.me.username
-            assistantids.append(self.four.id)
-            LOGGER(__name__).info(f"Assistant Four Started as {self.four.name}")
-
-        if config.STRING5:
-            await self.five.start()
-            try:
-                await self.five.join_chat("NOBITA_SUPPORT")
-                await self.five.join_chat(config.SUPPORT_CHANNEL)
-            except:
-                pass
-            assistants.append(5)
-            try:
-                await self.five.send_message(config.LOGGER_ID, "Assistant 5 Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 5 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
+        numbers = list(self.clients)
+        results = await asyncio.gather(
+            *[
+                asyncio.wait_for(
+                    self._start_one(number, self.clients[number]),
+                    config.ASSISTANT_START_TIMEOUT,
                 )
-                exit()
-            self.five.id = self.five.me.id
-            self.five.name = self.five.me.mention
-            self.five.username = self.five.me.username
-            assistantids.append(self.five.id)
-            LOGGER(__name__).info(f"Assistant Five Started as {self.five.name}")
-
-        if config.STRING6:
-            await self.six.start()
-            try:
-                await self.six.join_chat("NOBITA_SUPPORT")
-                await self.six.join_chat(config.SUPPORT_CHANNEL)
-            except:
-                pass
-            assistants.append(6)
-            try:
-                await self.six.send_message(config.LOGGER_ID, "Assistant 6 Started")
-            except:
+                for number in numbers
+            ],
+            return_exceptions=True,
+        )
+        for number, result in zip(numbers, results):
+            if isinstance(result, BaseException):
                 LOGGER(__name__).error(
-                    "Assistant Account 6 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
+                    f"Assistant Account {number} failed to start: {type(result).__name__}: {result}"
                 )
-                exit()
-            self.six.id = self.six.me.id
-            self.six.name = self.six.me.mention
-            self.six.username = self.six.me.username
-            assistantids.append(self.six.id)
-            LOGGER(__name__).info(f"Assistant Six Started as {self.six.name}")
+                continue
+            assistants.append(number)
+            assistantids.append(self.clients[number].id)
+            pool.get(number).started = True
+        if not assistants:
+            LOGGER(__name__).error("No assistant could be started, exiting...")
+            exit()
 
-        if config.STRING7:
-            await self.seven.start()
+    async def stop(self):
+        for client in self.clients.values():
             try:
-                await self.seven.join_chat("NOBITA_SUPPORT")
-                await self.seven.join_chat(config.SUPPORT_CHANNEL)
+                await client.stop()
             except:
                 pass
-            assistants.append(7)
-            try:
-                await self.seven.send_message(config.LOGGER_ID, "Assistant 7 Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 7 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
-                )
-                exit()
-            self.seven.id = self.seven.me.id
-            self.seven.name = self.seven.me.mention
-            self.seven.username = self.seven.me.username
-            assistantids.append(self.seven.id)
-            LOGGER(__name__).info(f"Assistant Seven Started as {self.seven.name}")
-
-            
-
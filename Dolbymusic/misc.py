@@ -5,7 +5,7 @@ import heroku3
 from pyrogram import filters
 
 import config
-from Dolbymusic.core.mongo import mongodb
+from Dolbymusic.core.storage import storage
 
 from .logging import LOGGER
 
@@ -45,16 +45,11 @@ def dbb():
 async def sudo():
     global SUDOERS
     SUDOERS.add(config.OWNER_ID)
-    sudoersdb = mongodb.sudoers
-    sudoers = await sudoersdb.find_one({"sudo": "sudo"})
+    sudoers = await storage.get("sudoers", "sudo")
     sudoers = [] if not sudoers else sudoers["sudoers"]
     if config.OWNER_ID not in sudoers:
         sudoers.append(config.OWNER_ID)
-        await sudoersdb.update_one(
-            {"sudo": "sudo"},
-            {"$set": {"sudoers": sudoers}},
-            upsert=True,
-        )
+        await storage.set("sudoers", "sudo", {"sudoers": sudoers})
     if sudoers:
         for user_id in sudoers:
             SUDOERS.add(user_id)
@@ -4,6 +4,8 @@ from os.path import realpath
 import aiohttp
 from aiohttp import client_exceptions
 
+from Dolbymusic.utils.writer import file_writer
+
 
 class UnableToFetchCarbon(Exception):
     pass
@@ -100,7 +102,8 @@ class CarbonAPI:
                 )
             except client_exceptions.ClientConnectorError:
                 raise UnableToFetchCarbon("Can not reach the Host!")
-            resp = await request.read()
-            with open(f"cache/carbon{user_id}.jpg", "wb") as f:
-                f.write(resp)
-            return realpath(f.name)
+            path = f"cache/carbon{user_id}.jpg"
+            async with file_writer.open(path, truncate=True) as f:
+                async for chunk in request.content.iter_chunked(65536):
+                    await f.write(chunk)
+            return realpath(path)
@@ -8,11 +8,12 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Voice
 import config
 from Dolbymusic import app
 from Dolbymusic.utils.formatters import (
-    check_duration,
     convert_bytes,
     get_readable_time,
+    probe_duration,
     seconds_to_min,
 )
+from Dolbymusic.utils.stream.cache import download_cache
 
 
 class TeleAPI:
@@ -47,9 +48,7 @@ class TeleAPI:
             dur = seconds_to_min(filex.duration)
         except:
             try:
-                dur = await asyncio.get_event_loop().run_in_executor(
-                    None, check_duration, file_path
-                )
+                dur = await probe_duration(file_path)
                 dur = seconds_to_min(dur)
             except:
                 return "Unknown"
@@ -73,7 +72,7 @@ class TeleAPI:
                 )
             except:
                 file_name = audio.file_unique_id + "." + "ogg"
-            file_name = os.path.join(os.path.realpath("downloads"), file_name)
+            file_name = os.path.join(download_cache.directory, file_name)
         if video:
             try:
                 file_name = (
@@ -81,7 +80,7 @@ class TeleAPI:
                 )
             except:
                 file_name = video.file_unique_id + "." + "mp4"
-            file_name = os.path.join(os.path.realpath("downloads"), file_name)
+            file_name = os.path.join(download_cache.directory, file_name)
         return file_name
 
     async def download(self, _, message, mystic, fname):
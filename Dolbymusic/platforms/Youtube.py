@@ -1,12 +1,18 @@
 import asyncio
-import os
 import re
-from typing import Union, Optional
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Union, Optional
 import httpx
 
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 
+import config
+from Dolbymusic.utils.stream.cache import download_cache
+from Dolbymusic.utils.stream.downloader import downloader
+from Dolbymusic.utils.stream.resilience import ResilientAPI
+
 
 def time_to_seconds(time_str):
     """Convert time string (MM:SS or HH:MM:SS) to seconds"""
@@ -28,19 +34,184 @@ ENABLE_STREAMING = True
 MAX_DOWNLOAD_SIZE_MB = 48
 STREAM_MODE_DURATION_THRESHOLD = 1200
 
+_MISSING = object()
+
+
+class MetadataCache:
+    """
+    LRU + TTL cache for API lookups.
+    Concurrent misses for the same key share one in-flight request, so a song
+    requested in many chats at once only reaches the API a single time.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._data = OrderedDict()
+        self._inflight = {}
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_fetch(self, key, fetch: Callable[[], Awaitable]):
+        value = self.get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fill(key, fetch))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        # Shielded so a cancelled waiter doesn't cancel the shared lookup.
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, fetch):
+        try:
+            value = await fetch()
+            # Failed lookups come back empty; don't pin those for a whole TTL.
+            if value:
+                self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
 
 class YouTubeAPI:
-    def __init__(self):
+    def __init__(self, base_url: str = None, cache=None, event_hooks: dict = None):
+        """
+        `base_url`, `cache` and `event_hooks` default to API_BASE_URL, the
+        shared download cache and none; the benchmark points them elsewhere.
+        """
         self.base = "https://www.youtube.com/watch?v="
         self.regex = r"(?:youtube\.com|youtu\.be)"
         self.status = "https://www.youtube.com/oembed?url="
         self.listbase = "https://youtube.com/playlist?list="
         self.reg = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._event_hooks = event_hooks
+        self.cache = cache or download_cache
+        self._search_cache = MetadataCache(config.YT_CACHE_SIZE, config.YT_CACHE_TTL)
+        self._info_cache = MetadataCache(config.YT_CACHE_SIZE, config.YT_CACHE_TTL)
+        if base_url is None:
+            base_url = API_BASE_URL
+        self.api = ResilientAPI(
+            lambda: self.client,
+            [base_url, *config.YT_API_FALLBACK_URLS],
+            hedge_after=config.YT_API_HEDGE_MS / 1000,
+            threshold=config.YT_API_BREAKER_THRESHOLD,
+            reset_after=config.YT_API_BREAKER_RESET,
+        )
+
+    # -------------------------------------------------------------------------
+    # SHARED HTTP CLIENT
+    # -------------------------------------------------------------------------
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = config.YT_API_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        return httpx.AsyncClient(
+            http2=http2,
+            follow_redirects=True,
+            event_hooks=self._event_hooks,
+            timeout=httpx.Timeout(config.YT_API_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=config.YT_API_MAX_CONNECTIONS,
+                max_keepalive_connections=config.YT_API_MAX_KEEPALIVE,
+                keepalive_expiry=config.YT_API_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        One pooled client for search, info, playlist and downloads so every
+        call reuses warm keep-alive connections to API_BASE_URL.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def start(self):
+        return self.client
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def cache_stats(self) -> dict:
+        return {
+            "search": self._search_cache.stats(),
+            "info": self._info_cache.stats(),
+        }
+
+    def api_stats(self) -> dict:
+        return self.api.stats()
 
     # -------------------------------------------------------------------------
     # INTERNAL HELPERS USING YOUR OWN API
     # -------------------------------------------------------------------------
+    def _video_id(self, link: str) -> Optional[str]:
+        if not re.search(self.regex, link):
+            return None
+        if "v=" in link:
+            return link.split("v=")[-1].split("&")[0]
+        return link.split("/")[-1].split("?")[0] or None
+
+    def _search_key(self, query: str) -> str:
+        vid = self._video_id(query)
+        if vid:
+            return f"id:{vid}"
+        return "q:" + " ".join(query.lower().split())
+
     async def _search_first(self, query: str) -> Optional[dict]:
+        """
+        Cached /search lookup keyed by normalized query (or video id for links).
+        """
+        return await self._search_cache.get_or_fetch(
+            self._search_key(query), lambda: self._fetch_search(query)
+        )
+
+    async def _info(self, video_id: str) -> dict:
+        """
+        Cached /info lookup keyed by video id.
+        """
+        return await self._info_cache.get_or_fetch(
+            video_id, lambda: self._fetch_info(video_id)
+        )
+
+    async def _fetch_search(self, query: str) -> Optional[dict]:
         """
         Call /search on your API:
         Returns dict with {id, title, url} or None.
@@ -50,38 +221,36 @@ class YouTubeAPI:
         - video IDs
         """
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-                r = await client.get(
-                    f"{API_BASE_URL}/search",
-                    params={"q": query, "api_key": API_KEY},
-                )
-                if r.status_code != 200:
-                    return None
-                data = r.json()
-                vid = data.get("id")
-                if not vid:
-                    return None
-                return {
-                    "id": vid,
-                    "title": data.get("title") or vid,
-                    "url": data.get("url") or f"https://www.youtube.com/watch?v={vid}",
-                }
+            r = await self.api.get(
+                "/search",
+                params={"q": query, "api_key": API_KEY},
+            )
+            if r.status_code != 200:
+                return None
+            data = r.json()
+            vid = data.get("id")
+            if not vid:
+                return None
+            return {
+                "id": vid,
+                "title": data.get("title") or vid,
+                "url": data.get("url") or f"https://www.youtube.com/watch?v={vid}",
+            }
         except Exception:
             return None
 
-    async def _info(self, video_id: str) -> dict:
+    async def _fetch_info(self, video_id: str) -> dict:
         """
         Call /info to get metadata like duration/title/thumbnail.
         """
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-                r = await client.get(
-                    f"{API_BASE_URL}/info",
-                    params={"video_id": video_id, "api_key": API_KEY},
-                )
-                if r.status_code != 200:
-                    return {}
-                return r.json() or {}
+            r = await self.api.get(
+                "/info",
+                params={"video_id": video_id, "api_key": API_KEY},
+            )
+            if r.status_code != 200:
+                return {}
+            return r.json() or {}
         except Exception:
             return {}
 
@@ -251,7 +420,7 @@ class YouTubeAPI:
         else:
             vid = link.split("/")[-1].split("?")[0]
 
-        stream_url = f"{API_BASE_URL}/download/video?video_id={vid}&mode=stream&max_res=720&api_key={API_KEY}"
+        stream_url = f"{self.api.base_url()}/download/video?video_id={vid}&mode=stream&max_res=720&api_key={API_KEY}"
         return 1, stream_url
 
     async def stream_url(self, link: str, videoid=False, video=False):
@@ -265,8 +434,8 @@ class YouTubeAPI:
             vid = link.split("/")[-1].split("?")[0]
 
         if video:
-            return f"{API_BASE_URL}/download/video?video_id={vid}&max_res=720&api_key={API_KEY}"
-        return f"{API_BASE_URL}/download/audio?video_id={vid}&api_key={API_KEY}"
+            return f"{self.api.base_url()}/download/video?video_id={vid}&max_res=720&api_key={API_KEY}"
+        return f"{self.api.base_url()}/download/audio?video_id={vid}&api_key={API_KEY}"
 
     # -------------------------------------------------------------------------
     # PLAYLIST PARSE (unchanged, still uses your API)
@@ -279,12 +448,10 @@ class YouTubeAPI:
         playlist_id = link.split("list=")[-1] if "list=" in link else ""
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                url = f"{API_BASE_URL}/playlist"
-                params = {"playlist_id": playlist_id, "limit": limit, "api_key": API_KEY}
-                r = await client.get(url, params=params)
-                if r.status_code == 200:
-                    return r.json().get("video_ids", [])
+            params = {"playlist_id": playlist_id, "limit": limit, "api_key": API_KEY}
+            r = await self.api.get("/playlist", params=params)
+            if r.status_code == 200:
+                return r.json().get("video_ids", [])
         except:
             pass
 
@@ -314,85 +481,51 @@ class YouTubeAPI:
 
         # USE STREAMING MODE FOR LONG VIDEOS
         duration_seconds = 0
+        info = await self._info(vid)
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                r = await client.get(f"{API_BASE_URL}/info", params={"video_id": vid, "api_key": API_KEY})
-                if r.status_code == 200:
-                    duration_str = r.json().get("duration", "0:0")
-                    parts = duration_str.split(":")
-                    if len(parts) == 3:
-                        duration_seconds = int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-                    elif len(parts) == 2:
-                        duration_seconds = int(parts[0]) * 60 + int(parts[1])
-                    else:
-                        duration_seconds = int(parts[0])
+            duration_seconds = time_to_seconds(info.get("duration", "0:0"))
         except:
             pass
 
         # Stream for long videos
         if ENABLE_STREAMING and duration_seconds > STREAM_MODE_DURATION_THRESHOLD:
             if video:
-                return f"{API_BASE_URL}/download/video?video_id={vid}&max_res=720&api_key={API_KEY}"
-            return f"{API_BASE_URL}/download/audio?video_id={vid}&api_key={API_KEY}"
+                return f"{self.api.base_url()}/download/video?video_id={vid}&max_res=720&api_key={API_KEY}"
+            return f"{self.api.base_url()}/download/audio?video_id={vid}&api_key={API_KEY}"
 
         # ---------------------------------------------------------------------
         # SHORT VIDEO DOWNLOADS
         # ---------------------------------------------------------------------
-        async def api_download_audio():
-            try:
-                async with httpx.AsyncClient(follow_redirects=True, timeout=600) as client:
-                    url = f"{API_BASE_URL}/download/audio"
-                    params = {"video_id": vid, "mode": "download", "no_redirect": "1", "api_key": API_KEY}
-
-                    info = await client.get(f"{API_BASE_URL}/info", params={"video_id": vid, "api_key": API_KEY})
-                    file_title = info.json().get("title", vid) if info.status_code == 200 else vid
-
-                    safe_title = re.sub(r'[<>:"/\\|?*]', '', file_title)[:100]
-                    filepath = f"downloads/{safe_title}.mp3"
-
-                    os.makedirs("downloads", exist_ok=True)
+        def fetch_to(url, params, segmented=False):
+            async def download(temp):
+                return await downloader.fetch(
+                    self.client,
+                    url,
+                    temp,
+                    params=params,
+                    segmented=segmented,
+                    timeout=config.YT_API_DOWNLOAD_TIMEOUT,
+                )
 
-                    async with client.stream("GET", url, params=params) as r:
-                        if r.status_code != 200:
-                            return None
-                        with open(filepath, "wb") as f:
-                            async for chunk in r.aiter_bytes(1024 * 128):
-                                f.write(chunk)
+            return download
 
-                    return filepath
-            except:
-                return None
+        async def api_download_audio():
+            url = f"{self.api.base_url()}/download/audio"
+            params = {"video_id": vid, "mode": "download", "no_redirect": "1", "api_key": API_KEY}
+            return await self.cache.fetch(vid, "mp3", fetch_to(url, params))
 
         async def api_download_video():
-            try:
-                async with httpx.AsyncClient(follow_redirects=True, timeout=600) as client:
-                    url = f"{API_BASE_URL}/download/video"
-                    params = {
-                        "video_id": vid,
-                        "mode": "download",
-                        "no_redirect": "1",
-                        "max_res": "720",
-                        "api_key": API_KEY,
-                    }
-
-                    info = await client.get(f"{API_BASE_URL}/info", params={"video_id": vid, "api_key": API_KEY})
-                    file_title = info.json().get("title", vid) if info.status_code == 200 else vid
-
-                    safe_title = re.sub(r'[<>:"/\\|?*]', '', file_title)[:100]
-                    filepath = f"downloads/{safe_title}.mp4"
-
-                    os.makedirs("downloads", exist_ok=True)
-
-                    async with client.stream("GET", url, params=params) as r:
-                        if r.status_code != 200:
-                            return None
-                        with open(filepath, "wb") as f:
-                            async for chunk in r.aiter_bytes(1024 * 128):
-                                f.write(chunk)
-
-                    return filepath
-            except:
-                return None
+            url = f"{self.api.base_url()}/download/video"
+            params = {
+                "video_id": vid,
+                "mode": "download",
+                "no_redirect": "1",
+                "max_res": "720",
+                "api_key": API_KEY,
+            }
+            return await self.cache.fetch(
+                f"{vid}_720p", "mp4", fetch_to(url, params, segmented=True)
+            )
 
         # Custom song downloads
         if songvideo or songaudio:
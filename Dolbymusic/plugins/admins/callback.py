@@ -19,9 +19,10 @@ from Dolbymusic.utils.database import (
     set_loop,
 )
 from Dolbymusic.utils.decorators.language import languageCB
-from Dolbymusic.utils.formatters import seconds_to_min
 from Dolbymusic.utils.inline import close_markup, stream_markup, stream_markup_timer
 from Dolbymusic.utils.stream.autoclear import auto_clean
+from Dolbymusic.utils.stream.prefetch import prefetcher
+from Dolbymusic.utils.stream.queue import bind_queue_file
 from Dolbymusic.utils.thumbnails import get_thumb
 from config import (
     BANNED_USERS,
@@ -83,13 +84,13 @@ async def del_back_playlist(client, CallbackQuery, _):
             votemode[chat_id][CallbackQuery.message.id] = upvote
             try:
                 exists = confirmer[chat_id][CallbackQuery.message.id]
-                current = db[chat_id][0]
+                current = db[chat_id].current
             except:
                 return await CallbackQuery.edit_message_text(f"ғᴀɪʟᴇᴅ.")
             try:
-                if current["vidid"] != exists["vidid"]:
+                if current.vidid != exists["vidid"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
-                if current["file"] != exists["file"]:
+                if current.file != exists["file"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
             except:
                 return await CallbackQuery.edit_message_text(_["admin_36"])
@@ -163,7 +164,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             txt = f"➻ sᴛʀᴇᴀᴍ sᴋɪᴩᴩᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
             popped = None
             try:
-                popped = check.pop(0)
+                popped = check.pop()
                 if popped:
                     await auto_clean(popped)
                 if not check:
@@ -197,21 +198,16 @@ async def del_back_playlist(client, CallbackQuery, _):
         else:
             txt = f"➻ sᴛʀᴇᴀᴍ ʀᴇ-ᴘʟᴀʏᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
         await CallbackQuery.answer()
-        queued = check[0]["file"]
-        title = (check[0]["title"]).title()
-        user = check[0]["by"]
-        user_id = check[0]["user_id"]
-        duration = check[0]["dur"]
-        streamtype = check[0]["streamtype"]
-        videoid = check[0]["vidid"]
+        prefetcher.schedule(chat_id)
+        queued = check[0].file
+        title = (check[0].title).title()
+        user = check[0].by
+        user_id = check[0].user_id
+        duration = check[0].dur
+        streamtype = check[0].streamtype
+        videoid = check[0].vidid
         status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
-        exis = (check[0]).get("old_dur")
-        if exis:
-            db[chat_id][0]["dur"] = exis
-            db[chat_id][0]["seconds"] = check[0]["old_second"]
-            db[chat_id][0]["speed_path"] = None
-            db[chat_id][0]["speed"] = 1.0
+        check.reset_speed()
         if "live_" in queued:
             n, link = await YouTube.video(videoid, True)
             if n == 0:
@@ -240,8 +236,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 reply_markup=InlineKeyboardMarkup(button),
             parse_mode=ParseMode.HTML,
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         elif "vid_" in queued:
             mystic = await CallbackQuery.message.reply_text(
@@ -256,6 +252,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                 )
             except:
                 return await mystic.edit_text(_["call_6"])
+            await bind_queue_file(chat_id, file_path)
             try:
                 image = await YouTube.thumbnail(videoid, True)
             except:
@@ -277,8 +274,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 reply_markup=InlineKeyboardMarkup(button),
             parse_mode=ParseMode.HTML,
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "stream"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
             await mystic.delete()
         elif "index_" in queued:
@@ -293,8 +290,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 reply_markup=InlineKeyboardMarkup(button),
             parse_mode=ParseMode.HTML,
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         else:
             if videoid == "telegram":
@@ -322,8 +319,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id].mystic = run
+                db[chat_id].markup = "tg"
             elif videoid == "soundcloud":
                 button = stream_markup(_, chat_id)
                 run = await CallbackQuery.message.reply_photo(
@@ -336,8 +333,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id].mystic = run
+                db[chat_id].markup = "tg"
             else:
                 button = stream_markup(_, chat_id)
                 img = await get_thumb(videoid, user_id)
@@ -352,8 +349,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                db[chat_id].mystic = run
+                db[chat_id].markup = "stream"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
 
 
@@ -367,12 +364,10 @@ async def markup_timer():
                 playing = db.get(chat_id)
                 if not playing:
                     continue
-                duration_seconds = int(playing[0]["seconds"])
-                if duration_seconds == 0:
+                if playing.seconds == 0:
                     continue
-                try:
-                    mystic = playing[0]["mystic"]
-                except:
+                mystic = playing.mystic
+                if not mystic:
                     continue
                 try:
                     check = checker[chat_id][mystic.id]
@@ -386,12 +381,7 @@ async def markup_timer():
                 except:
                     _ = get_string("en")
                 try:
-                    buttons = stream_markup_timer(
-                        _,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
+                    buttons = stream_markup_timer(_, chat_id)
                     await mystic.edit_reply_markup(
                         reply_markup=InlineKeyboardMarkup(buttons)
                     )
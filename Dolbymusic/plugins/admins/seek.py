@@ -24,13 +24,13 @@ async def seek_comm(cli, message: Message, _, chat_id):
     playing = db.get(chat_id)
     if not playing:
         return await message.reply_text(_["queue_2"])
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = playing.seconds
     if duration_seconds == 0:
         return await message.reply_text(_["admin_22"])
-    file_path = playing[0]["file"]
-    duration_played = int(playing[0]["played"])
+    file_path = playing[0].file
+    duration_played = playing.played
     duration_to_skip = int(query)
-    duration = playing[0]["dur"]
+    duration = playing.dur
     if message.command[0][-2] == "c":
         if (duration_played - duration_to_skip) <= 10:
             return await message.reply_text(
@@ -47,28 +47,28 @@ async def seek_comm(cli, message: Message, _, chat_id):
         to_seek = duration_played + duration_to_skip + 1
     mystic = await message.reply_text(_["admin_24"])
     if "vid_" in file_path:
-        n, file_path = await YouTube.video(playing[0]["vidid"], True)
+        n, file_path = await YouTube.video(playing[0].vidid, True)
         if n == 0:
             return await message.reply_text(_["admin_22"])
-    check = (playing[0]).get("speed_path")
+    speed = playing.speed
+    check = playing.speed_path
     if check:
         file_path = check
+        speed = 1.0
     if "index_" in file_path:
-        file_path = playing[0]["vidid"]
+        file_path = playing[0].vidid
     try:
         await AyushSolo.seek_stream(
             chat_id,
             file_path,
             seconds_to_min(to_seek),
             duration,
-            playing[0]["streamtype"],
+            playing[0].streamtype,
+            speed,
         )
     except:
         return await mystic.edit_text(_["admin_26"], reply_markup=close_markup(_))
-    if message.command[0][-2] == "c":
-        db[chat_id][0]["played"] -= duration_to_skip
-    else:
-        db[chat_id][0]["played"] += duration_to_skip
+    playing.start_clock(to_seek)
     await mystic.edit_text(
         text=_["admin_25"].format(seconds_to_min(to_seek), message.from_user.mention),
         reply_markup=close_markup(_),
@@ -10,6 +10,8 @@ from Dolbymusic.utils.database import get_loop
 from Dolbymusic.utils.decorators import AdminRightsCheck
 from Dolbymusic.utils.inline import close_markup, stream_markup
 from Dolbymusic.utils.stream.autoclear import auto_clean
+from Dolbymusic.utils.stream.prefetch import prefetcher
+from Dolbymusic.utils.stream.queue import bind_queue_file
 from Dolbymusic.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 
@@ -35,7 +37,7 @@ async def skip(cli, message: Message, _, chat_id):
                         for x in range(state):
                             popped = None
                             try:
-                                popped = check.pop(0)
+                                popped = check.pop()
                             except:
                                 return await message.reply_text(_["admin_12"])
                             if popped:
@@ -65,7 +67,7 @@ async def skip(cli, message: Message, _, chat_id):
         check = db.get(chat_id)
         popped = None
         try:
-            popped = check.pop(0)
+            popped = check.pop()
             if popped:
                 await auto_clean(popped)
             if not check:
@@ -90,20 +92,15 @@ async def skip(cli, message: Message, _, chat_id):
                 return await AyushSolo.stop_stream(chat_id)
             except:
                 return
-    queued = check[0]["file"]
-    title = (check[0]["title"]).title()
-    user = check[0]["by"]
-    user_id = check[0]["user_id"]
-    streamtype = check[0]["streamtype"]
-    videoid = check[0]["vidid"]
+    prefetcher.schedule(chat_id)
+    queued = check[0].file
+    title = (check[0].title).title()
+    user = check[0].by
+    user_id = check[0].user_id
+    streamtype = check[0].streamtype
+    videoid = check[0].vidid
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
-    exis = (check[0]).get("old_dur")
-    if exis:
-        db[chat_id][0]["dur"] = exis
-        db[chat_id][0]["seconds"] = check[0]["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    check.reset_speed()
     if "live_" in queued:
         n, link = await YouTube.video(videoid, True)
         if n == 0:
@@ -123,14 +120,14 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                check[0].dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
             parse_mode=ParseMode.HTML,
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id].mystic = run
+        db[chat_id].markup = "tg"
     elif "vid_" in queued:
         mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
@@ -142,6 +139,7 @@ async def skip(cli, message: Message, _, chat_id):
             )
         except:
             return await mystic.edit_text(_["call_6"])
+        await bind_queue_file(chat_id, file_path)
         try:
             image = await YouTube.thumbnail(videoid, True)
         except:
@@ -157,14 +155,14 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                check[0].dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
             parse_mode=ParseMode.HTML,
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "stream"
+        db[chat_id].mystic = run
+        db[chat_id].markup = "stream"
         await mystic.delete()
     elif "index_" in queued:
         try:
@@ -178,8 +176,8 @@ async def skip(cli, message: Message, _, chat_id):
             reply_markup=InlineKeyboardMarkup(button),
             parse_mode=ParseMode.HTML,
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id].mystic = run
+        db[chat_id].markup = "tg"
     else:
         if videoid == "telegram":
             image = None
@@ -201,13 +199,13 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], check[0].dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
             run = await message.reply_photo(
@@ -215,13 +213,13 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], check[0].dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
         else:
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid, user_id)
@@ -230,11 +228,11 @@ async def skip(cli, message: Message, _, chat_id):
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
                     title[:23],
-                    check[0]["dur"],
+                    check[0].dur,
                     user,
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
                 parse_mode=ParseMode.HTML,
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "stream"
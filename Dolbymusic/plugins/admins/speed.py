@@ -23,10 +23,9 @@ async def playback(cli, message: Message, _, chat_id):
     playing = db.get(chat_id)
     if not playing:
         return await message.reply_text(_["queue_2"])
-    duration_seconds = int(playing[0]["seconds"])
-    if duration_seconds == 0:
+    if playing.seconds == 0:
         return await message.reply_text(_["admin_27"])
-    file_path = playing[0]["file"]
+    file_path = playing[0].file
     if "downloads" not in file_path:
         return await message.reply_text(_["admin_27"])
     upl = speed_markup(_, chat_id)
@@ -57,26 +56,16 @@ async def del_back_playlist(client, CallbackQuery, _):
     playing = db.get(chat_id)
     if not playing:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)
-    duration_seconds = int(playing[0]["seconds"])
-    if duration_seconds == 0:
+    if playing.seconds == 0:
         return await CallbackQuery.answer(_["admin_27"], show_alert=True)
-    file_path = playing[0]["file"]
+    file_path = playing[0].file
     if "downloads" not in file_path:
         return await CallbackQuery.answer(_["admin_27"], show_alert=True)
-    checkspeed = (playing[0]).get("speed")
-    if checkspeed:
-        if str(checkspeed) == str(speed):
-            if str(speed) == str("1.0"):
-                return await CallbackQuery.answer(
-                    _["admin_29"],
-                    show_alert=True,
-                )
-    else:
-        if str(speed) == str("1.0"):
-            return await CallbackQuery.answer(
-                _["admin_29"],
-                show_alert=True,
-            )
+    if float(speed) == 1.0 and playing.speed == 1.0:
+        return await CallbackQuery.answer(
+            _["admin_29"],
+            show_alert=True,
+        )
     if chat_id in checker:
         return await CallbackQuery.answer(
             _["admin_30"],
@@ -98,7 +87,6 @@ async def del_back_playlist(client, CallbackQuery, _):
             chat_id,
             file_path,
             speed,
-            playing,
         )
     except:
         if chat_id in checker:
@@ -8,7 +8,7 @@ from pyrogram.types import Message
 from config import BANNED_USERS
 from Dolbymusic import app, LOGGER
 from Dolbymusic.utils.formatters import get_readable_time
-from Dolbymusic.utils.database import add_afk, is_afk, remove_afk
+from Dolbymusic.utils.database import add_afk, get_afk_user_id, is_afk, remove_afk
 
 LOGGER(__name__).info("AFK Plugin Loaded")
 
@@ -141,6 +141,9 @@ async def active_afk(_, message: Message):
             "reason": None,
         }
 
+    # Kept so @mentions can be matched without looking the user up.
+    details["username"] = message.from_user.username
+    details["first_name"] = message.from_user.first_name
     await add_afk(user_id, details)    
     await message.reply_text(f"<blockquote>{message.from_user.first_name} ɪs ɴᴏᴡ ᴀғᴋ!</blockquote>")
 
@@ -263,16 +266,17 @@ async def chat_watcher_func(_, message: Message):
                 found = re.findall("@([_0-9a-zA-Z]+)", message.text or "")
                 try:
                     get_user = found[j]
-                    user = await app.get_users(get_user)
-                    if user.id == replied_user_id:
+                    user_id = await get_afk_user_id(get_user)
+                    if not user_id or user_id == replied_user_id:
                         j += 1
                         continue
                 except:
                     j += 1
                     continue
                     
-                verifier, reasondb = await is_afk(user.id)
+                verifier, reasondb = await is_afk(user_id)
                 if verifier:
+                    first_name = reasondb.get("first_name") or get_user
                     try:
                         afktype = reasondb["type"]
                         timeafk = reasondb["time"]
@@ -281,29 +285,29 @@ async def chat_watcher_func(_, message: Message):
                         seenago = get_readable_time((int(time.time() - timeafk)))
                         
                         if afktype == "text":
-                            msg += f"<blockquote>**{user.first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}</blockquote>\n\n"
+                            msg += f"<blockquote>**{first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}</blockquote>\n\n"
                         elif afktype == "text_reason":
-                            msg += f"<blockquote>**{user.first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}\n\nʀᴇᴀsᴏɴ: `{reasonafk}`</blockquote>\n\n"
+                            msg += f"<blockquote>**{first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}\n\nʀᴇᴀsᴏɴ: `{reasonafk}`</blockquote>\n\n"
                         elif afktype == "animation":
-                            caption = f"<blockquote>**{user.first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}"
+                            caption = f"<blockquote>**{first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}"
                             if str(reasonafk) != "None":
                                 caption += f"\n\nʀᴇᴀsᴏɴ: `{reasonafk}`"
                             caption += "</blockquote>"
                             await message.reply_animation(data, caption=caption)
                             return
                         elif afktype == "photo":
-                            caption = f"<blockquote>**{user.first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}"
+                            caption = f"<blockquote>**{first_name[:25]}** ɪs ᴀғᴋ sɪɴᴄᴇ {seenago}"
                             if str(reasonafk) != "None":
                                 caption += f"\n\nʀᴇᴀsᴏɴ: `{reasonafk}`"
                             caption += "</blockquote>"
-                            photo_path = f"downloads/{user.id}.jpg"
+                            photo_path = f"downloads/{user_id}.jpg"
                             if os.path.exists(photo_path):
                                 await message.reply_photo(photo=photo_path, caption=caption)
                             else:
                                 msg += caption + "\n\n"
                             return
                     except:
-                        msg += f"<blockquote>**{user.first_name[:25]}** ɪs ᴀғᴋ</blockquote>\n\n"
+                        msg += f"<blockquote>**{first_name[:25]}** ɪs ᴀғᴋ</blockquote>\n\n"
                         
             elif (entity[j].type) == MessageEntityType.TEXT_MENTION:
                 try:
@@ -1,78 +1,105 @@
 import asyncio
-from datetime import datetime
+
+from pyrogram.enums import ChatType
 
 import config
 from Dolbymusic import app
-from Dolbymusic.core.call import AyushSolo, autoend
-from Dolbymusic.utils.database import (get_client, is_active_chat,
-                                       is_autoend)
-
-
-async def auto_leave():
-    if config.AUTO_LEAVING_ASSISTANT == str(True):
-        while not await asyncio.sleep(
-            config.AUTO_LEAVE_ASSISTANT_TIME
-        ):
-            from Dolbymusic.core.userbot import assistants
-
-            for num in assistants:
-                client = await get_client(num)
-                left = 0
-                try:
-                    async for i in client.iter_dialogs():
-                        chat_type = i.chat.type
-                        if chat_type in [
-                            "supergroup",
-                            "group",
-                            "channel",
-                        ]:
-                            chat_id = i.chat.id
-                            if (
-                                chat_id != config.LOG_GROUP_ID
-                                and i.chat.id != -1002037783247
-                                and i.chat.id != -1001960459350
-                            ):
-                                if left == 20:
-                                    continue
-                                if not await is_active_chat(chat_id):
-                                    try:
-                                        await client.leave_chat(
-                                            chat_id
-                                        )
-                                        left += 1
-                                    except:
-                                        continue
-                except:
-                    pass
-
-
-asyncio.create_task(auto_leave())
-
-
-async def auto_end():
-    while not await asyncio.sleep(5):
-        if not await is_autoend():
-            continue
-        for chat_id in autoend:
-            timer = autoend.get(chat_id)
-            if not timer:
+from Dolbymusic.core.call import AyushSolo
+from Dolbymusic.utils.database import (get_assistant_number, get_client,
+                                       is_active_chat, is_autoend)
+from Dolbymusic.utils.timers import timers
+
+# Chats the assistants never leave on their own.
+KEEP_CHATS = [-1002037783247, -1001960459350]
+# Leaves per assistant per pass over its dialogs, to stay clear of FloodWait.
+LEAVES_PER_PASS = 20
+
+
+def _keep(chat_id: int) -> bool:
+    return chat_id == config.LOGGER_ID or chat_id in KEEP_CHATS
+
+
+@timers.on("autoleave")
+async def auto_leave(chat_id: int):
+    if await is_active_chat(chat_id) or _keep(chat_id):
+        return
+    # Only the assistant assigned to the chat can be in it; looking one up
+    # through get_assistant would assign and store a new one instead.
+    num = await get_assistant_number(chat_id)
+    if not num:
+        return
+    try:
+        client = await get_client(num)
+        await client.leave_chat(chat_id)
+    except:
+        pass
+
+
+async def _leave_dialogs(num) -> int:
+    client = await get_client(num)
+    left = 0
+    try:
+        async for i in client.get_dialogs():
+            if left == LEAVES_PER_PASS:
+                break
+            if i.chat.type not in [
+                ChatType.SUPERGROUP,
+                ChatType.GROUP,
+                ChatType.CHANNEL,
+            ]:
+                continue
+            chat_id = i.chat.id
+            if _keep(chat_id) or await is_active_chat(chat_id):
                 continue
-            if datetime.now() > timer:
-                if not await is_active_chat(chat_id):
-                    autoend[chat_id] = {}
-                    continue
-                autoend[chat_id] = {}
-                try:
-                    await AyushSolo.stop_stream(chat_id)
-                except:
-                    continue
-                try:
-                    await app.send_message(
-                        chat_id,
-                        "» ʙᴏᴛ ᴀᴜᴛᴏᴍᴀᴛɪᴄᴀʟʟʏ ʟᴇғᴛ ᴠɪᴅᴇᴏᴄʜᴀᴛ ʙᴇᴄᴀᴜsᴇ ɴᴏ ᴏɴᴇ ᴡᴀs ʟɪsᴛᴇɴɪɴɢ ᴏɴ ᴠɪᴅᴇᴏᴄʜᴀᴛ.",
-                    )
-                except:
-                    continue
-
-
-asyncio.create_task(auto_end())
+            # Chats with a deadline are left by auto_leave when it passes.
+            if timers.remaining("autoleave", chat_id) is not None:
+                continue
+            try:
+                await client.leave_chat(chat_id)
+                left += 1
+            except:
+                continue
+    except:
+        pass
+    return left
+
+
+async def leave_idle_chats():
+    """
+    Deadlines only exist for chats that stopped playing while the bot was
+    running. Chats the assistants were already sitting idle in are found by
+    walking their dialogs once per leave period, at most LEAVES_PER_PASS
+    per assistant, until a pass finds no more than that to leave.
+    """
+    if config.AUTO_LEAVING_ASSISTANT != str(True):
+        return
+    from Dolbymusic.core.userbot import assistants
+
+    pending = list(assistants)
+    while pending:
+        await asyncio.sleep(config.AUTO_LEAVE_ASSISTANT_TIME)
+        pending = [
+            num for num in pending if await _leave_dialogs(num) == LEAVES_PER_PASS
+        ]
+
+
+asyncio.create_task(leave_idle_chats())
+
+
+@timers.on("autoend")
+async def auto_end(chat_id: int):
+    if not await is_autoend():
+        return
+    if not await is_active_chat(chat_id):
+        return
+    try:
+        await AyushSolo.stop_stream(chat_id)
+    except:
+        return
+    try:
+        await app.send_message(
+            chat_id,
+            "» ʙᴏᴛ ᴀᴜᴛᴏᴍᴀᴛɪᴄᴀʟʟʏ ʟᴇғᴛ ᴠɪᴅᴇᴏᴄʜᴀᴛ ʙᴇᴄᴀᴜsᴇ ɴᴏ ᴏɴᴇ ᴡᴀs ʟɪsᴛᴇɴɪɴɢ ᴏɴ ᴠɪᴅᴇᴏᴄʜᴀᴛ.",
+        )
+    except:
+        pass
@@ -10,8 +10,8 @@ from Dolbymusic.utils.database import (
     get_active_chats,
     get_authuser_names,
     get_client,
-    get_served_chats,
-    get_served_users,
+    iter_served_chats,
+    iter_served_users,
 )
 from Dolbymusic.utils.decorators.language import language
 from Dolbymusic.utils.formatters import alpha_to_int
@@ -52,11 +52,7 @@ async def braodcast_message(client, message, _):
     if "-nobot" not in message.text:
         sent = 0
         pin = 0
-        chats = []
-        schats = await get_served_chats()
-        for chat in schats:
-            chats.append(int(chat["chat_id"]))
-        for i in chats:
+        async for i in iter_served_chats():
             try:
                 if "-noforward" in message.text and message.reply_to_message:
                     m = await app.copy_message(
@@ -116,11 +112,7 @@ async def braodcast_message(client, message, _):
     # Bot broadcasting to users
     if "-user" in message.text:
         susr = 0
-        served_users = []
-        susers = await get_served_users()
-        for user in susers:
-            served_users.append(int(user["user_id"]))
-        for i in served_users:
+        async for i in iter_served_users():
             try:
                 if "-noforward" in message.text and message.reply_to_message:
                     await app.copy_message(
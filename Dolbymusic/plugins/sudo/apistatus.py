@@ -0,0 +1,27 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Dolbymusic import YouTube, app
+from Dolbymusic.misc import SUDOERS
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+@app.on_message(filters.command(["apistatus"]) & SUDOERS)
+async def api_status(_, message: Message):
+    stats = YouTube.api_stats()
+    text = "<b>» ᴀᴘɪ ʙʀᴇᴀᴋᴇʀs :</b>\n"
+    for base, breaker in stats["breakers"].items():
+        text += f"\n<code>{base}</code>\n{breaker['state']} | {breaker['failures']} failures\n"
+    text += "\n<b>» ᴇɴᴅᴘᴏɪɴᴛs :</b>\n"
+    for path, endpoint in stats["endpoints"].items():
+        text += (
+            f"\n<code>{path}</code> : {endpoint['requests']} calls, "
+            f"{endpoint['errors']} errors, {endpoint['hedged']} hedged, "
+            f"p50 {_ms(endpoint['p50'])}, p95 {_ms(endpoint['p95'])}"
+        )
+    if not stats["endpoints"]:
+        text += "\nɴᴏ ᴄᴀʟʟs ʏᴇᴛ."
+    await message.reply_text(text)
@@ -0,0 +1,17 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Dolbymusic import app
+from Dolbymusic.misc import SUDOERS
+from Dolbymusic.utils.settings import settings_stats
+
+
+@app.on_message(filters.command(["cachestats"]) & SUDOERS)
+async def cache_stats(_, message: Message):
+    text = "<b>» sᴇᴛᴛɪɴɢs ᴄᴀᴄʜᴇ :</b>\n"
+    for name, cache in settings_stats().items():
+        text += (
+            f"\n<code>{name}</code> : {cache['size']} cached, {cache['hits']} hits, "
+            f"{cache['misses']} misses, {cache['coalesced']} coalesced"
+        )
+    await message.reply_text(text)
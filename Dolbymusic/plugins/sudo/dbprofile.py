@@ -0,0 +1,26 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Dolbymusic import app
+from Dolbymusic.core.storage import storage
+from Dolbymusic.misc import SUDOERS
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+@app.on_message(filters.command(["dbprofile"]) & SUDOERS)
+async def db_profile(_, message: Message):
+    profiler = storage.profiler
+    if not profiler:
+        return await message.reply_text(
+            "» ǫᴜᴇʀʏ ᴘʀᴏғɪʟɪɴɢ ɪs ᴏғғ, sᴇᴛ <code>MONGO_PROFILE</code> ᴛᴏ ᴇɴᴀʙʟᴇ ɪᴛ."
+        )
+    text = "<b>» ᴅᴀᴛᴀʙᴀsᴇ ǫᴜᴇʀɪᴇs :</b>\n"
+    for key, query in list(profiler.stats().items())[:10]:
+        text += (
+            f"\n<code>{key}</code> : {query['calls']} calls, avg {_ms(query['avg'])}, "
+            f"{query['slow']} slow, {query['scans']} scans"
+        )
+    await message.reply_text(text)
@@ -0,0 +1,22 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Dolbymusic import app
+from Dolbymusic.misc import SUDOERS
+from Dolbymusic.utils.scheduler import media_scheduler
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+@app.on_message(filters.command(["mediastats"]) & SUDOERS)
+async def media_stats(_, message: Message):
+    jobs = media_scheduler.stats()
+    queued = ", ".join(f"{name} {count}" for name, count in jobs["queued"].items())
+    text = (
+        f"<b>» ᴍᴇᴅɪᴀ ᴊᴏʙs :</b>\n{jobs['running']}/{jobs['limit']} running | queued: {queued}\n"
+        f"{jobs['completed']} done, {jobs['failed']} failed, {jobs['cancelled']} cancelled\n"
+        f"wait p95 {_ms(jobs['wait_p95'])}, run p95 {_ms(jobs['run_p95'])}"
+    )
+    await message.reply_text(text)
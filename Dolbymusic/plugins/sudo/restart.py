@@ -19,6 +19,8 @@ from Dolbymusic.utils.database import (
 )
 from Dolbymusic.utils.decorators.language import language
 from Dolbymusic.utils.pastebin import AyushSoloBin
+from Dolbymusic.utils.served import flush_served
+from Dolbymusic.utils.stream.journal import journal
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -84,6 +86,9 @@ async def update_(client, message, _):
         nrs = await response.edit(_final_updates_, disable_web_page_preview=True)
     os.system("git stash &> /dev/null && git pull")
 
+    # Save queues and positions first; the calls are rejoined after the restart.
+    await journal.flush()
+    await flush_served()
     try:
         served_chats = await get_active_chats()
         for x in served_chats:
@@ -121,6 +126,8 @@ async def update_(client, message, _):
 @app.on_message(filters.command(["restart"]) & filters.user(OWNER_ID))
 async def restart_(_, message):
     response = await message.reply_text("ʀᴇsᴛᴀʀᴛɪɴɢ...")
+    await journal.flush()
+    await flush_served()
     ac_chats = await get_active_chats()
     for x in ac_chats:
         try:
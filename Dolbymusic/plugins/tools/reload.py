@@ -7,10 +7,10 @@ from pyrogram.types import CallbackQuery, Message
 
 from Dolbymusic import app
 from Dolbymusic.core.call import AyushSolo
-from Dolbymusic.misc import db
 from Dolbymusic.utils.database import get_assistant, get_authuser_names, get_cmode
 from Dolbymusic.utils.decorators import ActualAdminCB, AdminActual, language
 from Dolbymusic.utils.formatters import alpha_to_int, get_readable_time
+from Dolbymusic.utils.stream.autoclear import clear_queue
 from config import BANNED_USERS, adminlist, lyrical
 
 rel = {}
@@ -52,7 +52,7 @@ async def restartbot(client, message: Message, _):
     mystic = await message.reply_text(_["reload_4"].format(app.mention))
     await asyncio.sleep(1)
     try:
-        db[message.chat.id] = []
+        await clear_queue(message.chat.id)
         await AyushSolo.stop_stream_force(message.chat.id)
     except:
         pass
@@ -79,7 +79,7 @@ async def restartbot(client, message: Message, _):
         except:
             pass
         try:
-            db[chat_id] = []
+            await clear_queue(chat_id)
             await AyushSolo.stop_stream_force(chat_id)
         except:
             pass
@@ -1,4 +1,3 @@
-import os
 import re
 import config
 from pytubefix import YouTube as PyTubeFix
@@ -16,6 +15,7 @@ from Dolbymusic import YouTube, app
 from Dolbymusic.utils.decorators.language import language, languageCB
 from Dolbymusic.utils.formatters import convert_bytes
 from Dolbymusic.utils.inline.song import song_markup
+from Dolbymusic.utils.stream.cache import download_cache
 
 # Command
 SONG_COMMAND = ["song"]
@@ -279,7 +279,8 @@ async def song_download_cb(client, CallbackQuery, _):
         except Exception as e:
             print(e)
             return await mystic.edit_text(_["song_10"])
-        os.remove(file_path)
+        finally:
+            download_cache.release(file_path)
     elif stype == "audio":
         try:
             filename = await YouTube.download(
@@ -308,4 +309,5 @@ async def song_download_cb(client, CallbackQuery, _):
         except Exception as e:
             print(e)
             return await mystic.edit_text(_["song_10"])
-        os.remove(filename)
+        finally:
+            download_cache.release(filename)
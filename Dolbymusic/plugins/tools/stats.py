@@ -10,10 +10,15 @@ from pytgcalls.__version__ import __version__ as pytgver
 
 import config
 from Dolbymusic import app
+from Dolbymusic.core.storage import storage
 from Dolbymusic.core.userbot import assistants
-from Dolbymusic.misc import SUDOERS, mongodb
+from Dolbymusic.misc import SUDOERS
 from Dolbymusic.plugins import ALL_MODULES
-from Dolbymusic.utils.database import get_served_chats, get_served_users, get_sudoers
+from Dolbymusic.utils.database import (
+    count_served_chats,
+    count_served_users,
+    get_sudoers,
+)
 from Dolbymusic.utils.decorators.language import language, languageCB
 from Dolbymusic.utils.inline.stats import back_stats_buttons, stats_buttons
 from config import BANNED_USERS
@@ -49,8 +54,8 @@ async def overall_stats(client, CallbackQuery, _):
     except:
         pass
     await CallbackQuery.edit_message_text(_["gstats_1"].format(app.mention))
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    served_chats = await count_served_chats()
+    served_users = await count_served_users(estimated=True)
     text = _["gstats_3"].format(
         app.mention,
         len(assistants),
@@ -97,11 +102,11 @@ async def bot_stats(client, CallbackQuery, _):
     total = hdd.total / (1024.0**3)
     used = hdd.used / (1024.0**3)
     free = hdd.free / (1024.0**3)
-    call = await mongodb.command("dbstats")
-    datasize = call["dataSize"] / 1024
-    storage = call["storageSize"] / 1024
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    call = await storage.stats()
+    datasize = call["data_size"] / 1024
+    storagesize = call["storage_size"] / 1024
+    served_chats = await count_served_chats()
+    served_users = await count_served_users(estimated=True)
     text = _["gstats_5"].format(
         app.mention,
         len(ALL_MODULES),
@@ -121,9 +126,9 @@ async def bot_stats(client, CallbackQuery, _):
         len(BANNED_USERS),
         len(await get_sudoers()),
         str(datasize)[:6],
-        storage,
-        call["collections"],
-        call["objects"],
+        storagesize,
+        call["tables"],
+        call["records"],
     )
     med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
     try:
@@ -1,309 +1,250 @@
-import random
-from typing import Dict, List, Union
-
-from Dolbymusic import userbot
-from Dolbymusic.core.mongo import mongodb
-
-authdb = mongodb.adminauth
-authuserdb = mongodb.authuser
-autoenddb = mongodb.autoend
-assdb = mongodb.assistants
-blacklist_chatdb = mongodb.blacklistChat
-blockeddb = mongodb.blockedusers
-chatsdb = mongodb.chats
-channeldb = mongodb.cplaymode
-countdb = mongodb.upcount
-gbansdb = mongodb.gban
-langdb = mongodb.language
-onoffdb = mongodb.onoffper
-playmodedb = mongodb.playmode
-playtypedb = mongodb.playtypedb
-skipdb = mongodb.skipmode
-sudoersdb = mongodb.sudoers
-usersdb = mongodb.tgusersdb
+import asyncio
+from typing import AsyncIterator, Dict, List, Union
+
+import config
+from Dolbymusic.core.assistants import pool
+from Dolbymusic.core.storage import storage
+from Dolbymusic.misc import db
+from Dolbymusic.utils.exceptions import AssistantErr
+from Dolbymusic.utils.served import served_chats, served_users
+from Dolbymusic.utils.settings import ChatSettings, SettingCache
+from Dolbymusic.utils.stream.state import chat_playback
+from Dolbymusic.utils.timers import timers
 
 # Shifting to memory [mongo sucks often]
 active = []
 activevideo = []
 assistantdict = {}
-autoend = {}
-count = {}
-channelconnect = {}
-langm = {}
-loop = {}
-maintenance = []
-nonadmin = {}
 pause = {}
-playmode = {}
-playtype = {}
-skipmode = {}
+
+# Global flags are stored under this chat_id.
+AUTOEND_CHAT = 1234
+
+
+async def _load_mode(table: str, chat_id: int, default, field: str = "mode"):
+    record = await storage.get(table, chat_id)
+    if not record:
+        return default
+    return record[field]
+
+
+async def _load_skipmode(chat_id: int) -> bool:
+    # A record marks the chat as having skip voting turned off.
+    return not await storage.exists("skipmode", chat_id)
+
+
+async def _load_welcome(chat_id: int) -> bool:
+    chat = await storage.get("welcome", chat_id)
+    if not chat:
+        return True  # Default enabled
+    return chat.get("enabled", True)
+
+
+async def _load_sudoers(_) -> list:
+    sudoers = await storage.get("sudoers", "sudo")
+    if not sudoers:
+        return []
+    return sudoers["sudoers"]
+
+
+autoendcache = SettingCache(
+    "autoend", lambda chat_id: storage.exists("autoend", chat_id)
+)
+authusercache = SettingCache(
+    "authusers", lambda chat_id: _load_mode("authuser", chat_id, {}, "notes")
+)
+channelconnect = SettingCache(
+    "cmode", lambda chat_id: _load_mode("cplaymode", chat_id, None)
+)
+count = SettingCache("upvotes", lambda chat_id: _load_mode("upcount", chat_id, 5))
+langm = SettingCache(
+    "lang", lambda chat_id: _load_mode("language", chat_id, "en", "lang")
+)
+nonadmin = SettingCache(
+    "nonadmin", lambda chat_id: storage.exists("adminauth", chat_id)
+)
+onoff = SettingCache("onoff", lambda on_off: storage.exists("onoffper", on_off))
+playmode = SettingCache(
+    "playmode", lambda chat_id: _load_mode("playmode", chat_id, "Direct")
+)
+playtype = SettingCache(
+    "playtype", lambda chat_id: _load_mode("playtypedb", chat_id, "Everyone")
+)
+skipmode = SettingCache("skipmode", _load_skipmode)
+sudoerscache = SettingCache("sudoers", _load_sudoers)
+welcome = SettingCache("welcome", _load_welcome)
+
+
+async def _load_chat_settings(chat_id: int) -> ChatSettings:
+    values = await asyncio.gather(
+        langm.get(chat_id),
+        channelconnect.get(chat_id),
+        playmode.get(chat_id),
+        playtype.get(chat_id),
+        nonadmin.get(chat_id),
+        skipmode.get(chat_id),
+        count.get(chat_id),
+        authusercache.get(chat_id),
+    )
+    return ChatSettings(chat_id, *values)
+
+
+chatsettings = SettingCache("chat", _load_chat_settings)
+for _cache in (
+    langm,
+    channelconnect,
+    playmode,
+    playtype,
+    nonadmin,
+    skipmode,
+    count,
+    authusercache,
+):
+    _cache.watch(chatsettings.invalidate)
+
+
+async def get_chat_settings(chat_id: int) -> ChatSettings:
+    return await chatsettings.get(chat_id)
 
 
 async def get_assistant_number(chat_id: int) -> str:
+    """The chat's assigned assistant, or None. Never assigns one."""
     assistant = assistantdict.get(chat_id)
+    if not assistant:
+        dbassistant = await storage.get("assistants", chat_id)
+        if dbassistant:
+            assistant = dbassistant["assistant"]
+            assistantdict[chat_id] = assistant
     return assistant
 
 
 async def get_client(assistant: int):
-    if int(assistant) == 1:
-        return userbot.one
-    elif int(assistant) == 2:
-        return userbot.two
-    elif int(assistant) == 3:
-        return userbot.three
-    elif int(assistant) == 4:
-        return userbot.four
-    elif int(assistant) == 5:
-        return userbot.five
-    elif int(assistant) == 6:
-        return userbot.six
-    elif int(assistant) == 7:
-        return userbot.seven
+    return pool.client(assistant)
 
 
 async def set_assistant_new(chat_id, number):
     number = int(number)
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": number}},
-        upsert=True,
-    )
+    await storage.set("assistants", chat_id, {"assistant": number})
 
 
 async def set_assistant(chat_id):
-    from Dolbymusic.core.userbot import assistants
-
-    ran_assistant = random.choice(assistants)
-    assistantdict[chat_id] = ran_assistant
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
-        upsert=True,
-    )
-    userbot = await get_client(ran_assistant)
-    return userbot
+    number = await set_calls_assistant(chat_id)
+    return pool.client(number)
 
 
-async def get_assistant(chat_id: int) -> str:
-    from Dolbymusic.core.userbot import assistants
-
+async def _assistant_number(chat_id: int) -> int:
+    """Return the chat's assistant, moving it to a healthy one if needed."""
     assistant = assistantdict.get(chat_id)
     if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
-            userbot = await set_assistant(chat_id)
-            return userbot
-        else:
-            got_assis = dbassistant["assistant"]
-            if got_assis in assistants:
-                assistantdict[chat_id] = got_assis
-                userbot = await get_client(got_assis)
-                return userbot
-            else:
-                userbot = await set_assistant(chat_id)
-                return userbot
-    else:
-        if assistant in assistants:
-            userbot = await get_client(assistant)
-            return userbot
-        else:
-            userbot = await set_assistant(chat_id)
-            return userbot
+        dbassistant = await storage.get("assistants", chat_id)
+        if dbassistant:
+            assistant = dbassistant["assistant"]
+            assistantdict[chat_id] = assistant
+    if assistant and pool.usable(assistant, chat_id):
+        return assistant
+    return await set_calls_assistant(chat_id)
+
+
+async def get_assistant(chat_id: int) -> str:
+    return pool.client(await _assistant_number(chat_id))
 
 
 async def set_calls_assistant(chat_id):
-    from Dolbymusic.core.userbot import assistants
-
-    ran_assistant = random.choice(assistants)
-    assistantdict[chat_id] = ran_assistant
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
-        upsert=True,
-    )
-    return ran_assistant
+    number = pool.pick()
+    if number is None:
+        raise AssistantErr("No assistant is ready to join the call, try again later.")
+    assistantdict[chat_id] = number
+    await storage.set("assistants", chat_id, {"assistant": number})
+    return number
 
 
 async def group_assistant(self, chat_id: int) -> int:
-    from Dolbymusic.core.userbot import assistants
-
-    assistant = assistantdict.get(chat_id)
-    if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
-            assis = await set_calls_assistant(chat_id)
-        else:
-            assis = dbassistant["assistant"]
-            if assis in assistants:
-                assistantdict[chat_id] = assis
-                assis = assis
-            else:
-                assis = await set_calls_assistant(chat_id)
-    else:
-        if assistant in assistants:
-            assis = assistant
-        else:
-            assis = await set_calls_assistant(chat_id)
-    if int(assis) == 1:
-        return self.one
-    elif int(assis) == 2:
-        return self.two
-    elif int(assis) == 3:
-        return self.three
-    elif int(assis) == 4:
-        return self.four
-    elif int(assis) == 5:
-        return self.five
-    elif int(assis) == 6:
-        return self.six
-    elif int(assis) == 7:
-        return self.seven
+    return pool.call(await _assistant_number(chat_id))
 
 
 async def is_skipmode(chat_id: int) -> bool:
-    mode = skipmode.get(chat_id)
-    if not mode:
-        user = await skipdb.find_one({"chat_id": chat_id})
-        if not user:
-            skipmode[chat_id] = True
-            return True
-        skipmode[chat_id] = False
-        return False
-    return mode
+    return await skipmode.get(chat_id)
 
 
 async def skip_on(chat_id: int):
-    skipmode[chat_id] = True
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if user:
-        return await skipdb.delete_one({"chat_id": chat_id})
+    return await skipmode.set(chat_id, True, storage.delete("skipmode", chat_id))
 
 
 async def skip_off(chat_id: int):
-    skipmode[chat_id] = False
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if not user:
-        return await skipdb.insert_one({"chat_id": chat_id})
+    return await skipmode.set(chat_id, False, storage.add("skipmode", chat_id))
 
 
 async def get_upvote_count(chat_id: int) -> int:
-    mode = count.get(chat_id)
-    if not mode:
-        mode = await countdb.find_one({"chat_id": chat_id})
-        if not mode:
-            return 5
-        count[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await count.get(chat_id)
 
 
 async def set_upvotes(chat_id: int, mode: int):
-    count[chat_id] = mode
-    await countdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await count.set(chat_id, mode, storage.set("upcount", chat_id, {"mode": mode}))
 
 
 async def is_autoend() -> bool:
-    chat_id = 1234
-    user = await autoenddb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    return await autoendcache.get(AUTOEND_CHAT)
 
 
 async def autoend_on():
-    chat_id = 1234
-    await autoenddb.insert_one({"chat_id": chat_id})
+    await autoendcache.set(
+        AUTOEND_CHAT, True, storage.add("autoend", AUTOEND_CHAT)
+    )
 
 
 async def autoend_off():
-    chat_id = 1234
-    await autoenddb.delete_one({"chat_id": chat_id})
+    await autoendcache.set(
+        AUTOEND_CHAT, False, storage.delete("autoend", AUTOEND_CHAT)
+    )
 
 
 async def get_loop(chat_id: int) -> int:
-    lop = loop.get(chat_id)
-    if not lop:
-        return 0
-    return lop
+    state = db.get(chat_id)
+    return state.loop if state else 0
 
 
 async def set_loop(chat_id: int, mode: int):
-    loop[chat_id] = mode
+    state = chat_playback(chat_id)
+    state.loop = mode
+    state.touch()
 
 
 async def get_cmode(chat_id: int) -> int:
-    mode = channelconnect.get(chat_id)
-    if not mode:
-        mode = await channeldb.find_one({"chat_id": chat_id})
-        if not mode:
-            return None
-        channelconnect[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await channelconnect.get(chat_id)
 
 
 async def set_cmode(chat_id: int, mode: int):
-    channelconnect[chat_id] = mode
-    await channeldb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
+    await channelconnect.set(
+        chat_id, mode, storage.set("cplaymode", chat_id, {"mode": mode})
     )
 
 
 async def get_playtype(chat_id: int) -> str:
-    mode = playtype.get(chat_id)
-    if not mode:
-        mode = await playtypedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playtype[chat_id] = "Everyone"
-            return "Everyone"
-        playtype[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await playtype.get(chat_id)
 
 
 async def set_playtype(chat_id: int, mode: str):
-    playtype[chat_id] = mode
-    await playtypedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
+    await playtype.set(
+        chat_id, mode, storage.set("playtypedb", chat_id, {"mode": mode})
     )
 
 
 async def get_playmode(chat_id: int) -> str:
-    mode = playmode.get(chat_id)
-    if not mode:
-        mode = await playmodedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playmode[chat_id] = "Direct"
-            return "Direct"
-        playmode[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return await playmode.get(chat_id)
 
 
 async def set_playmode(chat_id: int, mode: str):
-    playmode[chat_id] = mode
-    await playmodedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
+    await playmode.set(
+        chat_id, mode, storage.set("playmode", chat_id, {"mode": mode})
     )
 
 
 async def get_lang(chat_id: int) -> str:
-    mode = langm.get(chat_id)
-    if not mode:
-        lang = await langdb.find_one({"chat_id": chat_id})
-        if not lang:
-            langm[chat_id] = "en"
-            return "en"
-        langm[chat_id] = lang["lang"]
-        return lang["lang"]
-    return mode
+    return await langm.get(chat_id)
 
 
 async def set_lang(chat_id: int, lang: str):
-    langm[chat_id] = lang
-    await langdb.update_one({"chat_id": chat_id}, {"$set": {"lang": lang}}, upsert=True)
+    await langm.set(chat_id, lang, storage.set("language", chat_id, {"lang": lang}))
 
 
 async def is_music_playing(chat_id: int) -> bool:
@@ -315,10 +256,16 @@ async def is_music_playing(chat_id: int) -> bool:
 
 async def music_on(chat_id: int):
     pause[chat_id] = True
+    state = db.get(chat_id)
+    if state:
+        state.resume()
 
 
 async def music_off(chat_id: int):
     pause[chat_id] = False
+    state = db.get(chat_id)
+    if state:
+        state.pause()
 
 
 async def get_active_chats() -> list:
@@ -335,11 +282,15 @@ async def is_active_chat(chat_id: int) -> bool:
 async def add_active_chat(chat_id: int):
     if chat_id not in active:
         active.append(chat_id)
+    timers.cancel("autoleave", chat_id)
 
 
 async def remove_active_chat(chat_id: int):
     if chat_id in active:
         active.remove(chat_id)
+    timers.cancel("autoend", chat_id)
+    if config.AUTO_LEAVING_ASSISTANT == str(True):
+        timers.schedule("autoleave", chat_id, config.AUTO_LEAVE_ASSISTANT_TIME)
 
 
 async def get_active_video_chats() -> list:
@@ -364,165 +315,114 @@ async def remove_active_video_chat(chat_id: int):
 
 
 async def check_nonadmin_chat(chat_id: int) -> bool:
-    user = await authdb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    return await nonadmin.get(chat_id)
 
 
 async def is_nonadmin_chat(chat_id: int) -> bool:
-    mode = nonadmin.get(chat_id)
-    if not mode:
-        user = await authdb.find_one({"chat_id": chat_id})
-        if not user:
-            nonadmin[chat_id] = False
-            return False
-        nonadmin[chat_id] = True
-        return True
-    return mode
+    return await nonadmin.get(chat_id)
 
 
 async def add_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = True
-    is_admin = await check_nonadmin_chat(chat_id)
-    if is_admin:
-        return
-    return await authdb.insert_one({"chat_id": chat_id})
+    return await nonadmin.set(chat_id, True, storage.add("adminauth", chat_id))
 
 
 async def remove_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = False
-    is_admin = await check_nonadmin_chat(chat_id)
-    if not is_admin:
-        return
-    return await authdb.delete_one({"chat_id": chat_id})
+    return await nonadmin.set(chat_id, False, storage.delete("adminauth", chat_id))
 
 
 async def is_on_off(on_off: int) -> bool:
-    onoff = await onoffdb.find_one({"on_off": on_off})
-    if not onoff:
-        return False
-    return True
+    return await onoff.get(on_off)
 
 
 async def add_on(on_off: int):
-    is_on = await is_on_off(on_off)
-    if is_on:
-        return
-    return await onoffdb.insert_one({"on_off": on_off})
+    return await onoff.set(on_off, True, storage.add("onoffper", on_off))
 
 
 async def add_off(on_off: int):
-    is_off = await is_on_off(on_off)
-    if not is_off:
-        return
-    return await onoffdb.delete_one({"on_off": on_off})
+    return await onoff.set(on_off, False, storage.delete("onoffper", on_off))
 
 
 async def is_maintenance():
-    if not maintenance:
-        get = await onoffdb.find_one({"on_off": 1})
-        if not get:
-            maintenance.clear()
-            maintenance.append(2)
-            return True
-        else:
-            maintenance.clear()
-            maintenance.append(1)
-            return False
-    else:
-        if 1 in maintenance:
-            return False
-        else:
-            return True
+    # on_off 1 is set while maintenance mode is on.
+    return not await is_on_off(1)
 
 
 async def maintenance_off():
-    maintenance.clear()
-    maintenance.append(2)
-    is_off = await is_on_off(1)
-    if not is_off:
-        return
-    return await onoffdb.delete_one({"on_off": 1})
+    return await add_off(1)
 
 
 async def maintenance_on():
-    maintenance.clear()
-    maintenance.append(1)
-    is_on = await is_on_off(1)
-    if is_on:
-        return
-    return await onoffdb.insert_one({"on_off": 1})
+    return await add_on(1)
 
 
 async def is_served_user(user_id: int) -> bool:
-    user = await usersdb.find_one({"user_id": user_id})
-    if not user:
+    if user_id in served_users:
+        return True
+    if not await storage.exists("tgusersdb", user_id):
         return False
+    served_users.remember(user_id)
     return True
 
 
 async def get_served_users() -> list:
-    users_list = []
-    async for user in usersdb.find({"user_id": {"$gt": 0}}):
-        users_list.append(user)
-    return users_list
+    return [{"user_id": user_id} async for user_id in iter_served_users()]
+
+
+def iter_served_users(batch_size: int = None) -> AsyncIterator[int]:
+    return storage.keys("tgusersdb", start=1, batch_size=batch_size)
+
+
+async def count_served_users(estimated: bool = False) -> int:
+    return await storage.count("tgusersdb", start=1, estimated=estimated)
 
 
 async def add_served_user(user_id: int):
-    is_served = await is_served_user(user_id)
-    if is_served:
-        return
-    return await usersdb.insert_one({"user_id": user_id})
+    served_users.add(user_id)
 
 
 async def get_served_chats() -> list:
-    chats_list = []
-    async for chat in chatsdb.find({"chat_id": {"$lt": 0}}):
-        chats_list.append(chat)
-    return chats_list
+    return [{"chat_id": chat_id} async for chat_id in iter_served_chats()]
+
+
+def iter_served_chats(batch_size: int = None) -> AsyncIterator[int]:
+    return storage.keys("chats", stop=0, batch_size=batch_size)
+
+
+async def count_served_chats(estimated: bool = False) -> int:
+    return await storage.count("chats", stop=0, estimated=estimated)
 
 
 async def is_served_chat(chat_id: int) -> bool:
-    chat = await chatsdb.find_one({"chat_id": chat_id})
-    if not chat:
+    if chat_id in served_chats:
+        return True
+    if not await storage.exists("chats", chat_id):
         return False
+    served_chats.remember(chat_id)
     return True
 
 
 async def add_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if is_served:
-        return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    served_chats.add(chat_id)
 
 
 async def blacklisted_chats() -> list:
-    chats_list = []
-    async for chat in blacklist_chatdb.find({"chat_id": {"$lt": 0}}):
-        chats_list.append(chat["chat_id"])
-    return chats_list
+    return [chat_id async for chat_id in iter_blacklisted_chats()]
+
+
+def iter_blacklisted_chats(batch_size: int = None) -> AsyncIterator[int]:
+    return storage.keys("blacklistChat", stop=0, batch_size=batch_size)
 
 
 async def blacklist_chat(chat_id: int) -> bool:
-    if not await blacklist_chatdb.find_one({"chat_id": chat_id}):
-        await blacklist_chatdb.insert_one({"chat_id": chat_id})
-        return True
-    return False
+    return await storage.add("blacklistChat", chat_id)
 
 
 async def whitelist_chat(chat_id: int) -> bool:
-    if await blacklist_chatdb.find_one({"chat_id": chat_id}):
-        await blacklist_chatdb.delete_one({"chat_id": chat_id})
-        return True
-    return False
+    return await storage.delete("blacklistChat", chat_id)
 
 
 async def _get_authusers(chat_id: int) -> Dict[str, int]:
-    _notes = await authuserdb.find_one({"chat_id": chat_id})
-    if not _notes:
-        return {}
-    return _notes["notes"]
+    return await authusercache.get(chat_id)
 
 
 async def get_authuser_names(chat_id: int) -> List[str]:
@@ -543,69 +443,59 @@ async def get_authuser(chat_id: int, name: str) -> Union[bool, dict]:
 
 async def save_authuser(chat_id: int, name: str, note: dict):
     name = name
-    _notes = await _get_authusers(chat_id)
+    _notes = dict(await _get_authusers(chat_id))
     _notes[name] = note
 
-    await authuserdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"notes": _notes}}, upsert=True
+    await authusercache.set(
+        chat_id, _notes, storage.set("authuser", chat_id, {"notes": _notes})
     )
 
 
 async def delete_authuser(chat_id: int, name: str) -> bool:
-    notesd = await _get_authusers(chat_id)
+    notesd = dict(await _get_authusers(chat_id))
     name = name
     if name in notesd:
         del notesd[name]
-        await authuserdb.update_one(
-            {"chat_id": chat_id},
-            {"$set": {"notes": notesd}},
-            upsert=True,
+        await authusercache.set(
+            chat_id, notesd, storage.set("authuser", chat_id, {"notes": notesd})
         )
         return True
     return False
 
 
 async def get_gbanned() -> list:
-    results = []
-    async for user in gbansdb.find({"user_id": {"$gt": 0}}):
-        user_id = user["user_id"]
-        results.append(user_id)
-    return results
+    return [user_id async for user_id in iter_gbanned()]
+
+
+def iter_gbanned(batch_size: int = None) -> AsyncIterator[int]:
+    return storage.keys("gban", start=1, batch_size=batch_size)
+
+
+async def get_gbanned_count() -> int:
+    return await storage.count("gban", start=1)
 
 
 async def is_gbanned_user(user_id: int) -> bool:
-    user = await gbansdb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return await storage.exists("gban", user_id)
 
 
 async def add_gban_user(user_id: int):
-    is_gbanned = await is_gbanned_user(user_id)
-    if is_gbanned:
-        return
-    return await gbansdb.insert_one({"user_id": user_id})
+    return await storage.add("gban", user_id)
 
 
 async def remove_gban_user(user_id: int):
-    is_gbanned = await is_gbanned_user(user_id)
-    if not is_gbanned:
-        return
-    return await gbansdb.delete_one({"user_id": user_id})
+    return await storage.delete("gban", user_id)
 
 
 async def get_sudoers() -> list:
-    sudoers = await sudoersdb.find_one({"sudo": "sudo"})
-    if not sudoers:
-        return []
-    return sudoers["sudoers"]
+    return list(await sudoerscache.get("sudo"))
 
 
 async def add_sudo(user_id: int) -> bool:
     sudoers = await get_sudoers()
     sudoers.append(user_id)
-    await sudoersdb.update_one(
-        {"sudo": "sudo"}, {"$set": {"sudoers": sudoers}}, upsert=True
+    await sudoerscache.set(
+        "sudo", sudoers, storage.set("sudoers", "sudo", {"sudoers": sudoers})
     )
     return True
 
@@ -613,99 +503,104 @@ async def add_sudo(user_id: int) -> bool:
 async def remove_sudo(user_id: int) -> bool:
     sudoers = await get_sudoers()
     sudoers.remove(user_id)
-    await sudoersdb.update_one(
-        {"sudo": "sudo"}, {"$set": {"sudoers": sudoers}}, upsert=True
+    await sudoerscache.set(
+        "sudo", sudoers, storage.set("sudoers", "sudo", {"sudoers": sudoers})
     )
     return True
 
 
 async def get_banned_users() -> list:
-    results = []
-    async for user in blockeddb.find({"user_id": {"$gt": 0}}):
-        user_id = user["user_id"]
-        results.append(user_id)
-    return results
+    return [user_id async for user_id in iter_banned_users()]
+
+
+def iter_banned_users(batch_size: int = None) -> AsyncIterator[int]:
+    return storage.keys("blockedusers", start=1, batch_size=batch_size)
 
 
 async def get_banned_count() -> int:
-    users = blockeddb.find({"user_id": {"$gt": 0}})
-    users = await users.to_list(length=100000)
-    return len(users)
+    return await storage.count("blockedusers", start=1)
 
 
 async def is_banned_user(user_id: int) -> bool:
-    user = await blockeddb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return await storage.exists("blockedusers", user_id)
 
 
 async def add_banned_user(user_id: int):
-    is_gbanned = await is_banned_user(user_id)
-    if is_gbanned:
-        return
-    return await blockeddb.insert_one({"user_id": user_id})
+    return await storage.add("blockedusers", user_id)
 
 
 async def remove_banned_user(user_id: int):
-    is_gbanned = await is_banned_user(user_id)
-    if not is_gbanned:
-        return
-    return await blockeddb.delete_one({"user_id": user_id})
+    return await storage.delete("blockedusers", user_id)
 
 
 # AFK System
-afkdb = mongodb.afk
+
+# Everyone currently AFK, loaded at startup: user_id -> details, and
+# lowercase username -> user_id for @mentions.
+afkusers = {}
+afknames = {}
+
+
+def _remember_afk(user: dict):
+    afkusers[user["user_id"]] = user
+    if user.get("username"):
+        afknames[user["username"].lower()] = user["user_id"]
+
+
+async def load_afk_users():
+    """Read every AFK user into memory once"""
+    async for _, user in storage.items("afk"):
+        _remember_afk(user)
 
 
 async def is_afk(user_id: int) -> tuple:
     """Check if user is AFK and return status with reason data"""
-    user = await afkdb.find_one({"user_id": user_id})
+    user = afkusers.get(user_id)
     if not user:
         return False, {}
     return True, user
 
 
+async def get_afk_user_id(username: str) -> Union[int, None]:
+    """The AFK user with this @username, if any"""
+    return afknames.get(username.lower())
+
+
 async def add_afk(user_id: int, details: dict):
     """Set user as AFK with details"""
-    await afkdb.update_one(
-        {"user_id": user_id},
-        {"$set": {
-            "user_id": user_id,
-            "type": details["type"],
-            "time": details["time"],
-            "data": details["data"],
-            "reason": details["reason"]
-        }},
-        upsert=True
-    )
+    user = {
+        "user_id": user_id,
+        "type": details["type"],
+        "time": details["time"],
+        "data": details["data"],
+        "reason": details["reason"],
+        "username": details.get("username"),
+        "first_name": details.get("first_name"),
+    }
+    _remember_afk(user)
+    await storage.set("afk", user_id, user)
 
 
 async def remove_afk(user_id: int):
     """Remove user from AFK status"""
-    user = await afkdb.find_one({"user_id": user_id})
+    user = afkusers.pop(user_id, None)
     if user:
-        return await afkdb.delete_one({"user_id": user_id})
+        if user.get("username"):
+            afknames.pop(user["username"].lower(), None)
+        return await storage.delete("afk", user_id)
 
 
 # Welcome System
-welcomedb = mongodb.welcome
-
 
 async def get_welcome(chat_id: int) -> bool:
     """Check if welcome is enabled for chat"""
-    chat = await welcomedb.find_one({"chat_id": chat_id})
-    if not chat:
-        return True  # Default enabled
-    return chat.get("enabled", True)
+    return await welcome.get(chat_id)
 
 
 async def set_welcome(chat_id: int, enabled: bool):
     """Enable/disable welcome for chat"""
-    await welcomedb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"chat_id": chat_id, "enabled": enabled}},
-        upsert=True
+    await welcome.set(
+        chat_id, enabled, storage.set("welcome", chat_id, {"enabled": enabled})
     )
 
 
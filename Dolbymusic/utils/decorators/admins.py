@@ -4,14 +4,11 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from Dolbymusic import app
 from Dolbymusic.misc import SUDOERS, db
 from Dolbymusic.utils.database import (
-    get_authuser_names,
-    get_cmode,
+    get_chat_settings,
     get_lang,
     get_upvote_count,
     is_active_chat,
     is_maintenance,
-    is_nonadmin_chat,
-    is_skipmode,
 )
 from config import SUPPORT_CHAT, adminlist, confirmer
 from strings import get_string
@@ -33,9 +30,9 @@ def AdminRightsCheck(mystic):
         except:
             pass
 
+        settings = await get_chat_settings(message.chat.id)
         try:
-            language = await get_lang(message.chat.id)
-            _ = get_string(language)
+            _ = get_string(settings.lang)
         except:
             _ = get_string("en")
         if message.sender_chat:
@@ -51,7 +48,7 @@ def AdminRightsCheck(mystic):
             )
             return await message.reply_text(_["general_3"], reply_markup=upl)
         if message.command[0][0] == "c":
-            chat_id = await get_cmode(message.chat.id)
+            chat_id = settings.cmode
             if chat_id is None:
                 return await message.reply_text(_["setting_7"])
             try:
@@ -62,16 +59,18 @@ def AdminRightsCheck(mystic):
             chat_id = message.chat.id
         if not await is_active_chat(chat_id):
             return await message.reply_text(_["general_5"])
-        is_non_admin = await is_nonadmin_chat(message.chat.id)
-        if not is_non_admin:
+        if not settings.nonadmin:
             if message.from_user.id not in SUDOERS:
                 admins = adminlist.get(message.chat.id)
                 if not admins:
                     return await message.reply_text(_["admin_13"])
                 else:
                     if message.from_user.id not in admins:
-                        if await is_skipmode(message.chat.id):
-                            upvote = await get_upvote_count(chat_id)
+                        if settings.skipmode:
+                            if chat_id == settings.chat_id:
+                                upvote = settings.upvotes
+                            else:
+                                upvote = await get_upvote_count(chat_id)
                             text = f"""<b>ᴀᴅᴍɪɴ ʀɪɢʜᴛs ɴᴇᴇᴅᴇᴅ</b>
 
 ʀᴇғʀᴇsʜ ᴀᴅᴍɪɴ ᴄᴀᴄʜᴇ ᴠɪᴀ : /reload
@@ -97,8 +96,8 @@ def AdminRightsCheck(mystic):
                             if chat_id not in confirmer:
                                 confirmer[chat_id] = {}
                             try:
-                                vidid = db[chat_id][0]["vidid"]
-                                file = db[chat_id][0]["file"]
+                                vidid = db[chat_id][0].vidid
+                                file = db[chat_id][0].file
                             except:
                                 return await message.reply_text(_["admin_14"])
                             senn = await message.reply_text(text, reply_markup=upl)
@@ -168,15 +167,14 @@ def ActualAdminCB(mystic):
                     f"{app.mention} ɪs ᴜɴᴅᴇʀ ᴍᴀɪɴᴛᴇɴᴀɴᴄᴇ, ᴠɪsɪᴛ sᴜᴘᴘᴏʀᴛ ᴄʜᴀᴛ ғᴏʀ ᴋɴᴏᴡɪɴɢ ᴛʜᴇ ʀᴇᴀsᴏɴ.",
                     show_alert=True,
                 )
+        settings = await get_chat_settings(CallbackQuery.message.chat.id)
         try:
-            language = await get_lang(CallbackQuery.message.chat.id)
-            _ = get_string(language)
+            _ = get_string(settings.lang)
         except:
             _ = get_string("en")
         if CallbackQuery.message.chat.type == ChatType.PRIVATE:
             return await mystic(client, CallbackQuery, _)
-        is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
-        if not is_non_admin:
+        if not settings.nonadmin:
             try:
                 a = (
                     await app.get_chat_member(
@@ -189,8 +187,7 @@ def ActualAdminCB(mystic):
             if not a.can_manage_video_chats:
                 if CallbackQuery.from_user.id not in SUDOERS:
                     token = await int_to_alpha(CallbackQuery.from_user.id)
-                    _check = await get_authuser_names(CallbackQuery.from_user.id)
-                    if token not in _check:
+                    if token not in settings.authusers:
                         try:
                             return await CallbackQuery.answer(
                                 _["general_4"],
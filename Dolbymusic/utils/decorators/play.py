@@ -14,13 +14,11 @@ from Dolbymusic import YouTube, app
 from Dolbymusic.misc import SUDOERS
 from Dolbymusic.utils.database import (
     get_assistant,
-    get_cmode,
-    get_lang,
-    get_playmode,
-    get_playtype,
+    get_chat_settings,
     is_active_chat,
     is_maintenance,
 )
+from Dolbymusic.utils.exceptions import AssistantErr
 from Dolbymusic.utils.inline import botplaylist_markup
 from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
 from strings import get_string
@@ -30,8 +28,8 @@ links = {}
 
 def PlayWrapper(command):
     async def wrapper(client, message):
-        language = await get_lang(message.chat.id)
-        _ = get_string(language)
+        settings = await get_chat_settings(message.chat.id)
+        _ = get_string(settings.lang)
         if message.sender_chat:
             upl = InlineKeyboardMarkup(
                 [
@@ -79,7 +77,7 @@ def PlayWrapper(command):
                     reply_markup=InlineKeyboardMarkup(buttons),
                 )
         if message.command[0][0] == "c":
-            chat_id = await get_cmode(message.chat.id)
+            chat_id = settings.cmode
             if chat_id is None:
                 return await message.reply_text(_["setting_7"])
             try:
@@ -90,9 +88,8 @@ def PlayWrapper(command):
         else:
             chat_id = message.chat.id
             channel = None
-        playmode = await get_playmode(message.chat.id)
-        playty = await get_playtype(message.chat.id)
-        if playty != "Everyone":
+        playmode = settings.playmode
+        if settings.playtype != "Everyone":
             if message.from_user.id not in SUDOERS:
                 admins = adminlist.get(message.chat.id)
                 if not admins:
@@ -115,7 +112,10 @@ def PlayWrapper(command):
             fplay = None
 
         if not await is_active_chat(chat_id):
-            userbot = await get_assistant(chat_id)
+            try:
+                userbot = await get_assistant(chat_id)
+            except AssistantErr as e:
+                return await message.reply_text(str(e))
             try:
                 try:
                     get = await app.get_chat_member(chat_id, userbot.id)
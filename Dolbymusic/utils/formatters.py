@@ -1,5 +1,15 @@
+import asyncio
 import json
-import subprocess
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import config
+from Dolbymusic.logging import LOGGER
+from Dolbymusic.utils.scheduler import PLAYBACK, media_scheduler
+from Dolbymusic.utils.writer import file_writer
 
 
 def get_readable_time(seconds: int) -> str:
@@ -123,40 +133,197 @@ def speed_converter(seconds, speed):
     return "-"
 
 
-def check_duration(file_path):
-    try:
-        command = [
-            "ffprobe",
-            "-loglevel",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            "-show_streams",
-            file_path,
-        ]
-
-        pipe = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        out, err = pipe.communicate()
-        
-        if not out:
-            return "Unknown"
-            
-        _json = json.loads(out)
-
-        if "format" in _json:
-            if "duration" in _json["format"]:
-                return float(_json["format"]["duration"])
-
-        if "streams" in _json:
-            for s in _json["streams"]:
-                if "duration" in s:
-                    return float(s["duration"])
-
+def _parse_duration(out):
+    if not out:
         return "Unknown"
-    except (subprocess.SubprocessError, FileNotFoundError, json.JSONDecodeError, ValueError):
-        # ffprobe not found or other error - return unknown duration
+    _json = json.loads(out)
+
+    if "format" in _json:
+        if "duration" in _json["format"]:
+            return float(_json["format"]["duration"])
+
+    if "streams" in _json:
+        for s in _json["streams"]:
+            if "duration" in s:
+                return float(s["duration"])
+
+    return "Unknown"
+
+
+def _duration_command(file_path):
+    return [
+        "ffprobe",
+        "-loglevel",
+        "quiet",
+        "-print_format",
+        "json",
+        "-show_format",
+        "-show_streams",
+        file_path,
+    ]
+
+
+class MediaProbe(NamedTuple):
+    duration: Optional[float]
+    format_name: Optional[str]
+    bitrate: Optional[int]
+    audio_codec: Optional[str]
+    video_codec: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+
+    @classmethod
+    def from_ffprobe(cls, out) -> "MediaProbe":
+        data = json.loads(out)
+        fmt = data.get("format") or {}
+        streams = data.get("streams") or []
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+        video = next((s for s in streams if s.get("codec_type") == "video"), {})
+        duration = _parse_duration(out)
+        return cls(
+            duration=duration if isinstance(duration, float) else None,
+            format_name=fmt.get("format_name"),
+            bitrate=int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+            audio_codec=audio.get("codec_name"),
+            video_codec=video.get("codec_name"),
+            width=video.get("width"),
+            height=video.get("height"),
+        )
+
+
+class ProbeCache:
+    """
+    ffprobe results keyed by file identity: path + mtime + size for local
+    files, the URL itself (for `url_ttl` seconds) for streams. Kept in memory
+    in LRU order and mirrored to a JSON index so restarts don't re-probe.
+    Concurrent probes of the same file share one ffprobe run.
+    """
+
+    def __init__(self, index_path: str, maxsize: int, url_ttl: int):
+        self.index_path = index_path
+        self.maxsize = maxsize
+        self.url_ttl = url_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._loaded = None
+        self._save_task = None
+
+    @staticmethod
+    def _identity(path: str):
+        if re.match(r"^[a-z]+://", path):
+            return path, None
+        real = os.path.realpath(path)
+        stat = os.stat(real)
+        return real, [stat.st_mtime_ns, stat.st_size]
+
+    def _read(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    async def _load(self):
+        # Parsing a few thousand entries would stall the loop; read in a thread.
+        index = await asyncio.to_thread(self._read)
+        try:
+            for key, (ident, stamp, fields) in index.items():
+                self._entries[key] = (ident, stamp, MediaProbe(*fields))
+        except (AttributeError, ValueError, TypeError):
+            pass
+
+    def _lookup(self, key, ident) -> Optional[MediaProbe]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        cached_ident, stamp, record = entry
+        fresh = (
+            cached_ident == ident
+            if ident is not None
+            else time.time() - stamp < self.url_ttl
+        )
+        if not fresh:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return record
+
+    async def probe(self, path: str, priority=PLAYBACK) -> Optional[MediaProbe]:
+        """Return the probe record for a file or URL, or None if ffprobe failed."""
+        if self._loaded is None:
+            self._loaded = asyncio.ensure_future(self._load())
+        await asyncio.shield(self._loaded)
+        try:
+            key, ident = self._identity(path)
+        except OSError:
+            return None
+        record = self._lookup(key, ident)
+        if record is not None:
+            self.hits += 1
+            return record
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._probe(path, key, ident, priority))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _probe(self, path, key, ident, priority) -> Optional[MediaProbe]:
+        try:
+            returncode, out = await media_scheduler.run(
+                _duration_command(path), priority, timeout=config.MEDIA_PROBE_TIMEOUT
+            )
+            if returncode != 0 or not out:
+                return None
+            record = MediaProbe.from_ffprobe(out)
+        except (OSError, asyncio.TimeoutError, ValueError):
+            return None
+        finally:
+            self._inflight.pop(key, None)
+        self._entries[key] = (ident, time.time(), record)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._schedule_save()
+        return record
+
+    def _schedule_save(self):
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.ensure_future(self._save())
+
+    async def _save(self):
+        # Batch the writes from a burst of probes into one index rewrite.
+        await asyncio.sleep(5)
+        index = {
+            key: [ident, stamp, list(record)]
+            for key, (ident, stamp, record) in self._entries.items()
+        }
+        temp = f"{self.index_path}.part"
+        try:
+            async with file_writer.open(temp, truncate=True) as f:
+                await f.write(json.dumps(index).encode())
+            os.replace(temp, self.index_path)
+        except OSError as e:
+            LOGGER(__name__).warning(f"Saving the probe index failed: {e}")
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+probe_cache = ProbeCache(
+    config.PROBE_INDEX_PATH,
+    config.PROBE_CACHE_SIZE,
+    config.PROBE_URL_TTL,
+)
+
+
+async def probe_duration(file_path, priority=PLAYBACK):
+    """Duration of a file or URL in seconds, or "Unknown"."""
+    record = await probe_cache.probe(file_path, priority)
+    if record is None or record.duration is None:
         return "Unknown"
+    return record.duration
 
 
 formats = [
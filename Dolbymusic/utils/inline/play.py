@@ -2,7 +2,7 @@ import math
 
 from pyrogram.types import InlineKeyboardButton
 
-from Dolbymusic.utils.formatters import time_to_seconds
+from Dolbymusic.misc import db
 
 
 def track_markup(_, videoid, user_id, channel, fplay):
@@ -27,11 +27,9 @@ def track_markup(_, videoid, user_id, channel, fplay):
     return buttons
 
 
-def stream_markup_timer(_, chat_id, played, dur):
-    played_sec = time_to_seconds(played)
-    duration_sec = time_to_seconds(dur)
-    percentage = (played_sec / duration_sec) * 100
-    umm = math.floor(percentage)
+def stream_markup_timer(_, chat_id):
+    state = db.get(chat_id)
+    umm = math.floor(state.progress) if state else 0
     if 0 < umm <= 10:
         bar = "🌸—————————"
     elif 10 < umm < 20:
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+import config
+
+# Priority classes, most urgent first.
+PLAYBACK = 0  # needed before something can start playing
+INTERACTIVE = 1  # a user is waiting on the result
+BACKGROUND = 2  # nice to have, e.g. pre-rendered speed variants
+
+PRIORITY_NAMES = {PLAYBACK: "playback", INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class MediaScheduler:
+    """
+    Single gate for every ffmpeg/ffprobe process the bot starts itself.
+
+    At most `limit` jobs run at once so the PyTgCalls encoders that are
+    actually streaming keep their CPU. Waiting jobs start in priority order,
+    and background jobs never take the last free slot. Cancelling the
+    awaiting task drops a queued job or kills a running process.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.background_limit = max(1, self.limit - 1)
+        self.running = 0
+        self.running_background = 0
+        self._waiting = {priority: deque() for priority in PRIORITY_NAMES}
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.wait_times = deque(maxlen=200)
+        self.run_times = deque(maxlen=200)
+
+    def _can_start(self, priority: int) -> bool:
+        if self.running >= self.limit:
+            return False
+        if priority == BACKGROUND:
+            return self.running_background < self.background_limit
+        return True
+
+    def _take(self, priority: int):
+        self.running += 1
+        if priority == BACKGROUND:
+            self.running_background += 1
+
+    async def _acquire(self, priority: int):
+        if self._can_start(priority) and not any(
+            self._waiting[p] for p in PRIORITY_NAMES if p <= priority
+        ):
+            self._take(priority)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled.
+                self._release(priority)
+            else:
+                try:
+                    self._waiting[priority].remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _release(self, priority: int):
+        self.running -= 1
+        if priority == BACKGROUND:
+            self.running_background -= 1
+        for waiting_priority, waiters in self._waiting.items():
+            while waiters and self._can_start(waiting_priority):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                self._take(waiting_priority)
+                waiter.set_result(None)
+
+    async def run(
+        self,
+        args: List[str],
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, bytes]:
+        """
+        Run a media tool and return (returncode, stdout). A timeout kills the
+        process and raises asyncio.TimeoutError.
+        """
+        queued = time.monotonic()
+        await self._acquire(priority)
+        started = time.monotonic()
+        self.wait_times.append(started - queued)
+        proc = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+            if proc.returncode == 0:
+                self.completed += 1
+            else:
+                self.failed += 1
+            return proc.returncode, out
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            if proc is not None and proc.returncode is None:
+                try:
+                    proc.kill()
+                    await proc.wait()
+                except ProcessLookupError:
+                    pass
+            self.run_times.append(time.monotonic() - started)
+            self._release(priority)
+
+    def stats(self) -> dict:
+        def p95(samples):
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            return round(ordered[int(0.95 * (len(ordered) - 1))], 3)
+
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "queued": {
+                PRIORITY_NAMES[p]: sum(not w.done() for w in waiters)
+                for p, waiters in self._waiting.items()
+            },
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "wait_p95": p95(self.wait_times),
+            "run_p95": p95(self.run_times),
+        }
+
+
+def _default_limit() -> int:
+    if config.MEDIA_JOB_LIMIT:
+        return config.MEDIA_JOB_LIMIT
+    # Half the cores: the other half belongs to the encoders feeding live calls.
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+media_scheduler = MediaScheduler(_default_limit())
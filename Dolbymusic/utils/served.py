@@ -0,0 +1,96 @@
+import asyncio
+
+import config
+from Dolbymusic.core.storage import storage
+from Dolbymusic.logging import LOGGER
+
+
+class ServedBuffer:
+    """
+    Write-behind buffer for the served users/chats tables.
+
+    Ids are collected in memory and saved with one write_many every
+    SERVED_FLUSH_INTERVAL seconds, or as soon as SERVED_BATCH_SIZE are
+    waiting. Ids already written are remembered, so repeat /starts cost
+    nothing; the set is bounded and simply forgotten when full, since the
+    writes are idempotent anyway.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        key: str,
+        interval: int,
+        batch_size: int,
+        known_size: int,
+    ):
+        self.table = table
+        self.key = key
+        self.interval = interval
+        self.batch_size = batch_size
+        self.known_size = known_size
+        self.known = set()
+        self.pending = set()
+        self.written = 0
+        self.batches = 0
+        self._task = None
+
+    def __contains__(self, value: int) -> bool:
+        return value in self.known or value in self.pending
+
+    def add(self, value: int):
+        if value in self:
+            return
+        self.pending.add(value)
+        if len(self.pending) >= self.batch_size:
+            asyncio.ensure_future(self.flush())
+        elif self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._work())
+
+    def remember(self, value: int):
+        if len(self.known) >= self.known_size:
+            self.known.clear()
+        self.known.add(value)
+
+    async def _work(self):
+        while self.pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        batch = self.pending
+        self.pending = set()
+        try:
+            await storage.write_many(self.table, {value: {} for value in batch})
+        except Exception as e:
+            self.pending |= batch
+            LOGGER(__name__).warning(
+                f"Saving {len(batch)} served {self.key}s failed: {e}"
+            )
+            return
+        self.batches += 1
+        self.written += len(batch)
+        for value in batch:
+            self.remember(value)
+
+
+served_users = ServedBuffer(
+    "tgusersdb",
+    "user_id",
+    config.SERVED_FLUSH_INTERVAL,
+    config.SERVED_BATCH_SIZE,
+    config.SERVED_KNOWN_SIZE,
+)
+served_chats = ServedBuffer(
+    "chats",
+    "chat_id",
+    config.SERVED_FLUSH_INTERVAL,
+    config.SERVED_BATCH_SIZE,
+    config.SERVED_KNOWN_SIZE,
+)
+
+
+async def flush_served():
+    await asyncio.gather(served_users.flush(), served_chats.flush())
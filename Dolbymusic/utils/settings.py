@@ -0,0 +1,178 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+import config
+
+_MISSING = object()
+
+
+class SettingCache:
+    """
+    Read cache for one setting stored in Mongo (a chat's language, the
+    global autoend flag, ...).
+
+    `load` turns a key into the stored value or the setting's default, and
+    the default is cached like any other value, so chats that never changed
+    a setting don't query Mongo on every command either. Setters go through
+    `set`, which updates the cache before writing, so values only expire to
+    pick up edits made outside this process. Entries are bounded LRU-style
+    and concurrent misses for the same key share one query.
+    """
+
+    caches: Dict[str, "SettingCache"] = {}
+
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[Hashable], Awaitable],
+        maxsize: int = config.SETTINGS_CACHE_SIZE,
+        ttl: float = config.SETTINGS_CACHE_TTL,
+    ):
+        self.name = name
+        self.load = load
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._inflight = {}
+        # Bumped on every write so a query started before it can't
+        # overwrite the new value with what it read.
+        self._generation = 0
+        self._watchers: List[Callable[[Hashable], None]] = []
+        SettingCache.caches[name] = self
+
+    def watch(self, callback: Callable[[Hashable], None]):
+        """Call `callback(key)` whenever a key is written or invalidated."""
+        self._watchers.append(callback)
+
+    def _changed(self, key):
+        self._generation += 1
+        for callback in self._watchers:
+            callback(key)
+
+    def peek(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key):
+        value = self.peek(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fill(key, self._generation))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, generation: int):
+        try:
+            value = await self.load(key)
+            if generation == self._generation:
+                self._store(key, value)
+                return value
+            # Written while we were reading: the write wins.
+            written = self.peek(key)
+            return value if written is _MISSING else written
+        finally:
+            self._inflight.pop(key, None)
+
+    async def set(self, key, value, write: Awaitable = None):
+        """Cache `value` for `key`, then await the database write for it."""
+        self._changed(key)
+        self._store(key, value)
+        if write is None:
+            return
+        try:
+            return await write
+        except:
+            self.invalidate(key)
+            raise
+
+    def invalidate(self, key):
+        self._changed(key)
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._generation += 1
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+
+class ChatSettings:
+    """
+    Everything the command decorators need to know about a chat, read in
+    one go. Snapshots are cached and dropped whenever one of the settings
+    they were built from changes; treat them as read-only.
+    """
+
+    __slots__ = (
+        "chat_id",
+        "lang",
+        "cmode",
+        "playmode",
+        "playtype",
+        "nonadmin",
+        "skipmode",
+        "upvotes",
+        "authusers",
+    )
+
+    def __init__(
+        self,
+        chat_id: int,
+        lang: str,
+        cmode: Optional[int],
+        playmode: str,
+        playtype: str,
+        nonadmin: bool,
+        skipmode: bool,
+        upvotes: int,
+        authusers: Dict[str, dict],
+    ):
+        self.chat_id = chat_id
+        self.lang = lang
+        self.cmode = cmode
+        self.playmode = playmode
+        self.playtype = playtype
+        self.nonadmin = nonadmin
+        self.skipmode = skipmode
+        self.upvotes = upvotes
+        self.authusers = authusers
+
+    def __repr__(self) -> str:
+        return f"<ChatSettings {self.chat_id} {self.lang}>"
+
+
+def settings_stats() -> Dict[str, dict]:
+    return {name: cache.stats() for name, cache in SettingCache.caches.items()}
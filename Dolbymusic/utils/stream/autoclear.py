@@ -1,18 +1,17 @@
-import os
-
-from config import autoclean
+from Dolbymusic.misc import db
+from Dolbymusic.utils.stream.cache import download_cache
 
 
 async def auto_clean(popped):
     try:
-        rem = popped["file"]
-        autoclean.remove(rem)
-        count = autoclean.count(rem)
-        if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
+        download_cache.release(popped.file)
     except:
         pass
+
+
+async def clear_queue(chat_id):
+    state = db.get(chat_id)
+    if not state:
+        return
+    for popped in state.clear():
+        await auto_clean(popped)
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+import config
+from Dolbymusic.logging import LOGGER
+
+
+class DownloadCache:
+    """
+    Content-addressed store for downloaded media.
+
+    Files are keyed by video id + format, so the same track queued in many
+    chats is downloaded once. Concurrent requests for one file wait on the
+    same download, which is written to a temp file and renamed into place.
+    Queue entries hold references; unreferenced files are evicted in LRU
+    order once the directory grows past the byte budget.
+
+    The directory belongs to the cache: everything in it may be evicted, so
+    other files must not be stored there.
+    """
+
+    def __init__(self, directory: str, budget: int):
+        self.directory = directory
+        self.budget = budget
+        self._files = OrderedDict()
+        self._refs = {}
+        self._inflight = {}
+        self._waiters = {}
+        self.scan()
+
+    def path_for(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def scan(self):
+        """Index files left over from a previous run so they count toward the budget."""
+        self._files.clear()
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path):
+                continue
+            if name.endswith(".part"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_atime, path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._files[path] = size
+        self._evict()
+
+    @property
+    def size(self) -> int:
+        return sum(self._files.values())
+
+    def _touch(self, path: str) -> bool:
+        if path in self._files:
+            if os.path.isfile(path):
+                self._files.move_to_end(path)
+                return True
+            del self._files[path]
+        return False
+
+    def _track(self, path: str):
+        self._files[path] = os.path.getsize(path)
+        self._files.move_to_end(path)
+
+    async def fetch(
+        self, key: str, ext: str, download: Callable[[str], Awaitable[bool]]
+    ) -> Optional[str]:
+        """
+        Return the cached path for key/ext, running download(temp_path) if
+        it isn't cached yet. Returns None when the download fails.
+
+        The path comes with a reference taken for the caller, so it can't be
+        evicted before the caller queues it; release() it when done.
+        """
+        path = self.path_for(key, ext)
+        if self._touch(path):
+            self._refs[path] = self._refs.get(path, 0) + 1
+            return path
+        task = self._inflight.get(path)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(path, download))
+            self._inflight[path] = task
+        self._waiters[path] = self._waiters.get(path, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.done():
+                # _fill already took a reference for us.
+                if not task.cancelled() and task.result():
+                    self.release(path)
+            elif self._waiters.get(path) == 1:
+                # Nobody else wants this file, so stop downloading it.
+                task.cancel()
+            raise
+        finally:
+            self._waiters[path] -= 1
+            if not self._waiters[path]:
+                del self._waiters[path]
+
+    async def _fill(self, path: str, download) -> Optional[str]:
+        os.makedirs(self.directory, exist_ok=True)
+        temp = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            if not await download(temp) or not os.path.isfile(temp):
+                return None
+            os.replace(temp, path)
+            self._track(path)
+            # One reference per caller waiting, taken before anything else
+            # can run and evict the file.
+            self._refs[path] = self._refs.get(path, 0) + self._waiters.get(path, 0)
+            self._evict()
+            return path
+        except Exception as e:
+            LOGGER(__name__).warning(f"Download for {path} failed: {e}")
+            return None
+        finally:
+            self._inflight.pop(path, None)
+            if os.path.exists(temp):
+                try:
+                    os.remove(temp)
+                except OSError:
+                    pass
+
+    def owns(self, path) -> bool:
+        """Whether path names a file in the cache directory, present or not."""
+        if not isinstance(path, str):
+            return False
+        return os.path.dirname(os.path.realpath(path)) == self.directory
+
+    def _managed(self, path) -> Optional[str]:
+        if not isinstance(path, str) or not os.path.isfile(path):
+            return None
+        path = os.path.realpath(path)
+        if os.path.dirname(path) != self.directory:
+            return None
+        return path
+
+    def acquire(self, path):
+        """Take a reference on a file so it survives eviction while queued."""
+        path = self._managed(path)
+        if not path:
+            return
+        self._refs[path] = self._refs.get(path, 0) + 1
+        if not self._touch(path):
+            self._track(path)
+
+    def release(self, path):
+        if isinstance(path, str):
+            path = os.path.realpath(path)
+        if path not in self._refs:
+            return
+        self._refs[path] -= 1
+        if self._refs[path] <= 0:
+            del self._refs[path]
+            self._evict()
+
+    def _evict(self):
+        total = self.size
+        for path in list(self._files):
+            if total <= self.budget:
+                break
+            if self._refs.get(path) or path in self._inflight:
+                continue
+            total -= self._files.pop(path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._files),
+            "bytes": self.size,
+            "budget": self.budget,
+            "referenced": len(self._refs),
+            "downloading": len(self._inflight),
+        }
+
+
+download_cache = DownloadCache(
+    os.path.realpath(os.path.join("downloads", "cache")), config.DOWNLOAD_CACHE_LIMIT_MB * 1024 * 1024
+)
@@ -0,0 +1,37 @@
+import time
+
+
+class PlaybackClock:
+    """
+    Position of the stream playing in one chat, derived from timestamps.
+
+    `played` is in stream time, i.e. already sped up when a speed is applied,
+    like ChatPlayback.seconds. Time spent paused is excluded, so nothing has
+    to tick while the call is running.
+    """
+
+    __slots__ = ("offset", "started", "paused_at", "paused_for")
+
+    def __init__(self, offset: float = 0, paused: bool = False):
+        now = time.monotonic()
+        self.offset = float(offset)
+        self.started = now
+        self.paused_at = now if paused else None
+        self.paused_for = 0.0
+
+    @property
+    def paused(self) -> bool:
+        return self.paused_at is not None
+
+    def pause(self):
+        if self.paused_at is None:
+            self.paused_at = time.monotonic()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.paused_for += time.monotonic() - self.paused_at
+            self.paused_at = None
+
+    def played(self) -> float:
+        now = self.paused_at if self.paused_at is not None else time.monotonic()
+        return max(0.0, self.offset + now - self.started - self.paused_for)
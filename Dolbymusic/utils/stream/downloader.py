@@ -0,0 +1,161 @@
+import asyncio
+import os
+import re
+from typing import Optional
+
+import httpx
+
+import config
+from Dolbymusic.logging import LOGGER
+from Dolbymusic.utils.writer import file_writer
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    pass
+
+
+class Downloader:
+    """
+    HTTP file downloader that resumes with Range requests after a dropped
+    connection, retries with exponential backoff and checks the final size
+    against Content-Length. Large files on servers that accept ranges are
+    fetched as parallel segments.
+    """
+
+    def __init__(
+        self,
+        retries: int,
+        backoff: float,
+        segments: int,
+        segment_threshold: int,
+        chunk_size: int = 1024 * 128,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        self.chunk_size = chunk_size
+
+    async def fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        dest: str,
+        params: Optional[dict] = None,
+        segmented: bool = False,
+        timeout=None,
+    ) -> bool:
+        """Download url into dest. Returns False once every retry is spent."""
+        try:
+            total = None
+            if segmented and self.segments > 1:
+                total = await self._probe(client, url, params, timeout)
+            if total and total >= self.segment_threshold:
+                await self._fetch_segmented(client, url, dest, params, total, timeout)
+            else:
+                await file_writer.open(dest, truncate=True).close()
+                total = await self._fetch_range(client, url, dest, params, 0, None, timeout)
+            size = os.path.getsize(dest)
+            if total is not None and size != total:
+                raise DownloadError(f"expected {total} bytes, got {size}")
+            return True
+        except (DownloadError, httpx.HTTPError, OSError) as e:
+            LOGGER(__name__).warning(f"Download of {url} failed: {e}")
+            return False
+
+    async def _probe(self, client, url, params, timeout) -> Optional[int]:
+        """Return the full size if the server honours byte ranges."""
+        try:
+            async with client.stream(
+                "GET", url, params=params, headers={"Range": "bytes=0-0"}, timeout=timeout
+            ) as r:
+                if r.status_code != 206:
+                    return None
+                return _content_range_total(r.headers.get("content-range"))
+        except httpx.HTTPError:
+            return None
+
+    async def _fetch_segmented(self, client, url, dest, params, total, timeout):
+        async with file_writer.open(dest, truncate=True, preallocate=total):
+            pass
+        step = -(-total // self.segments)
+        tasks = [
+            asyncio.ensure_future(
+                self._fetch_range(
+                    client, url, dest, params, start, min(start + step, total) - 1, timeout
+                )
+            )
+            for start in range(0, total, step)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # gather leaves the other segments running when one fails; stop
+            # them before the caller deletes dest, or they would recreate it.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch_range(self, client, url, dest, params, start, end, timeout):
+        """
+        Write bytes start..end (inclusive, None for EOF) of url into dest at
+        the same offset, resuming from the last written byte on failure.
+        Returns the full size reported by the server, if any.
+        """
+        position = start
+        total = None
+        for attempt in range(self.retries + 1):
+            if end is not None and position > end:
+                return total
+            headers = {}
+            if position or end is not None:
+                headers["Range"] = f"bytes={position}-{'' if end is None else end}"
+            try:
+                async with client.stream(
+                    "GET", url, params=params, headers=headers, timeout=timeout
+                ) as r:
+                    if r.status_code == 206:
+                        total = _content_range_total(r.headers.get("content-range"))
+                    elif r.status_code == 200:
+                        if position or end is not None:
+                            # Server ignored the range; start this file over.
+                            if end is not None:
+                                raise DownloadError("server does not support ranges")
+                            position = 0
+                        length = r.headers.get("content-length")
+                        total = int(length) if length else None
+                    elif r.status_code in RETRY_STATUS:
+                        raise httpx.TransportError(f"HTTP {r.status_code}")
+                    else:
+                        raise DownloadError(f"HTTP {r.status_code}")
+                    async with file_writer.open(dest, offset=position) as f:
+                        if r.status_code == 200:
+                            await f.truncate()
+                        async for chunk in r.aiter_bytes(self.chunk_size):
+                            await f.write(chunk)
+                            position += len(chunk)
+                expected = end + 1 if end is not None else total
+                if expected is None or position >= expected:
+                    return total
+            except httpx.TransportError as e:
+                LOGGER(__name__).info(
+                    f"Download of {url} interrupted at byte {position}: {e}"
+                )
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2**attempt)
+        raise DownloadError(f"gave up at byte {position} after {self.retries} retries")
+
+
+def _content_range_total(value: Optional[str]) -> Optional[int]:
+    match = re.match(r"bytes \d+-\d+/(\d+)", value or "")
+    return int(match.group(1)) if match else None
+
+
+downloader = Downloader(
+    config.DOWNLOAD_RETRIES,
+    config.DOWNLOAD_RETRY_BACKOFF,
+    config.DOWNLOAD_SEGMENTS,
+    config.DOWNLOAD_SEGMENT_THRESHOLD_MB * 1024 * 1024,
+)
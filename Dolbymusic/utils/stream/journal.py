@@ -0,0 +1,214 @@
+import asyncio
+import os
+import time
+
+import config
+from Dolbymusic import YouTube
+from Dolbymusic.core.assistants import pool
+from Dolbymusic.core.call import AyushSolo
+from Dolbymusic.core.storage import storage
+from Dolbymusic.logging import LOGGER
+from Dolbymusic.misc import db
+from Dolbymusic.utils.database import (
+    active,
+    activevideo,
+    assistantdict,
+    music_off,
+)
+from Dolbymusic.utils.stream.autoclear import auto_clean, clear_queue
+from Dolbymusic.utils.stream.cache import download_cache
+from Dolbymusic.utils.stream.prefetch import prefetcher
+from Dolbymusic.utils.stream.queue import bind_queue_file
+from Dolbymusic.utils.stream.state import QueueEntry, changed, chat_playback
+
+# Record holding the last time the journal was written while something played.
+HEARTBEAT = 0
+
+# Entries whose file can't be fetched again from their vidid.
+LOCAL_SOURCES = ("telegram", "soundcloud")
+
+
+def _saved_entry(entry: QueueEntry) -> dict:
+    data = entry.as_dict()
+    # A cached download may be evicted before the next start, so save the
+    # source and let resume fetch it through the cache again.
+    if download_cache.owns(entry.file) and entry.vidid not in LOCAL_SOURCES:
+        data["file"] = f"vid_{entry.vidid}"
+    return data
+
+
+class PlaybackJournal:
+    """
+    Saves every playing chat's queue, position and assistant to storage so a
+    restart or a dyno cycle can pick up where it left off.
+
+    ChatPlayback marks a chat as changed whenever its queue, clock or loop
+    changes; the flush task writes only those chats, in one write_many every
+    PLAYBACK_JOURNAL_INTERVAL seconds. Positions are not rewritten while a
+    track simply plays: each record stores when it was saved, and a single
+    heartbeat record tells how long playback went on after that.
+    """
+
+    def __init__(self, table: str, interval: int):
+        self.table = table
+        self.interval = interval
+        self._task = None
+
+    def _record(self, chat_id: int, now: float):
+        state = db.get(chat_id)
+        if not state or chat_id not in active:
+            return None
+        return {
+            "chat_id": chat_id,
+            "assistant": assistantdict.get(chat_id),
+            "video": chat_id in activevideo,
+            "loop": state.loop,
+            "speed": state.speed,
+            "position": state.position,
+            "paused": bool(state.clock and state.clock.paused),
+            "saved_at": now,
+            "queue": [_saved_entry(entry) for entry in state],
+        }
+
+    async def flush(self):
+        chats = set(changed)
+        changed.clear()
+        now = time.time()
+        # None deletes the chat's record.
+        writes = {chat_id: self._record(chat_id, now) for chat_id in chats}
+        if active:
+            writes[HEARTBEAT] = {"at": now}
+        if not writes:
+            return
+        try:
+            await storage.write_many(self.table, writes)
+        except Exception as e:
+            changed.update(chats)
+            LOGGER(__name__).warning(f"Saving playback journal failed: {e}")
+
+    async def _work(self):
+        while not await asyncio.sleep(self.interval):
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._work())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _source(self, chat_id: int, entry: QueueEntry):
+        """Something PyTgCalls can play for the entry, or None."""
+        file = str(entry.file)
+        if "live_" in file:
+            n, link = await YouTube.video(entry.vidid, True)
+            return link if n else None
+        if "index_" in file:
+            return entry.vidid
+        if os.path.isfile(file):
+            return file
+        if entry.vidid in LOCAL_SOURCES:
+            return None
+        file_path, _ = await YouTube.download(
+            entry.vidid, None, videoid=True, video=entry.video
+        )
+        if not file_path:
+            return None
+        await bind_queue_file(chat_id, file_path)
+        return file_path
+
+    async def _resume_chat(self, record: dict, stopped_at: float):
+        chat_id = record["chat_id"]
+        entries = [QueueEntry.from_dict(entry) for entry in record.get("queue") or []]
+        if not entries:
+            changed.add(chat_id)
+            return False
+        position = float(record.get("position") or 0)
+        if not record.get("paused") and stopped_at:
+            position += max(0.0, stopped_at - record["saved_at"]) * float(
+                record.get("speed") or 1.0
+            )
+        number = record.get("assistant")
+        if number and pool.usable(number, chat_id):
+            assistantdict[chat_id] = number
+        state = chat_playback(chat_id)
+        state.clear()
+        state.loop = record.get("loop") or 0
+        for entry in entries:
+            state.push(entry)
+            download_cache.acquire(entry.file)
+        try:
+            while state:
+                entry = state.current
+                if entry.seconds and position >= int(entry.seconds):
+                    # The track would have finished while the bot was down.
+                    await auto_clean(state.pop())
+                    position = 0
+                    continue
+                source = await self._source(chat_id, entry)
+                if source:
+                    break
+                await auto_clean(state.pop())
+                position = 0
+            else:
+                return False
+            seek = int(position) if entry.seconds and "live_" not in str(entry.file) else 0
+            await AyushSolo.join_call(
+                chat_id,
+                entry.chat_id,
+                source,
+                video=True if entry.video else None,
+                position=seek,
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not resume playback in {chat_id}: {e}")
+            await clear_queue(chat_id)
+            return False
+        if record.get("paused"):
+            await music_off(chat_id)
+            try:
+                await AyushSolo.pause_stream(chat_id)
+            except:
+                pass
+        prefetcher.schedule(chat_id)
+        return True
+
+    async def resume(self):
+        """Rejoin the calls that were playing when the bot stopped, in parallel."""
+        heartbeat = await storage.get(self.table, HEARTBEAT)
+        stopped_at = heartbeat["at"] if heartbeat else None
+        records = [
+            record
+            async for chat_id, record in storage.items(self.table)
+            if chat_id != HEARTBEAT
+        ]
+        if not records:
+            return
+        if (
+            not config.RESUME_PLAYBACK
+            or not stopped_at
+            or time.time() - stopped_at > config.RESUME_MAX_AGE
+        ):
+            await storage.clear(self.table)
+            return
+        semaphore = asyncio.Semaphore(config.RESUME_CONCURRENCY)
+
+        async def resume_one(record):
+            async with semaphore:
+                return await self._resume_chat(record, stopped_at)
+
+        results = await asyncio.gather(
+            *[resume_one(record) for record in records], return_exceptions=True
+        )
+        resumed = sum(result is True for result in results)
+        for record, result in zip(records, results):
+            if result is not True:
+                changed.add(record["chat_id"])
+        LOGGER(__name__).info(f"Resumed playback in {resumed}/{len(records)} chats.")
+        await self.flush()
+
+
+journal = PlaybackJournal("playback", config.PLAYBACK_JOURNAL_INTERVAL)
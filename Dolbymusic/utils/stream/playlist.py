@@ -0,0 +1,31 @@
+import asyncio
+
+import config
+from Dolbymusic import YouTube
+
+
+async def resolve_playlist(result, videoid: bool = True):
+    """
+    Resolve playlist entries through YouTube.details with at most
+    PLAYLIST_RESOLVE_CONCURRENCY lookups in flight.
+    Yields each entry's details in the original order as soon as it is ready,
+    so the first track can start playing while the rest are still resolving.
+    Entries that fail to resolve are yielded as None.
+    """
+    semaphore = asyncio.Semaphore(config.PLAYLIST_RESOLVE_CONCURRENCY)
+
+    async def resolve(search):
+        async with semaphore:
+            try:
+                return await YouTube.details(search, videoid)
+            except:
+                return None
+
+    tasks = [asyncio.create_task(resolve(search)) for search in result]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,72 @@
+import asyncio
+
+import config
+from Dolbymusic import YouTube
+from Dolbymusic.misc import db
+from Dolbymusic.utils.stream.cache import download_cache
+
+
+class Prefetcher:
+    """
+    Downloads the next few "vid_" entries of a chat's queue in the background
+    so change_stream finds them ready in the download cache.
+    A prefetched file keeps a cache reference until its entry leaves the
+    front of the queue; entries skipped, shuffled away or cleared are cancelled.
+    """
+
+    def __init__(self, depth: int, concurrency: int):
+        self.depth = depth
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._tasks = {}
+        self._files = {}
+
+    def _window(self, chat_id, start: int) -> set:
+        keys = set()
+        for entry in (db.get(chat_id) or [])[start : 1 + self.depth]:
+            if "vid_" in str(entry.file):
+                keys.add((entry.vidid, entry.video))
+        return keys
+
+    def schedule(self, chat_id):
+        if self.depth <= 0:
+            return
+        wanted = self._window(chat_id, 1)
+        # The entry now playing keeps its prefetched file until it is bound to the queue.
+        keep = wanted | self._window(chat_id, 0)
+        tasks = self._tasks.setdefault(chat_id, {})
+        files = self._files.setdefault(chat_id, {})
+        for key in list(tasks):
+            if key not in keep:
+                tasks.pop(key).cancel()
+        for key in list(files):
+            if key not in keep:
+                download_cache.release(files.pop(key))
+        for key in wanted:
+            if key not in tasks and key not in files:
+                tasks[key] = asyncio.create_task(self._prefetch(chat_id, key))
+
+    async def _prefetch(self, chat_id, key):
+        vidid, video = key
+        try:
+            async with self.semaphore:
+                result = await YouTube.download(vidid, None, videoid=True, video=video)
+            if isinstance(result, tuple) and result[0]:
+                # Keeps the reference the download came with.
+                self._files.setdefault(chat_id, {})[key] = result[0]
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        finally:
+            tasks = self._tasks.get(chat_id)
+            if tasks and tasks.get(key) is asyncio.current_task():
+                del tasks[key]
+
+    def cancel(self, chat_id):
+        for task in self._tasks.pop(chat_id, {}).values():
+            task.cancel()
+        for path in self._files.pop(chat_id, {}).values():
+            download_cache.release(path)
+
+
+prefetcher = Prefetcher(config.PREFETCH_DEPTH, config.PREFETCH_CONCURRENCY)
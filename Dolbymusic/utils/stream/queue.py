@@ -1,9 +1,12 @@
-import asyncio
+import os
 from typing import Union
 
 from Dolbymusic.misc import db
-from Dolbymusic.utils.formatters import check_duration, seconds_to_min
-from config import autoclean, time_to_seconds
+from Dolbymusic.utils.formatters import probe_duration, seconds_to_min
+from Dolbymusic.utils.stream.cache import download_cache
+from Dolbymusic.utils.stream.prefetch import prefetcher
+from Dolbymusic.utils.stream.state import QueueEntry, chat_playback
+from config import time_to_seconds
 
 
 async def put_queue(
@@ -23,28 +26,23 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "user_id": user_id,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
+    put = QueueEntry(
+        title,
+        duration,
+        stream,
+        user,
+        original_chat_id,
+        file,
+        vidid,
+        user_id,
+        duration_in_seconds,
+    )
     if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+        chat_playback(chat_id).push_front(put)
     else:
-        db[chat_id].append(put)
-    autoclean.append(file)
+        chat_playback(chat_id).push(put)
+    download_cache.acquire(file)
+    prefetcher.schedule(chat_id)
 
 
 async def put_queue_index(
@@ -60,32 +58,36 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = await probe_duration(vidid)
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
+    put = QueueEntry(
+        title, duration, stream, user, original_chat_id, file, vidid, seconds=dur
+    )
     if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+        chat_playback(chat_id).push_front(put)
     else:
-        db[chat_id].append(put)
+        chat_playback(chat_id).push(put)
+    prefetcher.schedule(chat_id)
+
+
+async def bind_queue_file(chat_id, file_path):
+    """
+    Point the playing "vid_" entry at the file it was downloaded to, so
+    seek/loop reuse the local copy. The queue takes over the cache reference
+    YouTube.download returned with the file.
+    """
+    check = db.get(chat_id)
+    if not check:
+        download_cache.release(file_path)
+        return
+    if not isinstance(file_path, str) or not os.path.isfile(file_path):
+        return
+    download_cache.release(check.current.file)
+    check.current.file = file_path
+    check.touch()
+    prefetcher.schedule(chat_id)
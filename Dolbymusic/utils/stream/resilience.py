@@ -0,0 +1,211 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+import httpx
+
+from Dolbymusic.logging import LOGGER
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class ApiUnavailable(Exception):
+    pass
+
+
+class LatencyTracker:
+    """Rolling latency window and error count for one API endpoint."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.hedged = 0
+
+    def record(self, seconds: float, ok: bool):
+        self.requests += 1
+        self.samples.append(seconds)
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedged": self.hedged,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+        }
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls until
+    `reset_after` seconds pass, then lets a single probe through. The probe's
+    result closes the breaker again or re-opens it for another period.
+    """
+
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = 0.0
+        self._open = False
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if not self._open:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self._open = False
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            self._open = True
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def abandon(self):
+        """A probe was cancelled before it finished; let the next call retry."""
+        self._probing = False
+
+
+class ResilientAPI:
+    """
+    GET wrapper for the YouTube API with a circuit breaker per base URL,
+    latency tracking per endpoint, a hedged second request once a call runs
+    past `hedge_after` seconds, and failover through the base URLs in order.
+    5xx and 429 responses count as failures; other statuses are returned.
+    """
+
+    def __init__(
+        self,
+        client: Callable[[], httpx.AsyncClient],
+        base_urls: List[str],
+        hedge_after: float,
+        threshold: int,
+        reset_after: float,
+    ):
+        self._client = client
+        self.bases = list(dict.fromkeys(base.rstrip("/") for base in base_urls))
+        self.hedge_after = hedge_after
+        self.breakers = {base: CircuitBreaker(threshold, reset_after) for base in self.bases}
+        self.endpoints = {}
+
+    def base_url(self) -> str:
+        """First base URL whose breaker is not open, for URLs handed to ffmpeg or the downloader."""
+        for base in self.bases:
+            if self.breakers[base].state != OPEN:
+                return base
+        return self.bases[0]
+
+    def tracker(self, path: str) -> LatencyTracker:
+        if path not in self.endpoints:
+            self.endpoints[path] = LatencyTracker()
+        return self.endpoints[path]
+
+    async def _attempt(self, base: str, path: str, params) -> httpx.Response:
+        breaker = self.breakers[base]
+        tracker = self.tracker(path)
+        start = time.monotonic()
+        try:
+            r = await self._client().get(f"{base}{path}", params=params)
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
+        except httpx.HTTPError:
+            breaker.failure()
+            tracker.record(time.monotonic() - start, False)
+            raise
+        ok = r.status_code < 500 and r.status_code != 429
+        tracker.record(time.monotonic() - start, ok)
+        if not ok:
+            breaker.failure()
+            raise ApiUnavailable(f"{base}{path} returned HTTP {r.status_code}")
+        breaker.success()
+        return r
+
+    async def get(self, path: str, params: Optional[dict] = None) -> httpx.Response:
+        """Raises ApiUnavailable when every base URL failed or is fenced off."""
+        remaining = iter(self.bases)
+        pending = {}
+        error = None
+        hedged = False
+
+        def launch(bases) -> bool:
+            for base in bases:
+                if self.breakers[base].allow():
+                    task = asyncio.ensure_future(self._attempt(base, path, params))
+                    pending[task] = base
+                    return True
+            return False
+
+        if not launch(remaining):
+            raise ApiUnavailable(f"circuit open for every API base URL ({path})")
+        try:
+            while pending:
+                timeout = None
+                if self.hedge_after and not hedged:
+                    timeout = self.hedge_after
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Slow call: race a second request, preferring the next
+                    # base URL and falling back to the one that is lagging.
+                    hedged = True
+                    if launch(remaining) or launch(list(pending.values())):
+                        self.tracker(path).hedged += 1
+                    continue
+                for task in done:
+                    base = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                    LOGGER(__name__).info(f"API call {base}{path} failed: {error}")
+                if not pending:
+                    launch(remaining)
+        finally:
+            for task in pending:
+                task.cancel()
+        raise ApiUnavailable(f"{path} failed on every API base URL: {error}")
+
+    def stats(self) -> dict:
+        return {
+            "breakers": {
+                base or "(default)": {
+                    "state": breaker.state,
+                    "failures": breaker.failures,
+                }
+                for base, breaker in self.breakers.items()
+            },
+            "endpoints": {
+                path: tracker.stats() for path, tracker in self.endpoints.items()
+            },
+        }
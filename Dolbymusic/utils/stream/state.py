@@ -0,0 +1,225 @@
+import random
+from collections import deque
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple, Union
+
+from Dolbymusic.misc import db
+from Dolbymusic.utils.formatters import seconds_to_min
+from Dolbymusic.utils.stream.clock import PlaybackClock
+
+# Chats whose state changed since the playback journal last saved them.
+changed = set()
+
+
+class QueueEntry:
+    """One queued track. `dur` and `seconds` are the original duration."""
+
+    __slots__ = (
+        "title",
+        "dur",
+        "streamtype",
+        "by",
+        "chat_id",
+        "file",
+        "vidid",
+        "user_id",
+        "seconds",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        dur: str,
+        streamtype: str,
+        by: str,
+        chat_id: int,
+        file: str,
+        vidid: str,
+        user_id: int = None,
+        seconds: int = 0,
+    ):
+        self.title = title
+        self.dur = dur
+        self.streamtype = streamtype
+        self.by = by
+        self.chat_id = chat_id
+        self.file = file
+        self.vidid = vidid
+        self.user_id = user_id
+        self.seconds = seconds
+
+    @property
+    def video(self) -> bool:
+        return str(self.streamtype) == "video"
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QueueEntry":
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __repr__(self) -> str:
+        return f"<QueueEntry {self.vidid} {self.title!r}>"
+
+
+class ChatPlayback:
+    """
+    Everything a chat's player knows: the queue (current track first), the
+    loop count, the applied speed, the playback clock and the "now playing"
+    message of the current track.
+
+    The queue is a deque, so the ends are O(1) and indexed access stays
+    cheap near the front, which is where /queue and the prefetcher look.
+    """
+
+    __slots__ = (
+        "chat_id",
+        "queue",
+        "loop",
+        "speed",
+        "speed_path",
+        "clock",
+        "mystic",
+        "markup",
+    )
+
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.queue = deque()
+        self.loop = 0
+        self.speed = 1.0
+        self.speed_path = None
+        self.clock = None
+        self.mystic = None
+        self.markup = None
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def __iter__(self) -> Iterator[QueueEntry]:
+        return iter(self.queue)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return list(islice(self.queue, index.start, index.stop, index.step))
+        return self.queue[index]
+
+    @property
+    def current(self) -> Optional[QueueEntry]:
+        return self.queue[0] if self.queue else None
+
+    def touch(self):
+        changed.add(self.chat_id)
+
+    def push(self, entry: QueueEntry):
+        self.queue.append(entry)
+        self.touch()
+
+    def push_front(self, entry: QueueEntry):
+        self.queue.appendleft(entry)
+        self.touch()
+
+    def pop(self) -> QueueEntry:
+        """Drop the current track; its message and speed go with it."""
+        entry = self.queue.popleft()
+        self.mystic = None
+        self.markup = None
+        self.reset_speed()
+        self.touch()
+        return entry
+
+    def shuffle(self):
+        """Shuffle everything after the current track."""
+        if len(self.queue) < 3:
+            return
+        current = self.queue.popleft()
+        rest = list(self.queue)
+        random.shuffle(rest)
+        self.queue = deque(rest)
+        self.queue.appendleft(current)
+        self.touch()
+
+    def clear(self) -> List[QueueEntry]:
+        """Empty the queue and return what was in it. The loop count survives."""
+        entries = list(self.queue)
+        self.queue.clear()
+        self.mystic = None
+        self.markup = None
+        self.clock = None
+        self.reset_speed()
+        self.touch()
+        return entries
+
+    def snapshot(self) -> Tuple[QueueEntry, ...]:
+        """The queue as it is now, safe to iterate across awaits."""
+        return tuple(self.queue)
+
+    def reset_speed(self):
+        self.speed = 1.0
+        self.speed_path = None
+
+    @property
+    def seconds(self) -> int:
+        """Duration of the current track at the applied speed."""
+        current = self.current
+        if not current or not current.seconds:
+            return 0
+        return int(int(current.seconds) / self.speed)
+
+    @property
+    def dur(self) -> str:
+        current = self.current
+        if not current:
+            return ""
+        if self.speed == 1.0 or not current.seconds:
+            return current.dur
+        return seconds_to_min(self.seconds)
+
+    def start_clock(self, played: float = 0):
+        """
+        A new stream started `played` seconds in. Pausing is a property of
+        the call, not the track, so a paused chat stays paused.
+        """
+        paused = self.clock.paused if self.clock else False
+        self.clock = PlaybackClock(played, paused)
+        self.touch()
+
+    def pause(self):
+        if self.clock:
+            self.clock.pause()
+            self.touch()
+
+    def resume(self):
+        if self.clock:
+            self.clock.resume()
+            self.touch()
+
+    @property
+    def played(self) -> int:
+        """Seconds played of the current track, capped at its duration."""
+        if not self.clock:
+            return 0
+        played = int(self.clock.played())
+        duration = self.seconds
+        return min(played, duration) if duration else played
+
+    @property
+    def position(self) -> int:
+        """Seconds into the original file, whatever speed is applied."""
+        return int(self.played * self.speed)
+
+    @property
+    def progress(self) -> float:
+        """Percentage of the current track played, for the progress bars."""
+        duration = self.seconds
+        if not duration:
+            return 0.0
+        return self.played / duration * 100
+
+
+def chat_playback(chat_id: int) -> ChatPlayback:
+    state = db.get(chat_id)
+    if state is None:
+        state = db[chat_id] = ChatPlayback(chat_id)
+    return state
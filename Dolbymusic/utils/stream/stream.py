@@ -1,4 +1,5 @@
 import os
+from contextlib import aclosing
 from random import randint
 from typing import Union
 
@@ -13,6 +14,9 @@ from Dolbymusic.utils.database import add_active_video_chat, is_active_chat
 from Dolbymusic.utils.exceptions import AssistantErr
 from Dolbymusic.utils.inline import aq_markup, close_markup, stream_markup
 from Dolbymusic.utils.pastebin import AyushSoloBin
+from Dolbymusic.utils.stream.autoclear import clear_queue
+from Dolbymusic.utils.stream.cache import download_cache
+from Dolbymusic.utils.stream.playlist import resolve_playlist
 from Dolbymusic.utils.stream.queue import put_queue, put_queue_index
 from Dolbymusic.utils.thumbnails import get_thumb
 
@@ -55,92 +59,98 @@ async def stream(
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
+        async with aclosing(
+            resolve_playlist(result, False if spotify else True)
+        ) as entries:
+            async for details in entries:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                if not details:
+                    continue
                 (
                     title,
                     duration_min,
                     duration_sec,
                     thumbnail,
                     vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
-                    )
-                except:
-                    raise AssistantErr(_["play_14"])
-                await AyushSolo.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid, user_id)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                ) = details
+                if str(duration_min) == "None":
+                    continue
+                if duration_sec > config.DURATION_LIMIT:
+                    continue
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                    parse_mode=ParseMode.HTML,
-                )
-                # Delete placeholder sticker after photo is sent
-                if sticker_key:
-                    delete_func = _get_sticker_delete()
-                    if delete_func:
-                        try:
-                            await delete_func(app, sticker_key)
-                        except Exception as e:
-                            print(f"Failed to delete sticker: {e}")
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                    )
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        await clear_queue(chat_id)
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True
+                        )
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    try:
+                        await AyushSolo.join_call(
+                            chat_id,
+                            original_chat_id,
+                            file_path,
+                            video=status,
+                            image=thumbnail,
+                        )
+                        await put_queue(
+                            chat_id,
+                            original_chat_id,
+                            file_path if direct else f"vid_{vidid}",
+                            title,
+                            duration_min,
+                            user_name,
+                            vidid,
+                            user_id,
+                            "video" if video else "audio",
+                            forceplay=forceplay,
+                        )
+                    finally:
+                        # The queue holds its own reference now.
+                        download_cache.release(file_path)
+                    img = await get_thumb(vidid, user_id)
+                    button = stream_markup(_, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                        parse_mode=ParseMode.HTML,
+                    )
+                    # Delete placeholder sticker after photo is sent
+                    if sticker_key:
+                        delete_func = _get_sticker_delete()
+                        if delete_func:
+                            try:
+                                await delete_func(app, sticker_key)
+                            except Exception as e:
+                                print(f"Failed to delete sticker: {e}")
+                    db[chat_id].mystic = run
+                    db[chat_id].markup = "stream"
         if count == 0:
             return
         else:
@@ -200,6 +210,7 @@ async def stream(
                 if not file_path or file_path == "None" or not isinstance(file_path, str):
                     raise Exception(f"Invalid file path returned: {file_path}")
                 if direct and not os.path.exists(file_path):
+                    download_cache.release(file_path)
                     raise Exception(f"Downloaded file does not exist: {file_path}")
             else:
                 # It's a streaming URL
@@ -212,17 +223,20 @@ async def stream(
             print(f"[STREAM] Download failed: {download_error}")
             raise AssistantErr(_["play_14"])
         if await is_active_chat(chat_id):
-            await put_queue(
-                chat_id,
-                original_chat_id,
-                file_path if direct else f"vid_{vidid}",
-                title,
-                duration_min,
-                user_name,
-                vidid,
-                user_id,
-                "video" if video else "audio",
-            )
+            try:
+                await put_queue(
+                    chat_id,
+                    original_chat_id,
+                    file_path if direct else f"vid_{vidid}",
+                    title,
+                    duration_min,
+                    user_name,
+                    vidid,
+                    user_id,
+                    "video" if video else "audio",
+                )
+            finally:
+                download_cache.release(file_path)
             position = len(db.get(chat_id)) - 1
             button = aq_markup(_, chat_id)
             await app.send_message(
@@ -240,27 +254,31 @@ async def stream(
                     except Exception as e:
                         print(f"Failed to delete sticker: {e}")
         else:
-            if not forceplay:
-                db[chat_id] = []
-            await AyushSolo.join_call(
-                chat_id,
-                original_chat_id,
-                file_path,
-                video=status,
-                image=thumbnail,
-            )
-            await put_queue(
-                chat_id,
-                original_chat_id,
-                file_path if direct else f"vid_{vidid}",
-                title,
-                duration_min,
-                user_name,
-                vidid,
-                user_id,
-                "video" if video else "audio",
-                forceplay=forceplay,
-            )
+            try:
+                if not forceplay:
+                    await clear_queue(chat_id)
+                await AyushSolo.join_call(
+                    chat_id,
+                    original_chat_id,
+                    file_path,
+                    video=status,
+                    image=thumbnail,
+                )
+                await put_queue(
+                    chat_id,
+                    original_chat_id,
+                    file_path if direct else f"vid_{vidid}",
+                    title,
+                    duration_min,
+                    user_name,
+                    vidid,
+                    user_id,
+                    "video" if video else "audio",
+                    forceplay=forceplay,
+                )
+            finally:
+                # The queue holds its own reference now.
+                download_cache.release(file_path)
             img = await get_thumb(vidid, user_id)
             button = stream_markup(_, chat_id)
             run = await app.send_photo(
@@ -283,8 +301,8 @@ async def stream(
                         await delete_func(app, sticker_key)
                     except Exception as e:
                         print(f"Failed to delete sticker: {e}")
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "stream"
     elif streamtype == "soundcloud":
         file_path = result["filepath"]
         title = result["title"]
@@ -319,7 +337,7 @@ async def stream(
                         print(f"Failed to delete sticker: {e}")
         else:
             if not forceplay:
-                db[chat_id] = []
+                await clear_queue(chat_id)
             await AyushSolo.join_call(chat_id, original_chat_id, file_path, video=None)
             await put_queue(
                 chat_id,
@@ -351,8 +369,8 @@ async def stream(
                         await delete_func(app, sticker_key)
                     except Exception as e:
                         print(f"Failed to delete sticker: {e}")
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
     elif streamtype == "telegram":
         file_path = result.get("path", "")
         link = result.get("link", "")
@@ -396,7 +414,7 @@ async def stream(
                         print(f"Failed to delete sticker: {e}")
         else:
             if not forceplay:
-                db[chat_id] = []
+                await clear_queue(chat_id)
             await AyushSolo.join_call(chat_id, original_chat_id, file_path, video=status)
             await put_queue(
                 chat_id,
@@ -428,8 +446,8 @@ async def stream(
                         await delete_func(app, sticker_key)
                     except Exception as e:
                         print(f"Failed to delete sticker: {e}")
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
     elif streamtype == "live":
         link = result.get("link", "")
         vidid = result.get("vidid", "")
@@ -474,7 +492,7 @@ async def stream(
                         print(f"Failed to delete sticker: {e}")
         else:
             if not forceplay:
-                db[chat_id] = []
+                await clear_queue(chat_id)
             n, file_path = await YouTube.video(link)
             if n == 0:
                 raise AssistantErr(_["str_3"])
@@ -519,8 +537,8 @@ async def stream(
                         await delete_func(app, sticker_key)
                     except Exception as e:
                         print(f"Failed to delete sticker: {e}")
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
     elif streamtype == "index":
         link = result
         title = "ɪɴᴅᴇx ᴏʀ ᴍ3ᴜ8 ʟɪɴᴋ"
@@ -553,7 +571,7 @@ async def stream(
                         print(f"Failed to delete sticker: {e}")
         else:
             if not forceplay:
-                db[chat_id] = []
+                await clear_queue(chat_id)
             await AyushSolo.join_call(
                 chat_id,
                 original_chat_id,
@@ -587,6 +605,6 @@ async def stream(
                         await delete_func(app, sticker_key)
                     except Exception as e:
                         print(f"Failed to delete sticker: {e}")
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id].mystic = run
+            db[chat_id].markup = "tg"
             await mystic.delete()
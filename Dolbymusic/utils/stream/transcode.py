@@ -0,0 +1,116 @@
+import asyncio
+import os
+from typing import Optional
+
+import config
+from Dolbymusic.logging import LOGGER
+from Dolbymusic.misc import db
+from Dolbymusic.utils.scheduler import BACKGROUND, media_scheduler
+
+
+class PlaybackCache:
+    """
+    Pre-rendered speed variants under playback/{speed}/.
+
+    Speed changes are applied live with ffmpeg filters, so rendering a
+    variant is only an optimisation: jobs go through a small bounded queue
+    worked one at a time, are dropped when the queue is full, and the oldest
+    variants nobody is playing are evicted once the directory passes its
+    byte budget.
+    """
+
+    def __init__(self, directory: str, budget: int, max_pending: int):
+        self.directory = directory
+        self.budget = budget
+        self.queue = asyncio.Queue(max_pending)
+        self._pending = set()
+        self._worker = None
+
+    def path_for(self, source: str, speed) -> str:
+        return os.path.join(self.directory, str(speed), os.path.basename(source))
+
+    def get(self, source: str, speed) -> Optional[str]:
+        """Return the rendered variant if it is ready."""
+        path = self.path_for(source, speed)
+        if not os.path.isfile(path):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def schedule(self, source: str, speed):
+        path = self.path_for(source, speed)
+        if path in self._pending or os.path.isfile(path):
+            return
+        try:
+            self.queue.put_nowait((source, speed, path))
+        except asyncio.QueueFull:
+            return
+        self._pending.add(path)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._work())
+
+    async def _work(self):
+        while not self.queue.empty():
+            source, speed, path = await self.queue.get()
+            try:
+                await self._render(source, speed, path)
+                self._evict()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Rendering {path} failed: {e}")
+            finally:
+                self._pending.discard(path)
+
+    async def _render(self, source: str, speed, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        root, ext = os.path.splitext(path)
+        temp = f"{root}.part{ext}"
+        try:
+            returncode, _ = await media_scheduler.run(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    source,
+                    "-filter:v",
+                    f"setpts={1 / float(speed):.4f}*PTS",
+                    "-filter:a",
+                    f"atempo={speed}",
+                    temp,
+                ],
+                BACKGROUND,
+            )
+            if returncode == 0:
+                os.replace(temp, path)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def _evict(self):
+        in_use = {state.speed_path for state in db.values()}
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files.append((stat.st_atime, path, stat.st_size))
+        total = sum(size for _, _, size in files)
+        for _, path, size in sorted(files):
+            if total <= self.budget:
+                break
+            if path in in_use or path in self._pending:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+playback_cache = PlaybackCache(
+    os.path.join(os.getcwd(), "playback"),
+    config.PLAYBACK_CACHE_LIMIT_MB * 1024 * 1024,
+    config.PLAYBACK_QUEUE_SIZE,
+)
@@ -2,7 +2,6 @@ import os
 import re
 import textwrap
 
-import aiofiles
 import aiohttp
 import numpy as np
 
@@ -11,6 +10,7 @@ from youtubesearchpython import VideosSearch
 
 from config import YOUTUBE_IMG_URL
 from Dolbymusic import app
+from Dolbymusic.utils.writer import file_writer
 
 
 
@@ -101,9 +101,9 @@ async def gen_thumb(videoid, user_id):
             async with session.get(thumbnail) as resp:
                 if resp.status == 200:
                     thumb_path = os.path.join(cache_dir, f"thumb{videoid}.png")
-                    f = await aiofiles.open(thumb_path, mode="wb")
-                    await f.write(await resp.read())
-                    await f.close()
+                    async with file_writer.open(thumb_path, truncate=True) as f:
+                        async for chunk in resp.content.iter_chunked(65536):
+                            await f.write(chunk)
 
         # Try to get user profile photo - comprehensive debugging approach
         wxy = None
@@ -474,9 +474,9 @@ async def gen_qthumb(videoid, user_id):
             async with session.get(thumbnail) as resp:
                 if resp.status == 200:
                     thumb_path = os.path.join(cache_dir, f"thumb{videoid}.png")
-                    f = await aiofiles.open(thumb_path, mode="wb")
-                    await f.write(await resp.read())
-                    await f.close()
+                    async with file_writer.open(thumb_path, truncate=True) as f:
+                        async for chunk in resp.content.iter_chunked(65536):
+                            await f.write(chunk)
 
         # Try to get user profile photo - comprehensive debugging approach (same as gen_thumb)
         wxy = None
@@ -0,0 +1,106 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from Dolbymusic.logging import LOGGER
+
+
+class TimerService:
+    """
+    Per-chat deadlines on a single heap, worked by one task.
+
+    Components register a handler for a kind of timer ("autoend",
+    "autoleave", ...) and then schedule or cancel deadlines per chat.
+    Scheduling a chat again moves its deadline; replaced and cancelled
+    entries are skipped when they reach the top of the heap. While nothing
+    is due the task just sleeps, however many chats are being tracked.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[int], Awaitable]] = {}
+        self._heap = []
+        self._deadlines: Dict[Tuple[str, int], Tuple[float, int]] = {}
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self._worker = None
+        self.fired = 0
+
+    def on(self, kind: str):
+        """Register the coroutine run with the chat_id when a deadline passes."""
+
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+
+        return decorator
+
+    def schedule(self, kind: str, chat_id: int, delay: float):
+        when = time.monotonic() + delay
+        sequence = next(self._sequence)
+        self._deadlines[(kind, chat_id)] = (when, sequence)
+        earliest = not self._heap or when < self._heap[0][0]
+        heapq.heappush(self._heap, (when, sequence, kind, chat_id))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            # Mostly moved or cancelled deadlines: drop them in one go.
+            self._heap = [entry for entry in self._heap if self._live(entry)]
+            heapq.heapify(self._heap)
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.ensure_future(self._work())
+        elif earliest:
+            self._wakeup.set()
+
+    def cancel(self, kind: str, chat_id: int):
+        self._deadlines.pop((kind, chat_id), None)
+
+    def remaining(self, kind: str, chat_id: int) -> Optional[float]:
+        deadline = self._deadlines.get((kind, chat_id))
+        if not deadline:
+            return None
+        return max(0.0, deadline[0] - time.monotonic())
+
+    def _live(self, entry) -> bool:
+        when, sequence, kind, chat_id = entry
+        return self._deadlines.get((kind, chat_id)) == (when, sequence)
+
+    async def _work(self):
+        while True:
+            while self._heap and not self._live(self._heap[0]):
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            entry = heapq.heappop(self._heap)
+            if not self._live(entry):
+                continue
+            _, _, kind, chat_id = entry
+            del self._deadlines[(kind, chat_id)]
+            handler = self.handlers.get(kind)
+            if handler:
+                self.fired += 1
+                asyncio.ensure_future(self._fire(handler, kind, chat_id))
+
+    @staticmethod
+    async def _fire(handler, kind: str, chat_id: int):
+        try:
+            await handler(chat_id)
+        except Exception as e:
+            LOGGER(__name__).warning(f"{kind} timer for {chat_id} failed: {e}")
+
+    def stats(self) -> dict:
+        pending = {}
+        for kind, _ in self._deadlines:
+            pending[kind] = pending.get(kind, 0) + 1
+        return {"pending": pending, "heap": len(self._heap), "fired": self.fired}
+
+
+timers = TimerService()
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+from functools import partial
+
+import config
+from Dolbymusic.logging import LOGGER
+
+
+class FileWriter:
+    """
+    Moves file writes off the event loop.
+
+    Handles queue their writes onto a bounded queue drained by a single
+    writer thread, so a slow disk never stalls other chats' handlers.
+    Small chunks are coalesced per handle before they are queued.
+    """
+
+    def __init__(self, max_pending: int, coalesce_bytes: int):
+        self.coalesce_bytes = coalesce_bytes
+        self.max_pending = max_pending
+        self.recent = deque(maxlen=50)
+        self.bytes_written = 0
+        self._queue = queue.SimpleQueue()
+        self._slots = None
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="FileWriter", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            handle, func, args, done = self._queue.get()
+            result = None
+            error = handle.error
+            # A failed write poisons the handle, but its fd must still close.
+            if error is None or func == handle._close:
+                try:
+                    result = func(*args)
+                except Exception as e:
+                    error = e
+                    if handle.error is None:
+                        handle.error = e
+            if done is not None:
+                handle.loop.call_soon_threadsafe(done, result, error)
+
+    def _submit(self, handle, func, *args, done=None):
+        self._queue.put((handle, func, args, done))
+
+    def _call(self, handle, func, *args) -> asyncio.Future:
+        """Queue an operation and return a future for its result."""
+        future = handle.loop.create_future()
+        self._submit(handle, func, *args, done=partial(_resolve, future))
+        return future
+
+    def open(
+        self,
+        path: str,
+        offset: int = 0,
+        truncate: bool = False,
+        preallocate: int = None,
+    ) -> "WriteHandle":
+        """
+        Open path for writing at offset. preallocate reserves that many bytes
+        up front so segmented downloads don't fragment the file.
+        """
+        self._ensure_started()
+        return WriteHandle(self, path, offset, truncate, preallocate)
+
+    def _finished(self, handle: "WriteHandle"):
+        elapsed = max(time.monotonic() - handle.started, 1e-6)
+        self.bytes_written += handle.written
+        self.recent.append(
+            {
+                "path": handle.path,
+                "bytes": handle.written,
+                "seconds": round(elapsed, 3),
+                "throughput": handle.written / elapsed,
+            }
+        )
+        LOGGER(__name__).debug(
+            f"Wrote {handle.written} bytes to {handle.path} "
+            f"in {elapsed:.2f}s ({handle.written / elapsed / 1024:.0f} KiB/s)"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "bytes_written": self.bytes_written,
+            "pending": self._queue.qsize(),
+            "recent": list(self.recent),
+        }
+
+
+class WriteHandle:
+    def __init__(self, writer: FileWriter, path, offset, truncate, preallocate):
+        self.writer = writer
+        self.path = path
+        self.offset = offset
+        self.written = 0
+        self.error = None
+        self.started = time.monotonic()
+        self.loop = asyncio.get_running_loop()
+        self._fd = None
+        self._buffer = bytearray()
+        self._closed = False
+        writer._submit(self, self._open, truncate, preallocate)
+
+    def _open(self, truncate, preallocate):
+        flags = os.O_WRONLY | os.O_CREAT
+        if truncate:
+            flags |= os.O_TRUNC
+        self._fd = os.open(self.path, flags, 0o644)
+        if preallocate:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(self._fd, 0, preallocate)
+            else:
+                os.ftruncate(self._fd, preallocate)
+
+    def _pwrite(self, data, offset):
+        view = memoryview(data)
+        while view:
+            n = os.pwrite(self._fd, view, offset)
+            view = view[n:]
+            offset += n
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        if self.error:
+            raise self.error
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        slots = self.writer._slots
+        await slots.acquire()
+        self.writer._submit(
+            self, self._pwrite, data, self.offset, done=lambda *_: slots.release()
+        )
+        self.offset += len(data)
+        self.written += len(data)
+
+    async def write(self, data: bytes):
+        self._buffer += data
+        if len(self._buffer) >= self.writer.coalesce_bytes:
+            await self._flush()
+
+    async def seek(self, offset: int):
+        await self._flush()
+        self.offset = offset
+
+    async def truncate(self):
+        """Cut the file at the current offset."""
+        await self._flush()
+        await self.writer._call(self, lambda: os.ftruncate(self._fd, self.offset))
+
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._flush()
+        finally:
+            await self.writer._call(self, self._close)
+        if self.error:
+            raise self.error
+        self.writer._finished(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def _resolve(future, result, error):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+file_writer = FileWriter(config.WRITER_MAX_PENDING, config.WRITER_COALESCE_KB * 1024)
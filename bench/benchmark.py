@@ -0,0 +1,155 @@
+"""
+Load benchmark for YouTubeAPI against the local fake API (or any base URL).
+
+Runs details, track, playlist, download and a full play (track + download)
+at the given concurrency and prints p50/p95/p99 latency, API requests per
+operation and bytes transferred. Every scenario starts with cold caches.
+
+    python bench/benchmark.py --ops 200 --concurrency 20 --unique 50
+    python bench/benchmark.py --scenario play --latency 150 --failure-rate 0.05
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+# config.py refuses to load without these; the benchmark never logs in.
+for name in ("API_ID", "LOGGER_ID", "OWNER_ID"):
+    os.environ.setdefault(name, "0")
+
+from fake_api import FakeAPI, add_arguments, from_arguments  # noqa: E402
+
+SCENARIOS = ("details", "track", "playlist", "download", "play")
+
+
+def import_youtube():
+    """
+    Import Dolbymusic.platforms.Youtube without running the package
+    __init__ files, which update the git checkout, build the Telegram clients
+    and open the database. Empty packages stand in for them, so only the
+    modules YouTubeAPI itself imports get loaded.
+    """
+    for name in ("Dolbymusic", "Dolbymusic.platforms", "Dolbymusic.utils"):
+        package = types.ModuleType(name)
+        package.__path__ = [os.path.join(ROOT, *name.split("."))]
+        sys.modules[name] = package
+    return importlib.import_module("Dolbymusic.platforms.Youtube")
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_scenario(youtube, name, base_url, args, fake):
+    from Dolbymusic.utils.stream.cache import DownloadCache
+
+    sent = Counter()
+
+    async def count(request):
+        sent[request.url.path] += 1
+
+    tempdir = tempfile.TemporaryDirectory(prefix="dolby-bench-")
+    api = youtube.YouTubeAPI(
+        base_url=base_url,
+        cache=DownloadCache(tempdir.name, 1 << 40),
+        event_hooks={"request": [count], "response": []},
+    )
+    await api.start()
+    if fake:
+        fake.reset()
+
+    queries = [f"benchmark song {n}" for n in range(args.unique)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    errors = 0
+
+    async def operation():
+        query = random.choice(queries)
+        if name == "details":
+            return (await api.details(query))[4]
+        if name == "track":
+            return (await api.track(query))[1]
+        if name == "playlist":
+            return await api.playlist(f"https://youtube.com/playlist?list={query}", 25, 0)
+        vidid = api._video_id(query) or query.replace(" ", "")[:11]
+        if name == "play":
+            vidid = (await api.track(query))[1]
+            if not vidid:
+                return None
+        path, _ = await api.download(vidid, None, videoid=True)
+        api.cache.release(path)
+        return path
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await operation()
+            except Exception:
+                ok = None
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(args.ops)])
+    elapsed = time.perf_counter() - started
+    await api.close()
+    tempdir.cleanup()
+
+    requests = sum(sent.values())
+    print(f"\n== {name} ({args.ops} ops, concurrency {args.concurrency}) ==")
+    print(
+        f"latency   p50 {percentile(latencies, 0.50) * 1000:8.1f}ms"
+        f"  p95 {percentile(latencies, 0.95) * 1000:8.1f}ms"
+        f"  p99 {percentile(latencies, 0.99) * 1000:8.1f}ms"
+    )
+    print(f"throughput {args.ops / elapsed:8.1f} ops/s, errors {errors}")
+    print(
+        f"requests  {requests} total, {requests / args.ops:.2f} per op  "
+        + ", ".join(f"{path} {n}" for path, n in sorted(sent.items()))
+    )
+    if fake:
+        total = sum(fake.bytes_sent.values())
+        print(f"bytes     {total / 1024 / 1024:.1f} MiB, {total / args.ops / 1024:.1f} KiB per op")
+
+
+async def main(args):
+    youtube = import_youtube()
+
+    fake = None
+    base_url = args.base_url
+    if not base_url:
+        fake = from_arguments(args)
+        base_url = await fake.start()
+    try:
+        for name in args.scenario or SCENARIOS:
+            await run_scenario(youtube, name, base_url, args, fake)
+    finally:
+        if fake:
+            await fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--ops", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--unique", type=int, default=20, help="distinct queries in the pool")
+    parser.add_argument("--base-url", help="benchmark a running API instead of the in-process fake")
+    add_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,176 @@
+"""
+Local stand-in for the YouTube download API used by Dolbymusic/platforms/Youtube.py.
+
+Serves /search, /info, /playlist, /download/audio and /download/video with
+configurable latency, failure rate and payload size, and counts requests and
+bytes per endpoint so benchmarks can report what each play costs.
+
+    python bench/fake_api.py --port 8765 --latency 80 --failure-rate 0.02
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import re
+from collections import Counter
+
+from aiohttp import web
+
+
+class FakeAPI:
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        failure_rate: float = 0.0,
+        payload_size: int = 4 * 1024 * 1024,
+        duration: str = "3:30",
+        playlist_size: int = 25,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.payload = bytes(payload_size)
+        self.duration = duration
+        self.playlist_size = playlist_size
+        self.requests = Counter()
+        self.bytes_sent = Counter()
+        self.app = web.Application()
+        self.app.add_routes(
+            [
+                web.get("/search", self.search),
+                web.get("/info", self.info),
+                web.get("/playlist", self.playlist),
+                web.get("/download/audio", self.download),
+                web.get("/download/video", self.download),
+            ]
+        )
+        self._runner = None
+
+    def reset(self):
+        self.requests.clear()
+        self.bytes_sent.clear()
+
+    async def _delay(self, request) -> bool:
+        """Count the request, sleep for the configured latency, maybe fail it."""
+        self.requests[request.path] += 1
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        return random.random() < self.failure_rate
+
+    def _json(self, request, data) -> web.Response:
+        response = web.json_response(data)
+        self.bytes_sent[request.path] += len(response.body)
+        return response
+
+    @staticmethod
+    def _video_id(text: str) -> str:
+        match = re.search(r"(?:v=|youtu\.be/)([\w-]{11})", text)
+        if match:
+            return match.group(1)
+        return hashlib.md5(text.encode()).hexdigest()[:11]
+
+    async def search(self, request):
+        if await self._delay(request):
+            return web.Response(status=503)
+        vid = self._video_id(request.query.get("q", ""))
+        return self._json(
+            request,
+            {"id": vid, "title": f"Track {vid}", "url": f"https://www.youtube.com/watch?v={vid}"},
+        )
+
+    async def info(self, request):
+        if await self._delay(request):
+            return web.Response(status=503)
+        vid = request.query.get("video_id", "")
+        return self._json(
+            request,
+            {
+                "id": vid,
+                "title": f"Track {vid}",
+                "duration": self.duration,
+                "thumbnail": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg",
+            },
+        )
+
+    async def playlist(self, request):
+        if await self._delay(request):
+            return web.Response(status=503)
+        seed = request.query.get("playlist_id", "")
+        limit = min(int(request.query.get("limit", self.playlist_size)), self.playlist_size)
+        ids = [self._video_id(f"{seed}:{n}") for n in range(limit)]
+        return self._json(request, {"video_ids": ids})
+
+    async def download(self, request):
+        if await self._delay(request):
+            return web.Response(status=503)
+        total = len(self.payload)
+        match = re.match(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+        if not match:
+            self.bytes_sent[request.path] += total
+            return web.Response(body=self.payload, content_type="application/octet-stream")
+        start = int(match.group(1))
+        end = min(int(match.group(2) or total - 1), total - 1)
+        if start >= total:
+            return web.Response(status=416, headers={"Content-Range": f"bytes */{total}"})
+        body = self.payload[start : end + 1]
+        self.bytes_sent[request.path] += len(body)
+        return web.Response(
+            status=206,
+            body=body,
+            content_type="application/octet-stream",
+            headers={"Content-Range": f"bytes {start}-{end}/{total}"},
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=50, help="mean latency in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="latency std dev in ms")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--payload-kb", type=int, default=4096, help="size of each downloaded file")
+    parser.add_argument("--duration", default="3:30", help="track duration reported by /info")
+
+
+def from_arguments(args) -> FakeAPI:
+    return FakeAPI(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        failure_rate=args.failure_rate,
+        payload_size=args.payload_kb * 1024,
+        duration=args.duration,
+    )
+
+
+async def serve(args):
+    api = from_arguments(args)
+    url = await api.start(args.host, args.port)
+    print(f"Fake API listening on {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -13,9 +13,29 @@ API_HASH = getenv("API_HASH")
 # Get your token from @BotFather on Telegram.
 BOT_TOKEN = getenv("BOT_TOKEN")
 
+# Where settings and stats are stored: "mongo" (MONGO_DB_URI) or "sqlite" (a local file at SQLITE_PATH).
+STORAGE_BACKEND = getenv("STORAGE_BACKEND", "mongo")
+SQLITE_PATH = getenv("SQLITE_PATH", "Dolbymusic.db")
+
 # Get your mongo url from cloud.mongodb.com
 MONGO_DB_URI = getenv("MONGO_DB_URI")
 
+# Set to True to log database calls slower than MONGO_SLOW_MS and queries that scan a whole collection.
+MONGO_PROFILE = getenv("MONGO_PROFILE", "False") == str(True)
+MONGO_SLOW_MS = int(getenv("MONGO_SLOW_MS", 100))
+
+# Set to True to let startup delete duplicate settings documents (keeping the oldest) so unique indexes can be built.
+MONGO_DEDUPE = getenv("MONGO_DEDUPE", "False") == str(True)
+
+# Documents fetched per round trip when walking served chats, users and ban lists.
+DB_BATCH_SIZE = int(getenv("DB_BATCH_SIZE", 500))
+
+# New served users/chats are saved in batches every SERVED_FLUSH_INTERVAL seconds or once
+# SERVED_BATCH_SIZE are waiting; up to SERVED_KNOWN_SIZE saved ids are remembered to skip repeats.
+SERVED_FLUSH_INTERVAL = int(getenv("SERVED_FLUSH_INTERVAL", 10))
+SERVED_BATCH_SIZE = int(getenv("SERVED_BATCH_SIZE", 500))
+SERVED_KNOWN_SIZE = int(getenv("SERVED_KNOWN_SIZE", 200000))
+
 DURATION_LIMIT_MIN = int(getenv("DURATION_LIMIT", 1000))
 
 # Chat id of a group for logging bot's activities
@@ -57,9 +77,67 @@ SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET")
 
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
+# How many playlist entries are resolved against the API at the same time.
+PLAYLIST_RESOLVE_CONCURRENCY = int(getenv("PLAYLIST_RESOLVE_CONCURRENCY", 5))
 SONG_DOWNLOAD_DURATION = int(getenv("SONG_DOWNLOAD_DURATION", 900))
 SONG_DOWNLOAD_DURATION_LIMIT = int(getenv("SONG_DOWNLOAD_DURATION_LIMIT", 900))
 
+# Disk budget for the downloads cache, files nobody has queued are evicted past this size.
+DOWNLOAD_CACHE_LIMIT_MB = int(getenv("DOWNLOAD_CACHE_LIMIT_MB", 2048))
+# How many upcoming queue entries are downloaded ahead of time, and how many at once.
+PREFETCH_DEPTH = int(getenv("PREFETCH_DEPTH", 2))
+PREFETCH_CONCURRENCY = int(getenv("PREFETCH_CONCURRENCY", 4))
+# Resumable downloads: retry count, backoff base in seconds and parallel segments for big files.
+DOWNLOAD_RETRIES = int(getenv("DOWNLOAD_RETRIES", 4))
+DOWNLOAD_RETRY_BACKOFF = float(getenv("DOWNLOAD_RETRY_BACKOFF", 1))
+DOWNLOAD_SEGMENTS = int(getenv("DOWNLOAD_SEGMENTS", 4))
+DOWNLOAD_SEGMENT_THRESHOLD_MB = int(getenv("DOWNLOAD_SEGMENT_THRESHOLD_MB", 16))
+# Speed changes are applied live; set to True to also render sped-up copies in the background.
+SPEED_PRERENDER = getenv("SPEED_PRERENDER", "False") == str(True)
+PLAYBACK_CACHE_LIMIT_MB = int(getenv("PLAYBACK_CACHE_LIMIT_MB", 1024))
+PLAYBACK_QUEUE_SIZE = int(getenv("PLAYBACK_QUEUE_SIZE", 4))
+# ffmpeg/ffprobe jobs run at once (0 = half the CPU cores), and the ffprobe timeout in seconds.
+MEDIA_JOB_LIMIT = int(getenv("MEDIA_JOB_LIMIT", 0))
+MEDIA_PROBE_TIMEOUT = int(getenv("MEDIA_PROBE_TIMEOUT", 30))
+# ffprobe results kept in memory and in PROBE_INDEX_PATH (outside the folders /restart wipes); URL results expire after PROBE_URL_TTL seconds.
+PROBE_INDEX_PATH = getenv("PROBE_INDEX_PATH", "probe_index.json")
+PROBE_CACHE_SIZE = int(getenv("PROBE_CACHE_SIZE", 4096))
+PROBE_URL_TTL = int(getenv("PROBE_URL_TTL", 86400))
+# Background file writer: writes waiting on the disk before downloads pause, and coalesce size.
+WRITER_MAX_PENDING = int(getenv("WRITER_MAX_PENDING", 64))
+WRITER_COALESCE_KB = int(getenv("WRITER_COALESCE_KB", 512))
+# Queues and positions are saved to Mongo every PLAYBACK_JOURNAL_INTERVAL seconds and the
+# calls rejoined on startup, unless the bot was down for more than RESUME_MAX_AGE seconds.
+PLAYBACK_JOURNAL_INTERVAL = int(getenv("PLAYBACK_JOURNAL_INTERVAL", 5))
+RESUME_PLAYBACK = getenv("RESUME_PLAYBACK", "True") == str(True)
+RESUME_MAX_AGE = int(getenv("RESUME_MAX_AGE", 3600))
+RESUME_CONCURRENCY = int(getenv("RESUME_CONCURRENCY", 4))
+
+# Connection pool shared by every request made to the YouTube API.
+YT_API_MAX_CONNECTIONS = int(getenv("YT_API_MAX_CONNECTIONS", 100))
+YT_API_MAX_KEEPALIVE = int(getenv("YT_API_MAX_KEEPALIVE", 20))
+YT_API_KEEPALIVE_EXPIRY = float(getenv("YT_API_KEEPALIVE_EXPIRY", 60))
+YT_API_TIMEOUT = float(getenv("YT_API_TIMEOUT", 10))
+YT_API_DOWNLOAD_TIMEOUT = float(getenv("YT_API_DOWNLOAD_TIMEOUT", 600))
+YT_API_HTTP2 = getenv("YT_API_HTTP2", "True") == str(True)
+# Comma separated API base URLs tried in order when the primary one is failing.
+YT_API_FALLBACK_URLS = [
+    url.strip() for url in getenv("YT_API_FALLBACK_URLS", "").split(",") if url.strip()
+]
+# Send a second request when an API call takes longer than this (0 disables hedging).
+YT_API_HEDGE_MS = int(getenv("YT_API_HEDGE_MS", 1500))
+# Consecutive failures that open the circuit breaker, and seconds before it retries.
+YT_API_BREAKER_THRESHOLD = int(getenv("YT_API_BREAKER_THRESHOLD", 5))
+YT_API_BREAKER_RESET = int(getenv("YT_API_BREAKER_RESET", 30))
+
+# In-memory cache for YouTube search and info lookups.
+YT_CACHE_SIZE = int(getenv("YT_CACHE_SIZE", 2048))
+YT_CACHE_TTL = int(getenv("YT_CACHE_TTL", 3600))
+
+# In-memory cache for per-chat and global settings read from the database.
+SETTINGS_CACHE_SIZE = int(getenv("SETTINGS_CACHE_SIZE", 20000))
+SETTINGS_CACHE_TTL = int(getenv("SETTINGS_CACHE_TTL", 600))
+
 
 # Telegram audio and video file size limit (in bytes)
 TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 104857600))
@@ -74,13 +152,25 @@ STRING4 = getenv("STRING_SESSION4")
 STRING5 = getenv("STRING_SESSION5")
 STRING6 = getenv("STRING_SESSION6")
 STRING7 = getenv("STRING_SESSION7")
+# Every assistant session in order; more can be added as STRING_SESSION8, STRING_SESSION9, ...
+STRING_SESSIONS = [STRING1, STRING2, STRING3, STRING4, STRING5, STRING6, STRING7]
+while getenv(f"STRING_SESSION{len(STRING_SESSIONS) + 1}"):
+    STRING_SESSIONS.append(getenv(f"STRING_SESSION{len(STRING_SESSIONS) + 1}"))
+
+# An assistant with at least ASSISTANT_MIN_ERRORS failures and an error rate above
+# ASSISTANT_MAX_ERROR_RATE within ASSISTANT_ERROR_WINDOW seconds gets no new chats.
+ASSISTANT_ERROR_WINDOW = int(getenv("ASSISTANT_ERROR_WINDOW", 300))
+ASSISTANT_MIN_ERRORS = int(getenv("ASSISTANT_MIN_ERRORS", 3))
+ASSISTANT_MAX_ERROR_RATE = float(getenv("ASSISTANT_MAX_ERROR_RATE", 0.5))
+# Seconds an assistant gets to start, and to answer a ping, before it is reported as failed.
+ASSISTANT_START_TIMEOUT = int(getenv("ASSISTANT_START_TIMEOUT", 60))
+ASSISTANT_PING_TIMEOUT = int(getenv("ASSISTANT_PING_TIMEOUT", 5))
 
 
 BANNED_USERS = filters.user()
 adminlist = {}
 lyrical = {}
 votemode = {}
-autoclean = []
 confirmer = {}
 
 # Thumbnail URLs
@@ -0,0 +1,26 @@
+"""
+The modules under test are imported without running Dolbymusic/__init__.py,
+which updates the git checkout, builds the Telegram clients and opens the
+database. Tests run from a scratch directory with the SQLite backend, so the
+module-level download cache and storage never touch the real ones.
+"""
+
+import os
+import sys
+import tempfile
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+# config.py refuses to load without these; nothing here logs in.
+for name in ("API_ID", "LOGGER_ID", "OWNER_ID"):
+    os.environ.setdefault(name, "0")
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.chdir(tempfile.mkdtemp(prefix="dolby-tests-"))
+
+for name in ("Dolbymusic", "Dolbymusic.platforms", "Dolbymusic.utils"):
+    package = types.ModuleType(name)
+    package.__path__ = [os.path.join(ROOT, *name.split("."))]
+    sys.modules.setdefault(name, package)
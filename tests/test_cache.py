@@ -0,0 +1,121 @@
+import asyncio
+import os
+
+from Dolbymusic.utils.stream.cache import DownloadCache
+
+
+def writer(size, delay=0.0, calls=None):
+    async def download(temp):
+        if calls is not None:
+            calls.append(temp)
+        await asyncio.sleep(delay)
+        with open(temp, "wb") as f:
+            f.write(b"x" * size)
+        return True
+
+    return download
+
+
+def test_concurrent_fetches_share_one_download(tmp_path):
+    cache = DownloadCache(str(tmp_path), 1000)
+    calls = []
+
+    async def main():
+        return await asyncio.gather(
+            *[cache.fetch("a", "mp3", writer(10, 0.01, calls)) for _ in range(3)]
+        )
+
+    paths = asyncio.run(main())
+    assert len(calls) == 1
+    assert paths == [cache.path_for("a", "mp3")] * 3
+    # Every caller got its own reference.
+    assert cache._refs[paths[0]] == 3
+
+
+def test_cache_hit_takes_a_reference(tmp_path):
+    cache = DownloadCache(str(tmp_path), 1000)
+
+    async def main():
+        path = await cache.fetch("a", "mp3", writer(10))
+        cache.release(path)
+        return path, await cache.fetch("a", "mp3", writer(10))
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert cache._refs[first] == 1
+
+
+def test_unreferenced_files_are_evicted_oldest_first(tmp_path):
+    cache = DownloadCache(str(tmp_path), 25)
+
+    async def main():
+        a = await cache.fetch("a", "mp3", writer(10))
+        b = await cache.fetch("b", "mp3", writer(10))
+        cache.release(a)
+        cache.release(b)
+        c = await cache.fetch("c", "mp3", writer(10))
+        return a, b, c
+
+    a, b, c = asyncio.run(main())
+    assert not os.path.exists(a)
+    assert os.path.exists(b) and os.path.exists(c)
+    assert cache.size == 20
+
+
+def test_referenced_files_survive_eviction(tmp_path):
+    cache = DownloadCache(str(tmp_path), 15)
+
+    async def main():
+        a = await cache.fetch("a", "mp3", writer(10))
+        b = await cache.fetch("b", "mp3", writer(10))
+        return a, b
+
+    a, b = asyncio.run(main())
+    # Over budget, but both are still held by their callers.
+    assert os.path.exists(a) and os.path.exists(b)
+    cache.release(a)
+    assert not os.path.exists(a)
+    assert os.path.exists(b)
+
+
+def test_scan_only_manages_its_own_directory(tmp_path):
+    directory = tmp_path / "cache"
+    directory.mkdir()
+    (tmp_path / "123.jpg").write_bytes(b"x" * 100)
+    (directory / "old.mp3").write_bytes(b"x" * 100)
+    (directory / "old.mp3.abc.part").write_bytes(b"x")
+    cache = DownloadCache(str(directory), 10)
+    assert not (directory / "old.mp3").exists()
+    assert not (directory / "old.mp3.abc.part").exists()
+    assert (tmp_path / "123.jpg").exists()
+    cache.acquire(str(tmp_path / "123.jpg"))
+    assert cache._refs == {}
+
+
+def test_failed_download_leaves_nothing_behind(tmp_path):
+    cache = DownloadCache(str(tmp_path), 1000)
+
+    async def failing(temp):
+        with open(temp, "wb") as f:
+            f.write(b"partial")
+        return False
+
+    assert asyncio.run(cache.fetch("a", "mp3", failing)) is None
+    assert os.listdir(tmp_path) == []
+    assert cache._refs == {}
+
+
+def test_cancelling_the_only_waiter_stops_the_download(tmp_path):
+    cache = DownloadCache(str(tmp_path), 1000)
+
+    async def main():
+        task = asyncio.ensure_future(cache.fetch("a", "mp3", writer(10, 1)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.01)
+        return task
+
+    task = asyncio.run(main())
+    assert task.cancelled()
+    assert cache._inflight == {}
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import re
+
+import httpx
+import pytest
+
+from Dolbymusic.utils import writer
+from Dolbymusic.utils.stream import downloader as downloader_module
+from Dolbymusic.utils.stream.downloader import Downloader
+from fake_api import FakeAPI
+
+DATA = os.urandom(100_000)
+
+
+@pytest.fixture(autouse=True)
+def fresh_writer(monkeypatch):
+    # The shared writer's semaphore belongs to the first event loop using it.
+    monkeypatch.setattr(
+        downloader_module, "file_writer", writer.FileWriter(8, 64 * 1024)
+    )
+
+
+def ranged(request):
+    match = re.match(r"bytes=(\d+)-(\d*)", request.headers.get("range", ""))
+    if not match:
+        return None
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else len(DATA) - 1
+    return start, end
+
+
+def partial(start, end, body=None):
+    return httpx.Response(
+        206,
+        headers={"content-range": f"bytes {start}-{end}/{len(DATA)}"},
+        content=DATA[start : end + 1] if body is None else body,
+    )
+
+
+async def dropped(data, after):
+    """A body that breaks off after `after` bytes."""
+    yield data[:after]
+    raise httpx.ReadError("connection reset")
+
+
+def fetch(handler, dest, **kwargs):
+    async def main():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            # httpx holds back a partial chunk, so a drop loses it.
+            downloader = Downloader(3, 0, 4, 10_000, chunk_size=10_000)
+            return await downloader.fetch(client, "http://api/file", str(dest), **kwargs)
+
+    return asyncio.run(main())
+
+
+def test_resumes_from_the_last_written_byte(tmp_path):
+    seen = []
+
+    def handler(request):
+        span = ranged(request)
+        seen.append(span)
+        if span is None:
+            return httpx.Response(
+                200,
+                headers={"content-length": str(len(DATA))},
+                content=dropped(DATA, 30_000),
+            )
+        return partial(*span)
+
+    dest = tmp_path / "file"
+    assert fetch(handler, dest)
+    assert seen == [None, (30_000, len(DATA) - 1)]
+    assert dest.read_bytes() == DATA
+
+
+def test_short_download_is_a_failure(tmp_path):
+    def handler(request):
+        return httpx.Response(
+            200, headers={"content-length": str(len(DATA))}, content=DATA[:5000]
+        )
+
+    assert not fetch(handler, tmp_path / "file")
+
+
+def test_gives_up_after_the_retries(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    assert not fetch(handler, tmp_path / "file")
+    assert len(calls) == 4
+
+
+def test_failed_segment_stops_the_others(tmp_path):
+    dest = tmp_path / "file"
+
+    async def handler(request):
+        start, end = ranged(request)
+        if (start, end) == (0, 0):
+            return partial(0, 0)
+        if start == 0:
+            return httpx.Response(404)
+        await asyncio.sleep(0.05)
+        return partial(start, end)
+
+    async def main():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            ok = await Downloader(0, 0, 4, 0).fetch(
+                client, "http://api/file", str(dest), segmented=True
+            )
+            # What DownloadCache does with a failed download.
+            os.remove(dest)
+            await asyncio.sleep(0.2)
+            return ok
+
+    assert not asyncio.run(main())
+    assert not dest.exists()
+
+
+def test_segmented_download_from_the_fake_api(tmp_path):
+    fake = FakeAPI(latency=0, jitter=0, payload_size=256 * 1024)
+    dest = tmp_path / "video.mp4"
+
+    async def main():
+        base_url = await fake.start()
+        try:
+            async with httpx.AsyncClient() as client:
+                return await Downloader(2, 0, 4, 64 * 1024).fetch(
+                    client,
+                    f"{base_url}/download/video",
+                    str(dest),
+                    params={"video_id": "abc"},
+                    segmented=True,
+                )
+        finally:
+            await fake.stop()
+
+    assert asyncio.run(main())
+    assert dest.read_bytes() == fake.payload
+    # One probe plus four ranges.
+    assert fake.requests["/download/video"] == 5
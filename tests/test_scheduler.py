@@ -0,0 +1,92 @@
+import asyncio
+import sys
+
+import pytest
+
+from Dolbymusic.utils.scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    PLAYBACK,
+    MediaScheduler,
+)
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_returns_the_exit_code_and_output():
+    scheduler = MediaScheduler(2)
+    code, out = asyncio.run(scheduler.run(python("print('ok')")))
+    assert (code, out.strip()) == (0, b"ok")
+    assert scheduler.completed == 1
+    assert scheduler.running == 0
+
+
+def test_waiting_jobs_start_in_priority_order():
+    scheduler = MediaScheduler(1)
+    started = []
+
+    async def job(name, priority):
+        await scheduler.run(python("pass"), priority)
+        started.append(name)
+
+    async def main():
+        first = asyncio.ensure_future(job("first", INTERACTIVE))
+        await asyncio.sleep(0)
+        await asyncio.gather(
+            first,
+            job("background", BACKGROUND),
+            job("interactive", INTERACTIVE),
+            job("playback", PLAYBACK),
+        )
+
+    asyncio.run(main())
+    assert started == ["first", "playback", "interactive", "background"]
+
+
+def test_background_jobs_leave_a_slot_free():
+    scheduler = MediaScheduler(2)
+    sleep = python("import time; time.sleep(0.3)")
+
+    async def main():
+        jobs = [
+            asyncio.ensure_future(scheduler.run(sleep, BACKGROUND)) for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        busy = (scheduler.running, scheduler.stats()["queued"]["background"])
+        await scheduler.run(python("pass"), PLAYBACK)
+        await asyncio.gather(*jobs)
+        return busy
+
+    assert asyncio.run(main()) == (1, 1)
+    assert scheduler.completed == 3
+
+
+def test_timeout_kills_the_process():
+    scheduler = MediaScheduler(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scheduler.run(python("import time; time.sleep(5)"), timeout=0.1))
+    assert scheduler.failed == 1
+    assert scheduler.running == 0
+
+
+def test_cancelling_a_queued_job_frees_its_place():
+    scheduler = MediaScheduler(1)
+
+    async def main():
+        running = asyncio.ensure_future(
+            scheduler.run(python("import time; time.sleep(0.2)"))
+        )
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(scheduler.run(python("pass")))
+        await asyncio.sleep(0)
+        queued.cancel()
+        await running
+        return queued
+
+    assert asyncio.run(main()).cancelled()
+    assert scheduler.cancelled == 1
+    assert scheduler.stats()["queued"]["interactive"] == 0
+    assert scheduler.running == 0
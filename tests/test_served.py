@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from Dolbymusic.utils import served
+from Dolbymusic.utils.served import ServedBuffer
+from Dolbymusic.core.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = SQLiteStorage(str(tmp_path / "t.db"))
+    monkeypatch.setattr(served, "storage", storage)
+    yield storage
+    asyncio.run(storage.close())
+
+
+def test_ids_are_written_after_the_interval(storage):
+    buffer = ServedBuffer("tgusersdb", "user_id", 0.01, 100, 100)
+
+    async def main():
+        buffer.add(1)
+        buffer.add(2)
+        buffer.add(1)
+        before = await storage.count("tgusersdb")
+        await asyncio.sleep(0.05)
+        return before, await storage.count("tgusersdb")
+
+    assert asyncio.run(main()) == (0, 2)
+    assert buffer.batches == 1
+    assert buffer.written == 2
+    assert 1 in buffer and not buffer.pending
+
+
+def test_a_full_batch_is_written_at_once(storage):
+    buffer = ServedBuffer("chats", "chat_id", 60, 3, 100)
+
+    async def main():
+        for chat_id in (1, 2, 3):
+            buffer.add(chat_id)
+        await asyncio.sleep(0)
+        return await storage.count("chats")
+
+    assert asyncio.run(main()) == 3
+
+
+def test_known_ids_are_not_written_again(storage):
+    buffer = ServedBuffer("chats", "chat_id", 60, 100, 100)
+
+    async def main():
+        buffer.add(1)
+        await buffer.flush()
+        buffer.add(1)
+        await buffer.flush()
+
+    asyncio.run(main())
+    assert buffer.batches == 1
+
+
+def test_a_failed_write_keeps_the_ids(storage, monkeypatch):
+    buffer = ServedBuffer("chats", "chat_id", 60, 100, 100)
+    write_many = storage.write_many
+    failures = [RuntimeError("database is down")]
+
+    async def flaky(table, changes):
+        if failures:
+            raise failures.pop()
+        await write_many(table, changes)
+
+    monkeypatch.setattr(storage, "write_many", flaky)
+
+    async def main():
+        buffer.add(1)
+        await buffer.flush()
+        assert buffer.pending == {1}
+        await buffer.flush()
+        return await storage.exists("chats", 1)
+
+    assert asyncio.run(main())
+    assert buffer.pending == set()
+
+
+def test_known_set_is_bounded():
+    buffer = ServedBuffer("chats", "chat_id", 60, 100, 2)
+    for chat_id in (1, 2, 3):
+        buffer.remember(chat_id)
+    assert buffer.known == {3}
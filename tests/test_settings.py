@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from Dolbymusic.utils.settings import SettingCache
+
+
+def loader(values, calls, delay=0.0):
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(delay)
+        return values.get(key, "en")
+
+    return load
+
+
+def test_concurrent_misses_share_one_query():
+    calls = []
+    cache = SettingCache("t-coalesce", loader({1: "hi"}, calls, 0.01))
+
+    async def main():
+        return await asyncio.gather(*[cache.get(1) for _ in range(3)])
+
+    assert asyncio.run(main()) == ["hi"] * 3
+    assert calls == [1]
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 2
+
+
+def test_defaults_are_cached():
+    calls = []
+    cache = SettingCache("t-default", loader({}, calls))
+
+    async def main():
+        return await cache.get(1), await cache.get(1)
+
+    assert asyncio.run(main()) == ("en", "en")
+    assert calls == [1]
+    assert cache.hits == 1
+
+
+def test_set_writes_through_the_cache():
+    calls = []
+    cache = SettingCache("t-set", loader({}, calls))
+    written = []
+
+    async def write():
+        written.append(True)
+
+    async def main():
+        await cache.set(1, "ar", write())
+        return await cache.get(1)
+
+    assert asyncio.run(main()) == "ar"
+    assert written == [True]
+    assert calls == []
+
+
+def test_failed_write_drops_the_key():
+    calls = []
+    cache = SettingCache("t-fail", loader({1: "en"}, calls))
+
+    async def write():
+        raise RuntimeError("write failed")
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await cache.set(1, "ar", write())
+        return await cache.get(1)
+
+    assert asyncio.run(main()) == "en"
+    assert calls == [1]
+
+
+def test_write_during_a_load_wins():
+    values = {1: "en"}
+    cache = SettingCache("t-race", loader(values, [], 0.02))
+
+    async def main():
+        read = asyncio.ensure_future(cache.get(1))
+        await asyncio.sleep(0.005)
+        await cache.set(1, "ar")
+        return await read, await cache.get(1)
+
+    assert asyncio.run(main()) == ("ar", "ar")
+
+
+def test_entries_expire():
+    calls = []
+    cache = SettingCache("t-ttl", loader({}, calls), ttl=0)
+
+    async def main():
+        await cache.get(1)
+        await asyncio.sleep(0.001)
+        await cache.get(1)
+
+    asyncio.run(main())
+    assert calls == [1, 1]
+
+
+def test_least_recently_used_is_evicted():
+    calls = []
+    cache = SettingCache("t-lru", loader({}, calls), maxsize=2)
+
+    async def main():
+        await cache.get(1)
+        await cache.get(2)
+        await cache.get(1)
+        await cache.get(3)
+        await cache.get(1)
+        await cache.get(2)
+
+    asyncio.run(main())
+    assert calls == [1, 2, 3, 2]
+    assert cache.evictions == 2
+
+
+def test_watchers_see_writes_and_invalidations():
+    cache = SettingCache("t-watch", loader({}, []))
+    seen = []
+    cache.watch(seen.append)
+
+    async def main():
+        await cache.set(1, "ar")
+        cache.invalidate(2)
+
+    asyncio.run(main())
+    assert seen == [1, 2]
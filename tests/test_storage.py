@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+# storage opens the configured backend on import, so it has to load first.
+from Dolbymusic.core.storage import TABLES
+from Dolbymusic.core.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "t.db"))
+    yield storage
+    asyncio.run(storage.close())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(aiterator):
+    return [item async for item in aiterator]
+
+
+def test_set_merges_into_the_record(storage):
+    run(storage.set("language", -100, {"language": "en"}))
+    run(storage.set("language", -100, {"extra": 1}))
+    assert run(storage.get("language", -100)) == {
+        "chat_id": -100,
+        "language": "en",
+        "extra": 1,
+    }
+    assert run(storage.get("language", -200)) is None
+
+
+def test_add_and_delete_treat_a_table_as_a_set(storage):
+    assert run(storage.add("gban", 1))
+    assert not run(storage.add("gban", 1))
+    assert run(storage.exists("gban", 1))
+    assert run(storage.delete("gban", 1))
+    assert not run(storage.delete("gban", 1))
+    assert not run(storage.exists("gban", 1))
+
+
+def test_ranges_include_start_and_exclude_stop(storage):
+    for key in range(10):
+        run(storage.add("chats", key))
+    assert run(collect(storage.keys("chats", start=3, stop=7))) == [3, 4, 5, 6]
+    assert run(collect(storage.keys("chats", stop=2))) == [0, 1]
+    assert run(collect(storage.keys("chats", start=8))) == [8, 9]
+    assert run(storage.count("chats", start=3, stop=7)) == 4
+    assert run(storage.count("chats")) == 10
+
+
+def test_pages_cover_the_range_in_order(storage):
+    for key in (5, 1, 4, 2, 3):
+        run(storage.set("afk", key, {"reason": str(key)}))
+    items = run(collect(storage.items("afk", start=1, stop=5, batch_size=2)))
+    assert [key for key, _ in items] == [1, 2, 3, 4]
+    assert items[0][1] == {"user_id": 1, "reason": "1"}
+    assert run(collect(storage.keys("afk", batch_size=2))) == [1, 2, 3, 4, 5]
+
+
+def test_write_many_sets_and_deletes(storage):
+    run(storage.set("playmode", 1, {"mode": "Direct"}))
+    run(storage.write_many("playmode", {1: None, 2: {"mode": "Inline"}}))
+    assert run(storage.get("playmode", 1)) is None
+    assert run(storage.get("playmode", 2)) == {"chat_id": 2, "mode": "Inline"}
+
+
+def test_write_many_rolls_back_on_failure(storage):
+    run(storage.set("playmode", 1, {"mode": "Direct"}))
+    with pytest.raises(TypeError):
+        run(storage.write_many("playmode", {1: None, 2: {"mode": object()}}))
+    assert run(storage.get("playmode", 1)) == {"chat_id": 1, "mode": "Direct"}
+    assert run(storage.count("playmode")) == 1
+
+
+def test_clear_empties_only_that_table(storage):
+    run(storage.add("gban", 1))
+    run(storage.add("sudoers", 1))
+    run(storage.clear("gban"))
+    assert run(storage.count("gban")) == 0
+    assert run(storage.count("sudoers")) == 1
+
+
+def test_unknown_tables_are_rejected(storage):
+    with pytest.raises(KeyError):
+        run(storage.get("sqlite_master", 1))
+
+
+def test_stats_count_every_table(storage):
+    run(storage.add("gban", 1))
+    run(storage.add("chats", 1))
+    run(storage.add("chats", 2))
+    stats = run(storage.stats())
+    assert stats["tables"] == len(TABLES)
+    assert stats["records"] == 3
+    assert stats["storage_size"] >= stats["data_size"] > 0
@@ -0,0 +1,93 @@
+import asyncio
+
+from Dolbymusic.utils.timers import TimerService
+
+
+def service(fired):
+    timers = TimerService()
+
+    @timers.on("autoend")
+    async def autoend(chat_id):
+        fired.append(chat_id)
+
+    return timers
+
+
+def test_deadlines_fire_in_order():
+    fired = []
+    timers = service(fired)
+
+    async def main():
+        timers.schedule("autoend", 2, 0.03)
+        timers.schedule("autoend", 1, 0.01)
+        await asyncio.sleep(0.06)
+
+    asyncio.run(main())
+    assert fired == [1, 2]
+    assert timers.fired == 2
+    assert timers.stats()["pending"] == {}
+
+
+def test_rescheduling_moves_the_deadline():
+    fired = []
+    timers = service(fired)
+
+    async def main():
+        timers.schedule("autoend", 1, 0.01)
+        timers.schedule("autoend", 1, 0.05)
+        await asyncio.sleep(0.03)
+        early = list(fired)
+        remaining = timers.remaining("autoend", 1)
+        await asyncio.sleep(0.05)
+        return early, remaining
+
+    early, remaining = asyncio.run(main())
+    assert early == []
+    assert 0 < remaining <= 0.05
+    assert fired == [1]
+
+
+def test_cancelled_deadlines_do_not_fire():
+    fired = []
+    timers = service(fired)
+
+    async def main():
+        timers.schedule("autoend", 1, 0.01)
+        timers.cancel("autoend", 1)
+        await asyncio.sleep(0.03)
+
+    asyncio.run(main())
+    assert fired == []
+    assert timers.remaining("autoend", 1) is None
+
+
+def test_an_earlier_deadline_wakes_the_worker():
+    fired = []
+    timers = service(fired)
+
+    async def main():
+        timers.schedule("autoend", 1, 10)
+        await asyncio.sleep(0)
+        timers.schedule("autoend", 2, 0.01)
+        await asyncio.sleep(0.03)
+        timers.cancel("autoend", 1)
+
+    asyncio.run(main())
+    assert fired == [2]
+
+
+def test_a_failing_handler_does_not_stop_the_others():
+    fired = []
+    timers = service(fired)
+
+    @timers.on("autoleave")
+    async def autoleave(chat_id):
+        raise RuntimeError("left already")
+
+    async def main():
+        timers.schedule("autoleave", 1, 0)
+        timers.schedule("autoend", 2, 0.01)
+        await asyncio.sleep(0.03)
+
+    asyncio.run(main())
+    assert fired == [2]